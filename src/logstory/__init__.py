@@ -13,10 +13,18 @@
 # limitations under the License.
 """LogStory: Replay SecOps telemetry logs with updated timestamps."""
 
-# read version from installed package
-from importlib.metadata import PackageNotFoundError, version
 
-try:
-  __version__ = version("logstory")
-except PackageNotFoundError:
-  __version__ = "1.2.3"
+def __getattr__(name: str) -> str:
+  """Read __version__ from the installed package when it is first used.
+
+  importlib.metadata is slow to import, and the CLI only needs it for
+  --version.
+  """
+  if name != "__version__":
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  from importlib.metadata import PackageNotFoundError, version  # noqa: PLC0415
+
+  try:
+    return version("logstory")
+  except PackageNotFoundError:
+    return "1.2.3"
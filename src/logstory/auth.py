@@ -13,20 +13,37 @@
 # limitations under the License.
 """Authentication abstraction for Logstory to support multiple ingestion APIs."""
 
+import functools
 import json
+import logging
 import os
+import threading
 import warnings
 from abc import ABC, abstractmethod
 from typing import Any
 
 import google.auth
 from google.auth import impersonated_credentials
-from google.auth.credentials import Credentials
+from google.auth.credentials import Credentials, with_scopes_if_required
 from google.auth.exceptions import DefaultCredentialsError
 from google.auth.transport import requests
-from google.cloud import secretmanager
 from google.oauth2 import service_account
 
+LOGGER = logging.getLogger(__name__)
+
+# Seconds ADC detection may wait for the GCE metadata server
+ADC_TIMEOUT_DEFAULT = 2.0
+# Set by Cloud Run, Cloud Functions, App Engine or to point at a metadata server
+_GCP_RUNTIME_VARS = (
+    "K_SERVICE",
+    "CLOUD_RUN_JOB",
+    "FUNCTION_TARGET",
+    "GAE_APPLICATION",
+    "GCE_METADATA_HOST",
+    "GCE_METADATA_IP",
+)
+_GCE_PRODUCT_NAME_FILE = "/sys/class/dmi/id/product_name"
+
 
 def validate_credentials_match_api_type(
     api_type: str,
@@ -154,6 +171,9 @@ class LegacyAuthHandler(AuthHandler):
           info, scopes=self.SCOPES
       )
     elif self.secret_manager_credentials:
+      # imported on use: only Cloud Functions read keys from Secret Manager
+      from google.cloud import secretmanager  # noqa: PLC0415
+
       client = secretmanager.SecretManagerServiceClient()
       request = {"name": f"{self.secret_manager_credentials}/versions/latest"}
       response = client.access_secret_version(request)
@@ -232,7 +252,14 @@ class RestAuthHandler(AuthHandler):
       )
     else:
       # Try Application Default Credentials
-      base_credentials, _ = google.auth.default(scopes=self.SCOPES)
+      credentials, _ = find_application_default_credentials()
+      if credentials is None:
+        raise DefaultCredentialsError(
+            "Application Default Credentials are not available. Run 'gcloud"
+            " auth application-default login', set GOOGLE_APPLICATION_CREDENTIALS"
+            " or, on Google Cloud, raise LOGSTORY_ADC_TIMEOUT."
+        )
+      base_credentials = with_scopes_if_required(credentials, self.SCOPES)
 
     # Handle impersonation if requested
     if self.impersonate_service_account:
@@ -261,21 +288,100 @@ class RestAuthHandler(AuthHandler):
     return self._http_client
 
 
+def _get_adc_file() -> str | None:
+  """Returns the ADC key file google.auth.default() would load, if it exists."""
+  path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+  if not path:
+    config_dir = os.environ.get("CLOUDSDK_CONFIG")
+    if not config_dir:
+      if os.name == "nt":
+        config_dir = os.path.join(os.environ.get("APPDATA", ""), "gcloud")
+      else:
+        config_dir = os.path.join(os.path.expanduser("~"), ".config", "gcloud")
+    path = os.path.join(config_dir, "application_default_credentials.json")
+  return path if os.path.isfile(path) else None
+
+
+def _may_run_on_google_cloud() -> bool:
+  """Checks without network access whether a metadata server may be reachable."""
+  if os.environ.get("NO_GCE_CHECK", "").lower() in ("true", "1"):
+    return False
+  if any(os.environ.get(name) for name in _GCP_RUNTIME_VARS):
+    return True
+  try:
+    with open(_GCE_PRODUCT_NAME_FILE, encoding="utf-8") as fh:
+      return fh.read().strip().startswith("Google")
+  except OSError:
+    return False
+
+
+def _load_application_default_credentials() -> tuple[Credentials | None, str | None]:
+  """Calls google.auth.default(), returning no credentials if it fails."""
+  try:
+    return google.auth.default()
+  except DefaultCredentialsError:
+    return None, None
+  except Exception:  # noqa: BLE001
+    # Any other error means ADC is not available
+    return None, None
+
+
+@functools.cache
+def find_application_default_credentials(
+    timeout: float | None = None,
+) -> tuple[Credentials | None, str | None]:
+  """Finds Application Default Credentials once per process.
+
+  A key file named by GOOGLE_APPLICATION_CREDENTIALS or written by gcloud is
+  loaded directly. Otherwise the GCE metadata server is only asked when the
+  process appears to run on Google Cloud, and for at most timeout seconds,
+  so detection never blocks on metadata probing on CI or on-prem runners.
+  The result, including finding no credentials, is cached.
+
+  Args:
+    timeout: Seconds to wait for the metadata server. Defaults to
+      LOGSTORY_ADC_TIMEOUT, or 2.
+
+  Returns:
+    Unscoped credentials and project ID, as from google.auth.default(), or
+    (None, None) if ADC are not available.
+  """
+  if _get_adc_file():
+    return _load_application_default_credentials()
+  if not _may_run_on_google_cloud():
+    return None, None
+
+  if timeout is None:
+    timeout = float(os.environ.get("LOGSTORY_ADC_TIMEOUT", ADC_TIMEOUT_DEFAULT))
+  result = [(None, None)]
+
+  def load():
+    result[0] = _load_application_default_credentials()
+
+  # google.auth.default() retries the metadata server with its own timeouts
+  thread = threading.Thread(target=load, name="logstory-adc", daemon=True)
+  thread.start()
+  thread.join(timeout)
+  if thread.is_alive():
+    LOGGER.warning(
+        "No reply from the GCE metadata server within %s s;"
+        " continuing without Application Default Credentials",
+        timeout,
+    )
+    return None, None
+  return result[0]
+
+
 def has_application_default_credentials() -> bool:
   """Check if Application Default Credentials are available.
 
+  Uses the cached result of find_application_default_credentials().
+
   Returns:
     True if ADC are available, False otherwise.
   """
-  try:
-    # Try to load ADC without actually using them
-    credentials, _ = google.auth.default()
-    return credentials is not None
-  except DefaultCredentialsError:
-    return False
-  except Exception:  # noqa: BLE001
-    # Any other error means ADC is not available
-    return False
+  credentials, _ = find_application_default_credentials()
+  return credentials is not None
 
 
 def detect_auth_type() -> str:
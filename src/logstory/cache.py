@@ -0,0 +1,114 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""On-disk JSON cache shared by Logstory components."""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_cache_dir() -> Path:
+  """Get the directory used for Logstory's on-disk caches.
+
+  Honours LOGSTORY_CACHE_DIR, then XDG_CACHE_HOME, then ~/.cache.
+
+  Returns:
+    Path of the cache directory (it may not exist yet).
+  """
+  cache_dir = os.environ.get("LOGSTORY_CACHE_DIR")
+  if cache_dir:
+    return Path(cache_dir)
+  xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+      os.path.expanduser("~"), ".cache"
+  )
+  return Path(xdg_cache_home) / "logstory"
+
+
+def read_json_file(path: str | os.PathLike) -> Any | None:
+  """Read a JSON document written by write_json_file.
+
+  Args:
+    path: Path of the document.
+
+  Returns:
+    The decoded document, or None if it is missing or unreadable.
+  """
+  try:
+    with open(path, encoding="utf-8") as fh:
+      return json.load(fh)
+  except FileNotFoundError:
+    return None
+  except (OSError, ValueError) as e:
+    LOGGER.debug("Ignoring unreadable JSON file %s: %s", path, e)
+    return None
+
+
+def write_json_file(path: str | os.PathLike, data: Any) -> bool:
+  """Atomically write a JSON document, creating its directory.
+
+  Failures (read-only filesystems, permissions) are logged and swallowed:
+  callers use these files as optimizations that must never break a replay.
+
+  Args:
+    path: Path of the document.
+    data: JSON-serializable document to store.
+
+  Returns:
+    True if the document was written, False otherwise.
+  """
+  path = Path(path)
+  try:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+      with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+      os.replace(tmp_path, path)
+    except BaseException:
+      os.unlink(tmp_path)
+      raise
+  except OSError as e:
+    LOGGER.debug("Could not write JSON file %s: %s", path, e)
+    return False
+  return True
+
+
+def read_json_cache(name: str) -> Any | None:
+  """Read a cached JSON document.
+
+  Args:
+    name: Path of the cache entry, relative to the cache directory.
+
+  Returns:
+    The decoded document, or None if it is missing or unreadable.
+  """
+  return read_json_file(get_cache_dir() / name)
+
+
+def write_json_cache(name: str, data: Any) -> bool:
+  """Atomically write a JSON document to the cache.
+
+  Args:
+    name: Path of the cache entry, relative to the cache directory.
+    data: JSON-serializable document to store.
+
+  Returns:
+    True if the entry was written, False otherwise.
+  """
+  return write_json_file(get_cache_dir() / name, data)
@@ -0,0 +1,244 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""JSON codec used on the replay hot path.
+
+Uses orjson or msgspec when one is installed and the standard library
+otherwise. Every codec produces compact, ASCII-only JSON (non-ASCII
+characters are escaped, as json.dumps(ensure_ascii=True) did before) that
+decodes to the same values, so the choice of library never changes what the
+APIs read; only the spelling of numbers may differ, e.g. 1e16 for 1e+16.
+Anything the fast library rejects or would write differently (integers
+beyond 64 bits, NaN and infinities, non-string keys) is handed to the
+standard library, which also decides the error for invalid input.
+
+RawJson holds a document that is already encoded, so log lines that are
+JSON can be spliced into request bodies once they have been validated,
+without being re-encoded.
+"""
+
+import json
+import math
+import os
+from collections.abc import Sequence
+from typing import Any
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+try:
+  import msgspec
+except ImportError:
+  msgspec = None
+
+_ASCII_SEPARATORS = (",", ":")
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+  return json.dumps(value, ensure_ascii=True, separators=_ASCII_SEPARATORS).encode(
+      "ascii"
+  )
+
+
+def _has_non_finite(value: Any) -> bool:
+  """Checks whether value holds NaN or an infinity, which fast libraries null."""
+  if isinstance(value, float):
+    return not math.isfinite(value)
+  if isinstance(value, dict):
+    return any(map(_has_non_finite, value.values()))
+  if isinstance(value, list | tuple):
+    return any(map(_has_non_finite, value))
+  return False
+
+
+def _fast_or_stdlib(data: bytes, value: Any) -> bytes:
+  """Returns a fast library's data unless the standard library differs."""
+  # NaN and infinities come out as null, so only then is value walked
+  if not data.isascii() or (b"null" in data and _has_non_finite(value)):
+    return _stdlib_dumps(value)
+  return data
+
+
+class JsonCodec:
+  """Encodes and decodes JSON with the standard library."""
+
+  name = "json"
+
+  def dumps(self, value: Any) -> bytes:
+    """Encode value as compact, ASCII-only JSON.
+
+    Args:
+      value: JSON-serializable value.
+
+    Returns:
+      The encoded JSON.
+    """
+    return _stdlib_dumps(value)
+
+  def loads(self, data: str | bytes) -> Any:
+    """Decode a JSON document.
+
+    Args:
+      data: JSON text or UTF-8 bytes.
+
+    Returns:
+      The decoded value.
+
+    Raises:
+      json.JSONDecodeError: If data is not valid JSON.
+    """
+    return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+  """Encodes and decodes JSON with orjson."""
+
+  name = "orjson"
+
+  def dumps(self, value: Any) -> bytes:
+    """Encode value as compact, ASCII-only JSON."""
+    try:
+      data = orjson.dumps(value)
+    except TypeError:  # orjson.JSONEncodeError
+      return _stdlib_dumps(value)
+    return _fast_or_stdlib(data, value)
+
+  def loads(self, data: str | bytes) -> Any:
+    """Decode a JSON document."""
+    try:
+      return orjson.loads(data)
+    except ValueError:  # orjson.JSONDecodeError
+      return json.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+  """Encodes and decodes JSON with msgspec."""
+
+  name = "msgspec"
+
+  def __init__(self):
+    """Initialize the msgspec encoder and decoder."""
+    self._encoder = msgspec.json.Encoder()
+    self._decoder = msgspec.json.Decoder()
+
+  def dumps(self, value: Any) -> bytes:
+    """Encode value as compact, ASCII-only JSON."""
+    try:
+      data = self._encoder.encode(value)
+    except (TypeError, ValueError, OverflowError):
+      return _stdlib_dumps(value)
+    return _fast_or_stdlib(data, value)
+
+  def loads(self, data: str | bytes) -> Any:
+    """Decode a JSON document."""
+    try:
+      return self._decoder.decode(data)
+    except msgspec.DecodeError:
+      return json.loads(data)
+
+
+CODECS = {"json": JsonCodec}
+if orjson is not None:
+  CODECS["orjson"] = OrjsonCodec
+if msgspec is not None:
+  CODECS["msgspec"] = MsgspecCodec
+
+
+def get_codec(name: str | None = None) -> JsonCodec:
+  """Get a JSON codec.
+
+  Args:
+    name: "orjson", "msgspec" or "json"; defaults to LOGSTORY_JSON_CODEC,
+      then to the fastest installed library.
+
+  Returns:
+    The codec.
+
+  Raises:
+    ValueError: If the named codec is unknown or its library is not installed.
+  """
+  name = name or os.environ.get("LOGSTORY_JSON_CODEC")
+  if not name:
+    name = next(n for n in ("orjson", "msgspec", "json") if n in CODECS)
+  if name not in CODECS:
+    raise ValueError(
+        f"JSON codec '{name}' is not available. Available: {', '.join(CODECS)}"
+    )
+  return CODECS[name]()
+
+
+codec = get_codec()
+dumps = codec.dumps
+loads = codec.loads
+
+
+class RawJson(bytes):
+  """An encoded JSON document, sent as is instead of being re-encoded."""
+
+  __slots__ = ()
+
+
+def _validate_json(text: str) -> None:
+  """Parses text, with orjson when it is installed, and discards the result.
+
+  Raises:
+    json.JSONDecodeError: If text is not valid JSON.
+  """
+  if orjson is not None:
+    try:
+      orjson.loads(text)
+      return
+    except ValueError:  # orjson.JSONDecodeError
+      pass  # the standard library decides, as in OrjsonCodec.loads
+  json.loads(text)
+
+
+def raw_json(text: str) -> RawJson:
+  """Wrap one JSON object, e.g. a log line, without re-encoding it.
+
+  ASCII text is parsed to check that it is JSON and then used as is, so a
+  bad line raises here rather than failing the whole batch it is sent in.
+  Other text is decoded and re-encoded, which escapes non-ASCII characters.
+
+  Args:
+    text: JSON text of one object.
+
+  Returns:
+    The encoded document.
+
+  Raises:
+    json.JSONDecodeError: If text is not valid JSON.
+  """
+  text = text.strip()
+  if text.isascii():
+    _validate_json(text)
+    return RawJson(text.encode("ascii"))
+  return RawJson(dumps(loads(text)))
+
+
+def dumps_with_array(value: dict[str, Any], key: str, items: Sequence[bytes]) -> bytes:
+  """Encode value with value[key] set to an array of encoded items.
+
+  Args:
+    value: JSON object to encode; its own value[key], if any, is ignored.
+    key: Key of the array, which is encoded last.
+    items: Encoded JSON of each array element.
+
+  Returns:
+    The encoded JSON.
+  """
+  head = dumps({k: v for k, v in value.items() if k != key} | {key: []})
+  # every codec encodes an empty array as "[]" with no whitespace
+  return b"".join((head[:-3], b"[", b",".join(items), b"]}"))
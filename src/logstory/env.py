@@ -0,0 +1,35 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Environment variable parsing shared by Logstory components."""
+
+import os
+
+_TRUE_VALUES = ("true", "1", "yes", "on")
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+  """Read a boolean setting from the environment.
+
+  Args:
+    name: Environment variable name, e.g. "LOGSTORY_ORDERED".
+    default: Value when the variable is unset.
+
+  Returns:
+    True if the variable is "true", "1", "yes" or "on" in any case, False
+    for any other value, and default when it is unset.
+  """
+  value = os.environ.get(name)
+  if value is None:
+    return default
+  return value.lower() in _TRUE_VALUES
@@ -13,22 +13,52 @@
 # limitations under the License.
 """Ingestion backend abstraction for Logstory supporting multiple APIs."""
 
-import base64
-import json
+import dataclasses
+import gzip
 import logging
+import random
+import threading
+import time
 import uuid
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import requests as real_requests
+from urllib3.exceptions import NewConnectionError
 
+from . import codec
 from .auth import AuthHandler
 
+try:
+  from pybase64 import b64encode
+except ImportError:
+  from base64 import b64encode
+
 LOGGER = logging.getLogger(__name__)
 
 HTTP_STATUS_OK = 200
 HTTP_STATUS_BAD_REQUEST = 400
+# Throttling and unavailable errors: the batch was not accepted, so resending
+# it cannot duplicate logs. Other 5xx errors, including 504 gateway timeouts,
+# may follow a write the backend still completes.
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503})
+# Largest request body, in bytes, accepted by the ingestion APIs
+MAX_REQUEST_BYTES = 1_000_000
+# Share of MAX_REQUEST_BYTES kept free for values that are only known when
+# the request is sent (forwarder IDs, sanitizing) and for HTTP framing
+REQUEST_BYTES_HEADROOM = 0.05
+# Content-Encoding values the backends can compress request bodies with
+SUPPORTED_COMPRESSIONS = ("gzip",)
+# zlib's default level; 9 is several times slower for a few percent
+GZIP_COMPRESSLEVEL = 6
+# Placeholder with the length of datetime.now(UTC).isoformat()
+_ISO_TIMESTAMP = "2026-01-01T00:00:00.000000+00:00"
+# Separator the codec writes between list items
+_ITEM_SEPARATOR_BYTES = len(",")
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 LEGACY_REGION_URL_MAP = {
     "us": "https://malachiteingestion-pa.googleapis.com",
@@ -97,21 +127,291 @@ def sanitize_log_text(text: str) -> str:
   Returns:
     Sanitized log text string safe for API ingestion.
   """
-  if not text:
+  if not text or text.isascii():
     return text
 
   # Strip registered trademark (\u00ae), copyright (\u00a9), trademark (\u2122)
   return text.replace("\u00ae", "").replace("\u00a9", "").replace("\u2122", "")
 
 
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+  """How requests that fail transiently are retried.
+
+  Attributes:
+    max_retries: Retries after the first attempt; 0 disables retrying.
+    backoff_base: Upper bound in seconds of the first backoff.
+    backoff_max: Upper bound in seconds of any backoff.
+    max_retry_after: Longest Retry-After, in seconds, that is honoured.
+  """
+
+  max_retries: int = 5
+  backoff_base: float = 1.0
+  backoff_max: float = 60.0
+  max_retry_after: float = 300.0
+
+  def get_backoff(self, retry: int, retry_after: float | None = None) -> float:
+    """Get the delay before a retry.
+
+    Args:
+      retry: Zero-based number of the retry.
+      retry_after: Delay requested by the server, if any.
+
+    Returns:
+      Retry-After when the server sent one, otherwise exponential backoff
+      with full jitter.
+    """
+    if retry_after is not None:
+      return min(retry_after, self.max_retry_after)
+    cap = min(self.backoff_max, self.backoff_base * 2**retry)
+    return random.uniform(0, cap)  # noqa: S311 - jitter, not crypto
+
+
+@dataclasses.dataclass
+class RetryStats:
+  """Thread-safe counters describing the retries made by a backend."""
+
+  requests: int = 0
+  retries: int = 0
+  backoff_seconds: float = 0.0
+  retries_by_reason: dict[str, int] = dataclasses.field(default_factory=dict)
+  _lock: threading.Lock = dataclasses.field(
+      default_factory=threading.Lock, repr=False, compare=False
+  )
+
+  def record_request(self) -> None:
+    """Count one request attempt."""
+    with self._lock:
+      self.requests += 1
+
+  def record_retry(self, reason: str, delay: float) -> None:
+    """Count one retry and the time spent waiting for it.
+
+    Args:
+      reason: HTTP status code or exception name that caused the retry.
+      delay: Seconds slept before the retry.
+    """
+    with self._lock:
+      self.retries += 1
+      self.backoff_seconds += delay
+      self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
+
+  def as_dict(self) -> dict[str, Any]:
+    """Get a consistent snapshot of the counters.
+
+    Returns:
+      Dictionary with requests, retries, backoff_seconds and
+      retries_by_reason.
+    """
+    with self._lock:
+      return {
+          "requests": self.requests,
+          "retries": self.retries,
+          "backoff_seconds": round(self.backoff_seconds, 3),
+          "retries_by_reason": dict(self.retries_by_reason),
+      }
+
+
+@dataclasses.dataclass
+class CompressionStats:
+  """Thread-safe counters of the request bytes saved by compression."""
+
+  requests: int = 0
+  raw_bytes: int = 0
+  sent_bytes: int = 0
+  _lock: threading.Lock = dataclasses.field(
+      default_factory=threading.Lock, repr=False, compare=False
+  )
+
+  def record(self, raw_bytes: int, sent_bytes: int) -> None:
+    """Count one compressed request body.
+
+    Args:
+      raw_bytes: Size of the body before compression.
+      sent_bytes: Size of the compressed body.
+    """
+    with self._lock:
+      self.requests += 1
+      self.raw_bytes += raw_bytes
+      self.sent_bytes += sent_bytes
+
+  def as_dict(self) -> dict[str, Any]:
+    """Get a consistent snapshot of the counters.
+
+    Returns:
+      Dictionary with requests, raw_bytes, sent_bytes and ratio (raw bytes
+      per byte sent).
+    """
+    with self._lock:
+      return {
+          "requests": self.requests,
+          "raw_bytes": self.raw_bytes,
+          "sent_bytes": self.sent_bytes,
+          "ratio": (
+              round(self.raw_bytes / self.sent_bytes, 2) if self.sent_bytes else None
+          ),
+      }
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+  """Parse a Retry-After header given in seconds or as an HTTP date.
+
+  Returns:
+    Seconds to wait, or None if the header is missing or malformed.
+  """
+  if not value:
+    return None
+  try:
+    return max(0.0, float(value))
+  except ValueError:
+    pass
+  try:
+    retry_at = parsedate_to_datetime(value)
+  except (TypeError, ValueError):
+    return None
+  if retry_at.tzinfo is None:
+    retry_at = retry_at.replace(tzinfo=UTC)
+  return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+def _is_connect_error(error: real_requests.ConnectionError) -> bool:
+  """Check whether a request failed while connecting, before it was sent.
+
+  requests wraps urllib3's NewConnectionError (refused or unresolved) in a
+  plain ConnectionError, so the error's reason and cause chain are searched.
+  """
+  if isinstance(error, real_requests.ConnectTimeout):
+    return True
+  pending, seen = [error], set()
+  while pending:
+    exc = pending.pop()
+    if id(exc) in seen:
+      continue
+    seen.add(id(exc))
+    if isinstance(exc, NewConnectionError):
+      return True
+    linked = (exc.__cause__, exc.__context__, getattr(exc, "reason", None), *exc.args)
+    pending.extend(e for e in linked if isinstance(e, BaseException))
+  return False
+
+
+def _json_size(value: Any) -> int:
+  """Get the length of value as encoded in request bodies."""
+  if isinstance(value, codec.RawJson):
+    return len(value)
+  return len(codec.dumps(value))
+
+
+def _dumps_with_entries(
+    body: dict[str, Any], key: str, entries: list[dict[str, Any] | codec.RawJson]
+) -> bytes:
+  """Encode a request body with body[key] set to the entries.
+
+  codec.RawJson entries are spliced into the body as they are.
+  """
+  return codec.dumps_with_array(
+      body,
+      key,
+      [e if isinstance(e, codec.RawJson) else codec.dumps(e) for e in entries],
+  )
+
+
+def _base64_size(text: str) -> int:
+  """Get the length of the base64 encoding of text's UTF-8 bytes."""
+  n = len(text) if text.isascii() else len(text.encode("utf-8"))
+  return 4 * ((n + 2) // 3)
+
+
+class RestLogEncoder:
+  """Encodes batches of unstructured logs as REST logs:import request bodies.
+
+  What every log of a batch shares (forwarder, labels, entry and collection
+  times) is encoded once, so each log only costs its sanitization and base64
+  encoding. Base64 output needs no JSON escaping and goes into the body as
+  is.
+  """
+
+  def __init__(
+      self,
+      forwarder: str,
+      labels: list[dict[str, str]],
+      timestamp: str | None = None,
+  ):
+    """Initialize the encoder for one batch.
+
+    Args:
+      forwarder: Forwarder resource name the logs are imported through
+      labels: Ingestion labels attached to every log
+      timestamp: ISO timestamp used as entry and collection time of every
+        log (default now)
+    """
+    timestamp = timestamp or datetime.now(UTC).isoformat()
+    self.forwarder = forwarder
+    log_entry: dict[str, Any] = {
+        "log_entry_time": timestamp,
+        "collection_time": timestamp,
+    }
+    if labels:
+      log_entry["labels"] = {
+          label["key"]: {"value": label["value"]} for label in labels
+      }
+    # each log is {"data":"<base64>",<log_entry fields>}
+    self._log_suffix = b'",' + codec.dumps(log_entry)[1:]
+
+  def encode_log(self, log_text: str) -> bytes:
+    """Encode one log of the batch.
+
+    Args:
+      log_text: Raw log text
+
+    Returns:
+      The encoded JSON of the log's entry in the request body.
+    """
+    data = b64encode(sanitize_log_text(log_text).encode("utf-8"))
+    return b"".join((b'{"data":"', data, self._log_suffix))
+
+  def encode(self, entries: list[dict[str, str]]) -> bytes:
+    """Encode a request body.
+
+    Args:
+      entries: Unstructured log entries ({"logText": ...})
+
+    Returns:
+      The encoded request body.
+    """
+    logs = [self.encode_log(entry.get("logText", "")) for entry in entries]
+    inline_source = codec.dumps_with_array({"forwarder": self.forwarder}, "logs", logs)
+    return b"".join((b'{"inline_source":', inline_source, b"}"))
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchSizer:
+  """Measures entries against the request size limit of one batch.
+
+  Attributes:
+    max_bytes: Bytes available to the entries of one request.
+    entry_bytes: Returns the bytes one entry adds to the request.
+  """
+
+  max_bytes: int
+  entry_bytes: Callable[[Any], int]
+
+
 class IngestionBackend(ABC):
   """Abstract base class for Chronicle ingestion backends."""
 
+  max_request_bytes = MAX_REQUEST_BYTES
+  # APIs whose entries may be codec.RawJson instead of dicts
+  raw_json_apis: frozenset[str] = frozenset()
+
   def __init__(
       self,
       auth_handler: AuthHandler,
       customer_id: str,
       region: str | None = None,
+      retry_policy: RetryPolicy | None = None,
+      compression: str | None = None,
+      base_url: str | None = None,
   ):
     """Initialize ingestion backend.
 
@@ -119,19 +419,120 @@ class IngestionBackend(ABC):
       auth_handler: Authentication handler instance
       customer_id: Customer/instance ID
       region: Geographic region for API endpoints
+      retry_policy: How transient failures are retried (default RetryPolicy())
+      compression: Content-Encoding for batch request bodies ("gzip"), or
+        None to send them uncompressed
+      base_url: URL to send requests to instead of the region's endpoint,
+        e.g. a local logstory.mock_server
+
+    Raises:
+      ValueError: If the compression is not supported.
     """
+    if compression and compression not in SUPPORTED_COMPRESSIONS:
+      raise ValueError(
+          f"Unsupported compression: {compression}. "
+          f"Use one of: {', '.join(SUPPORTED_COMPRESSIONS)}"
+      )
     self.auth_handler = auth_handler
     self.customer_id = customer_id
     self.region = region or "US"
+    self.retry_policy = retry_policy or RetryPolicy()
+    self.retry_stats = RetryStats()
+    self.compression = compression or None
+    self.compression_stats = CompressionStats()
+    self.base_url = base_url.rstrip("/") if base_url else None
     self._http_client = None
+    self._http_client_lock = threading.Lock()
 
   @property
   def http_client(self):
     """Get authenticated HTTP client."""
     if not self._http_client:
-      self._http_client = self.auth_handler.get_http_client()
+      with self._http_client_lock:
+        if not self._http_client:
+          self._http_client = self.auth_handler.get_http_client()
     return self._http_client
 
+  def _request(self, method: str, url: str, **kwargs) -> real_requests.Response:
+    """Send a request, retrying throttling, gateway and connect errors.
+
+    Responses with a status in RETRYABLE_STATUS_CODES and failures to open
+    the connection (refused, unresolved or timed out connecting) are retried
+    according to the retry policy. Other connection errors, e.g. a reset
+    while waiting for the response, are raised at once: the server may
+    already have ingested the batch, and sending it again would duplicate
+    it. A 504 gateway timeout is not retried for the same reason. Other
+    responses are returned as is.
+
+    Args:
+      method: HTTP method name, e.g. "post"
+      url: Request URL
+      **kwargs: Passed to the HTTP client
+
+    Returns:
+      The first non-retryable response, or the last one once retries run out.
+
+    Raises:
+      requests.ConnectionError: If the last attempt could not connect, or
+        the connection failed after the request was sent.
+    """
+    send = getattr(self.http_client, method)
+    retry = 0
+    while True:
+      self.retry_stats.record_request()
+      try:
+        response = send(url, **kwargs)
+      except real_requests.ConnectionError as e:
+        if retry >= self.retry_policy.max_retries or not _is_connect_error(e):
+          raise
+        reason = type(e).__name__
+        delay = self.retry_policy.get_backoff(retry)
+      else:
+        if (
+            response.status_code not in RETRYABLE_STATUS_CODES
+            or retry >= self.retry_policy.max_retries
+        ):
+          return response
+        reason = str(response.status_code)
+        delay = self.retry_policy.get_backoff(
+            retry, _parse_retry_after(response.headers.get("Retry-After"))
+        )
+      LOGGER.warning(
+          "Request to %s failed (%s); retry %d of %d in %.2fs",
+          url,
+          reason,
+          retry + 1,
+          self.retry_policy.max_retries,
+          delay,
+      )
+      self.retry_stats.record_retry(reason, delay)
+      time.sleep(delay)
+      retry += 1
+
+  def _post_batch(self, url: str, **kwargs) -> real_requests.Response:
+    """POST a batch, compressing its body if the backend is configured to.
+
+    Args:
+      url: Request URL
+      **kwargs: Passed to _request; the data body is replaced by its
+        compressed encoding
+
+    Returns:
+      The response of _request.
+    """
+    if self.compression is None:
+      return self._request("post", url, **kwargs)
+    body = kwargs.pop("data")
+    raw = body.encode("utf-8") if isinstance(body, str) else body
+    compressed = gzip.compress(raw, compresslevel=GZIP_COMPRESSLEVEL, mtime=0)
+    self.compression_stats.record(len(raw), len(compressed))
+    kwargs["headers"] = {
+        **(kwargs.get("headers") or {}),
+        "Content-Type": "application/json",
+        "Content-Encoding": self.compression,
+    }
+    return self._request("post", url, data=compressed, **kwargs)
+
   @abstractmethod
   def post_unstructured_logs(
       self,
@@ -160,16 +561,61 @@ class IngestionBackend(ABC):
   def get_base_url(self) -> str:
     """Get the base URL for API calls."""
 
+  def get_batch_sizer(
+      self, api: str, log_type: str, labels: list[dict[str, str]]
+  ) -> BatchSizer:
+    """Get the size accounting for batches of one logtype.
+
+    Sizes are measured on the encoded request body, so batches can be filled
+    close to max_request_bytes without exceeding it.
+
+    Args:
+      api: "unstructuredlogentries", "udmevents" or "entities"
+      log_type: Logtype of the entries
+      labels: Ingestion labels sent with every batch
+
+    Returns:
+      BatchSizer for the request bodies built by this backend.
+    """
+    envelope = self._get_request_envelope(api, log_type, labels)
+    max_bytes = int(self.max_request_bytes * (1 - REQUEST_BYTES_HEADROOM))
+    return BatchSizer(
+        max_bytes - _json_size(envelope),
+        self._get_entry_sizer(api, log_type, labels),
+    )
+
+  def _get_request_envelope(
+      self,
+      api: str,  # noqa: ARG002
+      log_type: str,  # noqa: ARG002
+      labels: list[dict[str, str]],  # noqa: ARG002
+  ) -> dict[str, Any]:
+    """Get the request body of a batch without any entries."""
+    return {}
+
+  def _get_entry_sizer(
+      self,
+      api: str,  # noqa: ARG002
+      log_type: str,  # noqa: ARG002
+      labels: list[dict[str, str]],  # noqa: ARG002
+  ) -> Callable[[Any], int]:
+    """Get a function returning the encoded size of one entry in a batch."""
+    return lambda entry: _json_size(entry) + _ITEM_SEPARATOR_BYTES
+
 
 class LegacyIngestionBackend(IngestionBackend):
   """Ingestion backend for the legacy Malachite Ingestion API."""
 
+  raw_json_apis = frozenset({"udmevents", "entities"})
+
   def get_base_url(self) -> str:
     """Get the base URL for legacy API based on region.
 
     Returns:
-      Base URL string for the regional legacy API endpoint.
+      Base URL string for the regional legacy API endpoint, or base_url.
     """
+    if self.base_url:
+      return self.base_url
     region = self.region.lower() if self.region else "us"
     return LEGACY_REGION_URL_MAP.get(
         region, "https://malachiteingestion-pa.googleapis.com"
@@ -198,26 +644,23 @@ class LegacyIngestionBackend(IngestionBackend):
     if labels:
       body["labels"] = labels
 
-    payload = json.dumps(body, ensure_ascii=True)
-    headers = {"Content-Type": "application/json"}
-    response = self.http_client.post(uri, data=payload, headers=headers)
+    response = self._post_batch(uri, data=codec.dumps(body), headers=JSON_HEADERS)
     self._check_response(response)
 
   def post_udm_events(
       self, entries: list[dict[str, Any]], labels: list[dict[str, str]]
   ) -> None:
-    """Post UDM events using legacy API."""
+    """Post UDM events using legacy API.
+
+    Events may be codec.RawJson, which are sent without re-encoding.
+    """
     uri = f"{self.get_base_url()}/v2/udmevents:batchCreate"
-    body = {
-        "customer_id": self.customer_id,
-        "events": entries,
-    }
+    body: dict[str, Any] = {"customer_id": self.customer_id}
     if labels:
       body["labels"] = labels
 
-    payload = json.dumps(body, ensure_ascii=True)
-    headers = {"Content-Type": "application/json"}
-    response = self.http_client.post(uri, data=payload, headers=headers)
+    data = _dumps_with_entries(body, "events", entries)
+    response = self._post_batch(uri, data=data, headers=JSON_HEADERS)
     self._check_response(response)
 
   def post_entities(
@@ -226,19 +669,31 @@ class LegacyIngestionBackend(IngestionBackend):
       entries: list[dict[str, Any]],
       labels: list[dict[str, str]],  # noqa: ARG002
   ) -> None:
-    """Post entities using legacy API."""
+    """Post entities using legacy API.
+
+    Entities may be codec.RawJson, which are sent without re-encoding.
+    """
     uri = f"{self.get_base_url()}/v2/entities:batchCreate"
-    body = {
-        "customer_id": self.customer_id,
-        "log_type": log_type,
-        "entities": entries,
-    }
+    body = {"customer_id": self.customer_id, "log_type": log_type}
 
-    payload = json.dumps(body, ensure_ascii=True)
-    headers = {"Content-Type": "application/json"}
-    response = self.http_client.post(uri, data=payload, headers=headers)
+    data = _dumps_with_entries(body, "entities", entries)
+    response = self._post_batch(uri, data=data, headers=JSON_HEADERS)
     self._check_response(response)
 
+  def _get_request_envelope(
+      self, api: str, log_type: str, labels: list[dict[str, str]]
+  ) -> dict[str, Any]:
+    """Get the request body of a batch without any entries."""
+    if api == "udmevents":
+      body = {"customer_id": self.customer_id, "events": []}
+    elif api == "entities":
+      return {"customer_id": self.customer_id, "log_type": log_type, "entities": []}
+    else:
+      body = {"customer_id": self.customer_id, "log_type": log_type, "entries": []}
+    if labels:
+      body["labels"] = labels
+    return body
+
   def _check_response(self, response: real_requests.Response) -> None:
     """Check API response for errors."""
     if response.status_code >= HTTP_STATUS_BAD_REQUEST:
@@ -261,6 +716,9 @@ class RestIngestionBackend(IngestionBackend):
       project_id: str,
       region: str | None = None,
       forwarder_name: str | None = None,
+      retry_policy: RetryPolicy | None = None,
+      compression: str | None = None,
+      base_url: str | None = None,
   ):
     """Initialize REST ingestion backend.
 
@@ -270,19 +728,28 @@ class RestIngestionBackend(IngestionBackend):
       project_id: Google Cloud project ID
       region: Geographic region for API endpoints
       forwarder_name: Name of the forwarder to use/create
+      retry_policy: How transient failures are retried (default RetryPolicy())
+      compression: Content-Encoding for batch request bodies, or None
+      base_url: URL to send requests to instead of the region's endpoint
     """
-    super().__init__(auth_handler, customer_id, region)
+    super().__init__(
+        auth_handler, customer_id, region, retry_policy, compression, base_url
+    )
     self.project_id = project_id
     self.forwarder_name = forwarder_name or "Logstory-REST-Forwarder"
     self._forwarder_id = None
     self._forwarder_cache = {}
+    # concurrent batches must not each create a forwarder
+    self._forwarder_lock = threading.Lock()
 
   def get_base_url(self) -> str:
     """Get the base URL for REST API based on region.
 
     Returns:
-      Base URL string for the regional REST API endpoint.
+      Base URL string for the regional REST API endpoint, or base_url.
     """
+    if self.base_url:
+      return self.base_url
     region = self.region.lower() if self.region else "us"
     resolved_region = REST_REGION_NAME_MAP.get(region, region)
     return f"https://{resolved_region}-chronicle.googleapis.com"
@@ -293,6 +760,12 @@ class RestIngestionBackend(IngestionBackend):
     Returns:
       Forwarder ID string.
     """
+    if self._forwarder_id:
+      return self._forwarder_id
+    with self._forwarder_lock:
+      return self._get_or_create_forwarder_locked()
+
+  def _get_or_create_forwarder_locked(self) -> str:
     if self._forwarder_id:
       return self._forwarder_id
 
@@ -308,7 +781,7 @@ class RestIngestionBackend(IngestionBackend):
 
     # Try to list existing forwarders
     list_url = f"{self.get_base_url()}/v1alpha/{parent}/forwarders"
-    response = self.http_client.get(list_url)
+    response = self._request("get", list_url)
 
     if response.status_code == HTTP_STATUS_OK:
       forwarders = response.json().get("forwarders", [])
@@ -333,7 +806,7 @@ class RestIngestionBackend(IngestionBackend):
         },
     }
 
-    response = self.http_client.post(create_url, json=payload)
+    response = self._request("post", create_url, json=payload)
     if response.status_code == HTTP_STATUS_OK:
       forwarder = response.json()
       self._forwarder_id = forwarder["name"].split("/")[-1]
@@ -362,32 +835,8 @@ class RestIngestionBackend(IngestionBackend):
     # REST API endpoint for log ingestion
     url = f"{self.get_base_url()}/v1alpha/{parent}/logTypes/{log_type}/logs:import"
 
-    # Convert entries to REST API format
-    logs = []
-    for entry in entries:
-      log_text = entry.get("logText", "")
-      sanitized_log = sanitize_log_text(log_text)
-      # Base64 encode the log text
-      encoded_log = base64.b64encode(sanitized_log.encode("utf-8")).decode("utf-8")
-
-      log_entry = {
-          "data": encoded_log,
-          "log_entry_time": datetime.now(UTC).isoformat(),
-          "collection_time": datetime.now(UTC).isoformat(),
-      }
-
-      # Add labels if provided
-      if labels:
-        log_entry["labels"] = {
-            label["key"]: {"value": label["value"]} for label in labels
-        }
-
-      logs.append(log_entry)
-
-    # Construct request payload
-    payload = {"inline_source": {"logs": logs, "forwarder": forwarder_resource}}
-
-    response = self.http_client.post(url, json=payload)
+    data = RestLogEncoder(forwarder_resource, labels).encode(entries)
+    response = self._post_batch(url, data=data, headers=JSON_HEADERS)
     self._check_response(response)
 
   def post_udm_events(
@@ -427,7 +876,7 @@ class RestIngestionBackend(IngestionBackend):
     # Format request body
     body = {"inline_source": {"events": events}}
 
-    response = self.http_client.post(url, json=body)
+    response = self._post_batch(url, data=codec.dumps(body), headers=JSON_HEADERS)
     self._check_response(response)
 
   def post_entities(
@@ -461,9 +910,68 @@ class RestIngestionBackend(IngestionBackend):
 
     body = {"inline_source": {"entities": entities}}
 
-    response = self.http_client.post(url, json=body)
+    response = self._post_batch(url, data=codec.dumps(body), headers=JSON_HEADERS)
     self._check_response(response)
 
+  def _get_request_envelope(
+      self,
+      api: str,
+      log_type: str,  # noqa: ARG002
+      labels: list[dict[str, str]],  # noqa: ARG002
+  ) -> dict[str, Any]:
+    """Get the request body of a batch without any entries."""
+    if api == "udmevents":
+      return {"inline_source": {"events": []}}
+    if api == "entities":
+      return {"inline_source": {"entities": []}}
+    parent = (
+        f"projects/{self.project_id}/locations/{self.region.lower()}"
+        f"/instances/{self.customer_id}"
+    )
+    forwarder_id = self._forwarder_id or "default"
+    return {
+        "inline_source": {
+            "logs": [],
+            "forwarder": f"{parent}/forwarders/{forwarder_id}",
+        }
+    }
+
+  def _get_entry_sizer(
+      self, api: str, log_type: str, labels: list[dict[str, str]]
+  ) -> Callable[[Any], int]:
+    """Get a function returning the encoded size of one entry in a batch.
+
+    Mirrors the wrapping done by the post_* methods: log text is base64
+    encoded and sent with two timestamps and the labels, UDM events may get
+    metadata added, and entities carry their logtype and labels.
+    """
+    if api == "udmevents":
+      added_metadata = {
+          "metadata": {},
+          "event_timestamp": _ISO_TIMESTAMP,
+          "id": str(uuid.UUID(int=0)),
+          "ingestion_labels": labels or [],
+      }
+      overhead = _json_size({"udm": None}) + _json_size(added_metadata)
+      return lambda entry: overhead + _json_size(entry) + _ITEM_SEPARATOR_BYTES
+    if api == "entities":
+      entity = {"entity": None, "log_type": log_type}
+      if labels:
+        entity["labels"] = {label["key"]: label["value"] for label in labels}
+      overhead = _json_size(entity) - len("null")
+      return lambda entry: overhead + _json_size(entry) + _ITEM_SEPARATOR_BYTES
+    log_entry = {
+        "data": "",
+        "log_entry_time": _ISO_TIMESTAMP,
+        "collection_time": _ISO_TIMESTAMP,
+    }
+    if labels:
+      log_entry["labels"] = {
+          label["key"]: {"value": label["value"]} for label in labels
+      }
+    overhead = _json_size(log_entry) + _ITEM_SEPARATOR_BYTES
+    return lambda entry: overhead + _base64_size(entry.get("logText", ""))
+
   def _check_response(self, response: real_requests.Response) -> None:
     """Check API response for errors."""
     if response.status_code >= HTTP_STATUS_BAD_REQUEST:
@@ -483,6 +991,9 @@ def create_ingestion_backend(
     project_id: str | None = None,
     region: str | None = None,
     forwarder_name: str | None = None,
+    retry_policy: RetryPolicy | None = None,
+    compression: str | None = None,
+    base_url: str | None = None,
 ) -> IngestionBackend:
   """Factory function to create the appropriate ingestion backend.
 
@@ -493,6 +1004,9 @@ def create_ingestion_backend(
     project_id: Google Cloud project ID (required for REST)
     region: Geographic region
     forwarder_name: Custom forwarder name (REST only)
+    retry_policy: How transient failures are retried
+    compression: Content-Encoding for batch request bodies ("gzip"), or None
+    base_url: URL to send requests to instead of the region's endpoint
 
   Returns:
     IngestionBackend instance for the selected API type
@@ -513,11 +1027,17 @@ def create_ingestion_backend(
         project_id=project_id,
         region=region,
         forwarder_name=forwarder_name,
+        retry_policy=retry_policy,
+        compression=compression,
+        base_url=base_url,
     )
   if api_type == "legacy":
     return LegacyIngestionBackend(
         auth_handler=auth_handler,
         customer_id=customer_id,
         region=region,
+        retry_policy=retry_policy,
+        compression=compression,
+        base_url=base_url,
     )
   raise ValueError(f"Unknown API type: {api_type}. Use 'legacy' or 'rest'.")
@@ -13,37 +13,56 @@
 # limitations under the License.
 """CLI for Logstory."""
 
+import concurrent.futures
+import dataclasses
 import datetime
 import glob
+import hashlib
 import json
 import os
 import shutil
 import subprocess  # nosec B404
 import tempfile
+import threading
+import time
 import uuid
-from importlib.metadata import version
-
-try:
-  from . import main as imported_main
-except ImportError:
-  import main as imported_main  # type: ignore[no-redef]
+from typing import TYPE_CHECKING
 
 import typer
-from dotenv import load_dotenv
-from google.auth.exceptions import DefaultCredentialsError
-from google.cloud import storage
-from google.oauth2 import service_account
 
-from logstory.auth import has_application_default_credentials
+if TYPE_CHECKING:
+  from google.cloud import storage
+
+from logstory.cache import (
+    read_json_cache,
+    read_json_file,
+    write_json_cache,
+    write_json_file,
+)
+from logstory.env import env_flag
 
 UTC = datetime.UTC
 
+# Per-usecase record of the source checksums of the installed files
+DOWNLOAD_MANIFEST = ".manifest.json"
+
+CATALOG_CACHE_VERSION = 1
+# Usecases listed in each source during this run
+_catalog: dict[str, list[str]] = {}
+# Sources listed in this run rather than read from the disk cache
+_listed_sources: set[str] = set()
+# GCS client of the run; sources are listed concurrently
+_storage_client: "storage.Client | None" = None
+_storage_client_lock = threading.Lock()
+
 DEFAULT_BUCKET = "gs://logstory-usecases-20241216"
 
 
 def version_callback(value: bool):
   """Callback to display version and exit."""
   if value:
+    from importlib.metadata import version  # noqa: PLC0415
+
     try:
       __version__ = version("logstory")
     except Exception:
@@ -92,6 +111,8 @@ def validate_credentials_file(value: str) -> str:
         f"File does not exist: {value}. "
         "Please provide the complete path to a JSON credentials file."
     )
+  from google.oauth2 import service_account  # noqa: PLC0415
+
   try:
     _ = service_account.Credentials.from_service_account_file(value)
     return value
@@ -105,12 +126,15 @@ def load_env_file(env_file: str | None = None) -> None:
     if not os.path.isfile(env_file):
       typer.echo(f"Warning: Specified .env file not found: {env_file}")
       return
-    load_dotenv(env_file)
-    typer.echo(f"Loaded environment from: {env_file}")
   # Try to load default .env file if it exists
   elif os.path.isfile(".env"):
-    load_dotenv(".env")
-    typer.echo("Loaded environment from: .env")
+    env_file = ".env"
+  else:
+    return
+  from dotenv import load_dotenv  # noqa: PLC0415
+
+  load_dotenv(env_file)
+  typer.echo(f"Loaded environment from: {env_file}")
 
 
 # Global options for replay commands
@@ -151,8 +175,67 @@ def get_timestamp_delta_default():
 
 def get_auto_get_default():
   """Get auto-get setting from environment variable."""
-  auto_get_value = os.getenv("LOGSTORY_AUTO_GET", "").lower()
-  return auto_get_value in ("true", "1", "yes", "on")
+  return env_flag("LOGSTORY_AUTO_GET")
+
+
+def get_max_in_flight_default():
+  """Get the number of concurrent batch posts from environment variable."""
+  return int(os.getenv("LOGSTORY_MAX_IN_FLIGHT", "1"))
+
+
+def get_workers_default():
+  """Get the number of replay worker processes from environment variable."""
+  return int(os.getenv("LOGSTORY_WORKERS", "1"))
+
+
+def get_chunk_workers_default():
+  """Get the number of chunk transformation processes from environment variable."""
+  return int(os.getenv("LOGSTORY_CHUNK_WORKERS", "1"))
+
+
+def get_eps_default():
+  """Get the target events per second from environment variable."""
+  return float(os.getenv("LOGSTORY_EPS", "0"))
+
+
+def get_bytes_per_sec_default():
+  """Get the target bytes per second from environment variable."""
+  return float(os.getenv("LOGSTORY_BYTES_PER_SEC", "0"))
+
+
+def get_realtime_default():
+  """Get real-time replay setting from environment variable."""
+  return env_flag("LOGSTORY_REALTIME")
+
+
+def get_speedup_default():
+  """Get the real-time replay speedup from environment variable."""
+  return float(os.getenv("LOGSTORY_SPEEDUP", "1"))
+
+
+def get_download_threads_default():
+  """Get the number of concurrent usecase file downloads from environment."""
+  return int(os.getenv("LOGSTORY_DOWNLOAD_THREADS", "8"))
+
+
+def get_catalog_ttl_default():
+  """Get how long, in seconds, cached usecase listings are used."""
+  return int(os.getenv("LOGSTORY_CATALOG_TTL", "3600"))
+
+
+def get_ordered_default():
+  """Get ordered batch posting setting from environment variable."""
+  return env_flag("LOGSTORY_ORDERED")
+
+
+def get_adaptive_default():
+  """Get adaptive batch posting setting from environment variable."""
+  return env_flag("LOGSTORY_ADAPTIVE")
+
+
+def get_save_tuning_default():
+  """Get save tuning setting from environment variable."""
+  return env_flag("LOGSTORY_SAVE_TUNING")
 
 
 def parse_usecase_source(source_uri: str) -> tuple[str, str]:
@@ -255,12 +338,121 @@ UsecasesBucketOption = typer.Option(
     help="Usecase source URI (gs://bucket, git@repo, etc.) - overrides config list",
 )
 
+RefreshOption = typer.Option(
+    False,
+    "--refresh",
+    help=(
+        "List the sources again instead of using listings cached for "
+        "LOGSTORY_CATALOG_TTL seconds"
+    ),
+)
+
 LocalFileOutputOption = typer.Option(
     False,
     "--local-file-output",
     help="Write logs to local files instead of sending to API",
 )
 
+MaxInFlightOption = typer.Option(
+    get_max_in_flight_default,
+    "--max-in-flight",
+    min=1,
+    help=(
+        "Maximum number of batches posted to the ingestion API at once "
+        "(Default=1, one batch at a time). (env: LOGSTORY_MAX_IN_FLIGHT)"
+    ),
+)
+
+WorkersOption = typer.Option(
+    get_workers_default,
+    "--workers",
+    min=1,
+    help=(
+        "Number of processes replaying logtypes in parallel, each with its own "
+        "connection and --max-in-flight batches (Default=1, one logtype at a "
+        "time). (env: LOGSTORY_WORKERS)"
+    ),
+)
+
+ChunkWorkersOption = typer.Option(
+    get_chunk_workers_default,
+    "--chunk-workers",
+    min=1,
+    help=(
+        "Number of processes transforming each local log file larger than 32 MB "
+        "in chunks; the output is the same as with one (Default=1, line by line). "
+        "(env: LOGSTORY_CHUNK_WORKERS)"
+    ),
+)
+
+OrderedOption = typer.Option(
+    get_ordered_default,
+    "--ordered/--unordered",
+    help=(
+        "With --max-in-flight > 1, post each logtype's batches one after another "
+        "in file order; different logtypes still overlap. (env: LOGSTORY_ORDERED)"
+    ),
+)
+
+AdaptiveOption = typer.Option(
+    get_adaptive_default,
+    "--adaptive/--no-adaptive",
+    help=(
+        "Grow batch size and batches in flight while the API keeps up and back "
+        "off on throttling or slow responses; --max-in-flight becomes the "
+        "ceiling. (env: LOGSTORY_ADAPTIVE)"
+    ),
+)
+
+SaveTuningOption = typer.Option(
+    get_save_tuning_default,
+    "--save-tuning/--no-save-tuning",
+    help=(
+        "With --adaptive, start from the batch size and concurrency the previous "
+        "run settled at, and save this run's. (env: LOGSTORY_SAVE_TUNING)"
+    ),
+)
+
+EpsOption = typer.Option(
+    get_eps_default,
+    "--eps",
+    min=0,
+    help=(
+        "Post at this many events per second, across all workers, and report "
+        "the rate achieved (Default=0, as fast as possible). (env: LOGSTORY_EPS)"
+    ),
+)
+
+BytesPerSecOption = typer.Option(
+    get_bytes_per_sec_default,
+    "--bytes-per-sec",
+    min=0,
+    help=(
+        "Post at this many bytes of entries per second, across all workers "
+        "(Default=0, as fast as possible). (env: LOGSTORY_BYTES_PER_SEC)"
+    ),
+)
+
+RealtimeOption = typer.Option(
+    get_realtime_default,
+    "--realtime/--no-realtime",
+    help=(
+        "Post each event when its updated timestamp comes due, with the "
+        "usecase's logtypes interleaved like a live source, instead of as fast "
+        "as possible. (env: LOGSTORY_REALTIME)"
+    ),
+)
+
+SpeedupOption = typer.Option(
+    get_speedup_default,
+    "--speedup",
+    help=(
+        "With --realtime, replay this many times faster than the original "
+        "pace, e.g. 60 plays an hour of logs in a minute (Default=1). "
+        "(env: LOGSTORY_SPEEDUP)"
+    ),
+)
+
 ApiTypeOption = typer.Option(
     None,
     "--api-type",
@@ -418,21 +610,41 @@ def _get_blobs(source_uri, usecase=None):
   raise ValueError(f"Unsupported source type: {source_type}")
 
 
-def _get_gcs_blobs(bucket_name, usecase=None):
-  """Get blobs from GCS bucket, trying authenticated client first."""
-  client = None
+def _get_storage_client() -> "storage.Client":
+  """Get the GCS client shared by every listing and download of the run.
+
+  The client is created once, even when several sources are listed at the
+  same time.
+  """
+  global _storage_client  # noqa: PLW0603
+  if _storage_client is None:
+    with _storage_client_lock:
+      if _storage_client is None:
+        _storage_client = _create_storage_client()
+  return _storage_client
+
+
+def _create_storage_client() -> "storage.Client":
+  """Create a GCS client.
+
+  Tries application default credentials first, then falls back to an
+  anonymous client for public buckets.
+  """
+  from google.auth.exceptions import DefaultCredentialsError  # noqa: PLC0415
+  from google.cloud import storage  # noqa: PLC0415
 
-  # Try application default credentials first
   try:
-    client = storage.Client()
+    return storage.Client()
   except DefaultCredentialsError:
-    # Fall back to anonymous client for public buckets
     try:
-      client = storage.Client.create_anonymous_client()
+      return storage.Client.create_anonymous_client()
     except Exception as e:
       raise Exception(f"Could not create GCS client: {e}") from e
 
-  bucket = client.bucket(bucket_name)
+
+def _get_gcs_blobs(bucket_name, usecase=None):
+  """Get blobs from GCS bucket, trying authenticated client first."""
+  bucket = _get_storage_client().bucket(bucket_name)
   if usecase:
     blobs = bucket.list_blobs(prefix=usecase)
   else:
@@ -441,11 +653,21 @@ def _get_gcs_blobs(bucket_name, usecase=None):
 
 
 class _FileBlob:
-  """Mock blob object for file system operations."""
+  """Mock blob object for file system operations.
+
+  Local files have no checksums, so md5_hash and crc32c are None and
+  downloads are skipped by size and modification time instead.
+  """
+
+  md5_hash = None
+  crc32c = None
 
   def __init__(self, name: str, file_path: str):
     self.name = name
     self._file_path = file_path
+    stat = os.stat(file_path)
+    self.size = stat.st_size
+    self.updated = datetime.datetime.fromtimestamp(stat.st_mtime, UTC)
 
   def download_to_filename(self, destination: str):
     """Copy file from source to destination."""
@@ -510,6 +732,7 @@ def _get_file_blobs(directory_path, usecase=None):
 def list_bucket_directories(
     env_file: str | None = EnvFileOption,
     bucket: str = UsecasesBucketOption,
+    refresh: bool = RefreshOption,
 ):
   """List usecases available for download from configured sources."""
   # Load environment file
@@ -519,21 +742,14 @@ def list_bucket_directories(
 
   all_usecases = set()
 
-  for source_uri in buckets:
-    try:
-      blobs = _get_blobs(source_uri)
-      print(f"\nAvailable usecases in source '{source_uri}':")
-      for blob in blobs.pages:
-        prefixes = blob.prefixes
-        for prefix in prefixes:
-          if "docs" in prefix:
-            continue
-          prefix = prefix.strip("/")
-          print(f"- {prefix}")
-          all_usecases.add(prefix)
-    except Exception as e:
-      print(f"Warning: Could not access source '{source_uri}': {e}")
+  for source_uri, directories in _get_catalog(buckets, refresh).items():
+    if isinstance(directories, Exception):
+      print(f"Warning: Could not access source '{source_uri}': {directories}")
       continue
+    print(f"\nAvailable usecases in source '{source_uri}':")
+    for directory in directories:
+      print(f"- {directory}")
+      all_usecases.add(directory)
 
   if len(buckets) > 1:
     print(f"\nAll available usecases: {', '.join(sorted(all_usecases))}")
@@ -541,8 +757,8 @@ def list_bucket_directories(
   return list(all_usecases)
 
 
-def _get_source_directories(source_uri: str) -> list[str]:
-  """Helper function to get source directories without printing."""
+def _list_source_directories(source_uri: str) -> list[str]:
+  """List the usecase directories of a source."""
   blobs = _get_blobs(source_uri)
   top_level_directories = []
   for blob in blobs.pages:
@@ -555,38 +771,251 @@ def _get_source_directories(source_uri: str) -> list[str]:
   return top_level_directories
 
 
+def _get_source_directories(source_uri: str, refresh: bool = False) -> list[str]:
+  """Get the usecase directories of a source, listing it at most once per run.
+
+  Listings of remote sources are also cached on disk for
+  LOGSTORY_CATALOG_TTL seconds (0 disables this). Bucket listings have no
+  ETag to revalidate against, so callers that miss a usecase in a cached
+  listing should ask again with refresh=True.
+
+  Args:
+    source_uri: Usecase source URI.
+    refresh: List the source even if a listing is cached.
+
+  Returns:
+    Names of the usecases in the source.
+  """
+  if not refresh and source_uri in _catalog:
+    return list(_catalog[source_uri])
+
+  source_type, _ = parse_usecase_source(source_uri)
+  ttl = get_catalog_ttl_default() if source_type != "file" else 0
+  digest = hashlib.sha256(source_uri.encode()).hexdigest()[:16]
+  cache_name = f"catalog/v{CATALOG_CACHE_VERSION}-{digest}.json"
+  cached = read_json_cache(cache_name) if ttl > 0 and not refresh else None
+  if (
+      isinstance(cached, dict)
+      and cached.get("source") == source_uri
+      and 0 <= time.time() - cached.get("listed_at", 0) < ttl
+  ):
+    directories = cached["directories"]
+  else:
+    directories = _list_source_directories(source_uri)
+    _listed_sources.add(source_uri)
+    if ttl > 0:
+      write_json_cache(
+          cache_name,
+          {"source": source_uri, "listed_at": time.time(), "directories": directories},
+      )
+  _catalog[source_uri] = directories
+  return list(directories)
+
+
+def _get_catalog(
+    sources: list[str], refresh: bool = False
+) -> dict[str, list[str] | Exception]:
+  """Get the usecase directories of several sources, listed concurrently.
+
+  Args:
+    sources: Usecase source URIs.
+    refresh: List the sources even if listings are cached.
+
+  Returns:
+    The usecases of each source, in the order given, or the error that
+    prevented listing it.
+  """
+  if not sources:
+    return {}
+  with concurrent.futures.ThreadPoolExecutor(max_workers=len(sources)) as executor:
+    futures = {
+        source_uri: executor.submit(_get_source_directories, source_uri, refresh)
+        for source_uri in sources
+    }
+  catalog = {}
+  for source_uri, future in futures.items():
+    try:
+      catalog[source_uri] = future.result()
+    except Exception as e:
+      catalog[source_uri] = e
+  return catalog
+
+
 def _get_all_source_directories() -> list[str]:
   """Helper function to get directories from all configured sources."""
-  sources = get_usecases_buckets()
   all_directories = set()
 
-  for source_uri in sources:
-    try:
-      directories = _get_source_directories(source_uri)
-      all_directories.update(directories)
-    except Exception as e:
+  for source_uri, directories in _get_catalog(get_usecases_buckets()).items():
+    if isinstance(directories, Exception):
       # Skip inaccessible sources, but log the error
-      typer.echo(f"Debug: Could not access source '{source_uri}': {e}", err=True)
+      typer.echo(
+          f"Debug: Could not access source '{source_uri}': {directories}", err=True
+      )
       continue
+    all_directories.update(directories)
 
   return list(all_directories)
 
 
-def _download_usecase(usecase: str, bucket: str = None) -> bool:
+def _get_usecases_dir() -> str:
+  """Get the directory usecases are installed in."""
+  return os.path.join(os.path.dirname(os.path.abspath(__file__)), "usecases")
+
+
+def _get_blob_fingerprint(blob) -> dict[str, str | int | None]:
+  """Get what identifies a blob's content: its checksums, else size and mtime."""
+  if blob.md5_hash or blob.crc32c:
+    return {"md5_hash": blob.md5_hash, "crc32c": blob.crc32c, "size": blob.size}
+  updated = blob.updated.isoformat() if blob.updated else None
+  return {"size": blob.size, "updated": updated}
+
+
+@dataclasses.dataclass
+class DownloadStats:
+  """Totals of a usecase download.
+
+  Attributes:
+    downloaded: Files fetched from the source.
+    skipped: Installed files whose source checksums were unchanged.
+    bytes: Bytes fetched.
+    seconds: Wall time of the download.
+  """
+
+  downloaded: int = 0
+  skipped: int = 0
+  bytes: int = 0
+  seconds: float = 0.0
+
+  def summary(self) -> str:
+    """Get a one-line report of the download."""
+    rate = self.bytes / self.seconds / 1e6 if self.seconds else 0.0
+    return (
+        f"Downloaded {self.downloaded} files ({self.bytes / 1e6:.1f} MB) in "
+        f"{self.seconds:.1f}s, {rate:.1f} MB/s; "
+        f"{self.skipped} unchanged files skipped"
+    )
+
+
+def _download_blob(blob, destination: str) -> int:
+  """Download a blob through a temporary file, so readers never see a partial one.
+
+  Returns:
+    Size of the downloaded file in bytes.
+  """
+  directory, name = os.path.split(destination)
+  os.makedirs(directory, exist_ok=True)
+  fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+  os.close(fd)
+  try:
+    blob.download_to_filename(tmp_path)
+    os.replace(tmp_path, destination)
+  except BaseException:
+    os.unlink(tmp_path)
+    raise
+  return os.path.getsize(destination)
+
+
+def _download_blobs(usecase: str, blobs, threads: int | None = None) -> DownloadStats:
+  """Download a usecase's blobs in parallel, skipping unchanged installed files.
+
+  A blob is fetched unless the usecase's manifest recorded the same
+  fingerprint for it and the installed file still has the recorded size.
+  The manifest is updated with every file that was downloaded, even if
+  others failed.
+
+  Args:
+    usecase: Name of the usecase.
+    blobs: Source blobs of the usecase.
+    threads: Concurrent downloads. Defaults to LOGSTORY_DOWNLOAD_THREADS.
+
+  Returns:
+    Totals of the download.
+
+  Raises:
+    Exception: The first download error, once all other downloads finished.
+  """
+  threads = threads or get_download_threads_default()
+  usecases_dir = _get_usecases_dir()
+  manifest_path = os.path.join(usecases_dir, usecase, DOWNLOAD_MANIFEST)
+  old_manifest = read_json_file(manifest_path) or {}
+  manifest = {}
+  stats = DownloadStats()
+  to_download = []
+  for blob in blobs:
+    if blob.name.endswith("/"):
+      continue
+    destination = os.path.join(usecases_dir, blob.name)
+    fingerprint = _get_blob_fingerprint(blob)
+    if (
+        old_manifest.get(blob.name) == fingerprint
+        and os.path.isfile(destination)
+        and os.path.getsize(destination) == fingerprint["size"]
+    ):
+      manifest[blob.name] = fingerprint
+      stats.skipped += 1
+    else:
+      to_download.append((blob, destination, fingerprint))
+
+  start = time.perf_counter()
+  errors = []
+  with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+    futures = {}
+    for blob, destination, fingerprint in to_download:
+      print(f"Downloading {blob.name} to {destination}")
+      future = executor.submit(_download_blob, blob, destination)
+      futures[future] = (blob.name, fingerprint)
+    for future in concurrent.futures.as_completed(futures):
+      name, fingerprint = futures[future]
+      try:
+        stats.bytes += future.result()
+      except Exception as e:
+        errors.append(e)
+        continue
+      manifest[name] = fingerprint
+      stats.downloaded += 1
+  stats.seconds = time.perf_counter() - start
+
+  if manifest != old_manifest:
+    write_json_file(manifest_path, manifest)
+  if errors:
+    raise errors[0]
+  return stats
+
+
+def _find_usecase_source(
+    usecase: str, catalog: dict[str, list[str] | Exception]
+) -> str | None:
+  """Get the first source of a catalog holding a usecase, if any."""
+  for source_uri, available_usecases in catalog.items():
+    if isinstance(available_usecases, Exception):
+      typer.echo(
+          f"Debug: Could not access source '{source_uri}': {available_usecases}",
+          err=True,
+      )
+    elif usecase in available_usecases:
+      return source_uri
+  return None
+
+
+def _download_usecase(
+    usecase: str, bucket: str = None, threads: int | None = None
+) -> bool:
   """Download a usecase from configured sources. Returns True if successful."""
   sources = [bucket] if bucket else get_usecases_buckets()
 
-  # Find which source(s) contain the usecase
-  found_source = None
-  for source_uri in sources:
-    try:
-      available_usecases = _get_source_directories(source_uri)
-      if usecase in available_usecases:
-        found_source = source_uri
-        break
-    except Exception as e:
-      typer.echo(f"Debug: Could not access source '{source_uri}': {e}", err=True)
-      continue
+  # Find which source contains the usecase, listing again the sources whose
+  # cached listing may predate it
+  catalog = _get_catalog(sources)
+  found_source = _find_usecase_source(usecase, catalog)
+  cached_sources = [
+      source_uri
+      for source_uri, directories in catalog.items()
+      if not isinstance(directories, Exception) and source_uri not in _listed_sources
+  ]
+  if not found_source and cached_sources:
+    found_source = _find_usecase_source(
+        usecase, _get_catalog(cached_sources, refresh=True)
+    )
 
   if not found_source:
     typer.echo(f"Error: Usecase '{usecase}' not found in any configured source")
@@ -597,16 +1026,8 @@ def _download_usecase(usecase: str, bucket: str = None) -> bool:
 
   # Download from the found source
   print(f"Downloading usecase '{usecase}' from source '{found_source}'")
-  blob_list = _get_blobs(found_source, usecase)
-  for blob in blob_list:
-    if blob.name.endswith("/"):
-      continue
-    destination_file_name = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), "usecases/", blob.name
-    )
-    os.makedirs(os.path.dirname(destination_file_name), exist_ok=True)
-    print(f"Downloading {blob.name} to {destination_file_name}")
-    blob.download_to_filename(destination_file_name)
+  stats = _download_blobs(usecase, _get_blobs(found_source, usecase), threads)
+  print(stats.summary())
 
   return True
 
@@ -622,17 +1043,17 @@ def _download_all_usecases(bucket: str = None) -> int:
   """
   sources = [bucket] if bucket else get_usecases_buckets()
 
-  # Get all available usecases from sources
-  available_usecases = set()
-  for source_uri in sources:
-    try:
-      directories = _get_source_directories(source_uri)
-      available_usecases.update(directories)
-      typer.echo(f"Found {len(directories)} usecases in source '{source_uri}'")
-    except Exception as e:
-      typer.echo(f"Warning: Could not access source '{source_uri}': {e}")
+  # Get all available usecases from sources, and the first source of each
+  usecase_sources = {}
+  for source_uri, directories in _get_catalog(sources).items():
+    if isinstance(directories, Exception):
+      typer.echo(f"Warning: Could not access source '{source_uri}': {directories}")
       continue
+    for directory in directories:
+      usecase_sources.setdefault(directory, source_uri)
+    typer.echo(f"Found {len(directories)} usecases in source '{source_uri}'")
 
+  available_usecases = set(usecase_sources)
   if not available_usecases:
     typer.echo("No usecases found in any configured source")
     return 0
@@ -655,7 +1076,7 @@ def _download_all_usecases(bucket: str = None) -> int:
   downloaded_count = 0
   for usecase in sorted(to_download):
     typer.echo(f"\nDownloading usecase '{usecase}'...")
-    if _download_usecase(usecase, bucket):
+    if _download_usecase(usecase, usecase_sources[usecase]):
       downloaded_count += 1
     else:
       typer.echo(f"Failed to download usecase '{usecase}'")
@@ -726,8 +1147,13 @@ def _load_and_validate_params(
   )
 
   # Check if ADC is available when using impersonation with REST API
-  has_adc = has_application_default_credentials()
-  can_use_adc = has_adc and final_impersonate and final_api_type == "rest"
+  from logstory.auth import has_application_default_credentials  # noqa: PLC0415
+
+  can_use_adc = (
+      bool(final_impersonate)
+      and final_api_type == "rest"
+      and has_application_default_credentials()
+  )
 
   # STRICT VALIDATION for REST API
   if final_api_type == "rest":
@@ -773,7 +1199,7 @@ def _load_and_validate_params(
         " and LOGSTORY_CUSTOMER_ID"
     )
     typer.echo("  3. .env file with --env-file option")
-    if final_impersonate and final_api_type == "rest" and not has_adc:
+    if final_impersonate and final_api_type == "rest" and not can_use_adc:
       typer.echo(
           "  4. Application Default Credentials (run 'gcloud auth application-default"
           " login')"
@@ -848,6 +1274,16 @@ def replay_all_usecases(
         ),
     ),
     usecases_bucket: str | None = UsecasesBucketOption,
+    workers: int = WorkersOption,
+    chunk_workers: int = ChunkWorkersOption,
+    max_in_flight: int = MaxInFlightOption,
+    ordered: bool = OrderedOption,
+    adaptive: bool = AdaptiveOption,
+    save_tuning: bool = SaveTuningOption,
+    eps: float = EpsOption,
+    bytes_per_sec: float = BytesPerSecOption,
+    realtime: bool = RealtimeOption,
+    speedup: float = SpeedupOption,
 ):
   """Replay all usecases."""
   # Load environment file first (needed for download logic)
@@ -896,7 +1332,23 @@ def replay_all_usecases(
     )
 
   usecases = get_usecases()
-  _replay_usecases(usecases, "*", entities, timestamp_delta, local_file_output)
+  _replay_usecases(
+      usecases,
+      "*",
+      entities,
+      timestamp_delta,
+      local_file_output,
+      max_in_flight,
+      ordered,
+      adaptive,
+      save_tuning,
+      workers,
+      chunk_workers,
+      eps,
+      bytes_per_sec,
+      realtime,
+      speedup,
+  )
 
 
 @replay_app.command("usecase")
@@ -921,6 +1373,16 @@ def replay_usecase(
     project_id: str | None = ProjectIdOption,
     forwarder_name: str | None = ForwarderNameOption,
     impersonate_service_account: str | None = ImpersonateServiceAccountOption,
+    workers: int = WorkersOption,
+    chunk_workers: int = ChunkWorkersOption,
+    max_in_flight: int = MaxInFlightOption,
+    ordered: bool = OrderedOption,
+    adaptive: bool = AdaptiveOption,
+    save_tuning: bool = SaveTuningOption,
+    eps: float = EpsOption,
+    bytes_per_sec: float = BytesPerSecOption,
+    realtime: bool = RealtimeOption,
+    speedup: float = SpeedupOption,
 ):
   """Replay a specific usecase."""
   # Load environment file first (needed for download logic)
@@ -982,7 +1444,23 @@ def replay_usecase(
   if not logtypes:
     print(f"No logs found for usecase '{usecase}'")
     raise typer.Exit(1)
-  _replay_usecases(usecases, logtypes, entities, timestamp_delta, local_file_output)
+  _replay_usecases(
+      usecases,
+      logtypes,
+      entities,
+      timestamp_delta,
+      local_file_output,
+      max_in_flight,
+      ordered,
+      adaptive,
+      save_tuning,
+      workers,
+      chunk_workers,
+      eps,
+      bytes_per_sec,
+      realtime,
+      speedup,
+  )
 
 
 @replay_app.command("logtype")
@@ -1000,6 +1478,16 @@ def replay_usecase_logtype(
     project_id: str | None = ProjectIdOption,
     forwarder_name: str | None = ForwarderNameOption,
     impersonate_service_account: str | None = ImpersonateServiceAccountOption,
+    workers: int = WorkersOption,
+    chunk_workers: int = ChunkWorkersOption,
+    max_in_flight: int = MaxInFlightOption,
+    ordered: bool = OrderedOption,
+    adaptive: bool = AdaptiveOption,
+    save_tuning: bool = SaveTuningOption,
+    eps: float = EpsOption,
+    bytes_per_sec: float = BytesPerSecOption,
+    realtime: bool = RealtimeOption,
+    speedup: float = SpeedupOption,
 ):
   """Replay specific logtypes from a usecase."""
   # Skip credential validation if using local file output
@@ -1037,7 +1525,42 @@ def replay_usecase_logtype(
 
   usecases = [usecase]
   logtype_list = [lt.strip() for lt in logtypes.split(",")]
-  _replay_usecases(usecases, logtype_list, entities, timestamp_delta, local_file_output)
+  _replay_usecases(
+      usecases,
+      logtype_list,
+      entities,
+      timestamp_delta,
+      local_file_output,
+      max_in_flight,
+      ordered,
+      adaptive,
+      save_tuning,
+      workers,
+      chunk_workers,
+      eps,
+      bytes_per_sec,
+      realtime,
+      speedup,
+  )
+
+
+def _echo_udm_search(use_case: str, logstory_exe_time: datetime.datetime) -> None:
+  """Prints the UDM search that finds a replayed usecase's logs."""
+  typer.echo(f"""UDM Search for the loaded logs:
+    metadata.ingested_timestamp.seconds >= {int(logstory_exe_time.timestamp())}
+    metadata.ingestion_labels["log_replay"]="true"
+    metadata.ingestion_labels["replayed_from"]="logstory"
+    metadata.ingestion_labels["source_usecase"]="{use_case}"
+    """)
+
+
+def _get_usecase_logtypes(
+    use_case: str, logtypes: list[str] | str, entities: bool
+) -> list[str]:
+  """Gets the logtypes of a usecase to replay; "*" means all of them."""
+  if logtypes == "*":
+    return _get_logtypes(use_case, entities=entities)
+  return logtypes if isinstance(logtypes, list) else [logtypes]
 
 
 def _replay_usecases(
@@ -1046,41 +1569,177 @@ def _replay_usecases(
     entities: bool,
     timestamp_delta: str | None,
     local_file_output: bool = False,
+    max_in_flight: int = 1,
+    ordered: bool = False,
+    adaptive: bool = False,
+    save_tuning: bool = False,
+    workers: int = 1,
+    chunk_workers: int = 1,
+    eps: float = 0,
+    bytes_per_sec: float = 0,
+    realtime: bool = False,
+    speedup: float = 1,
 ):
   """Core replay logic shared by replay commands."""
   logstory_exe_time = _get_current_time()
+  if realtime:
+    if local_file_output:
+      typer.echo(
+          "Error: --realtime posts to the ingestion API and cannot be used with "
+          "--local-file-output",
+          err=True,
+      )
+      raise typer.Exit(1)
+    if speedup <= 0:
+      typer.echo(f"Error: --speedup must be positive, got {speedup}", err=True)
+      raise typer.Exit(1)
+    if workers > 1:
+      typer.echo("--realtime replays each usecase as one timeline; ignoring --workers")
+      workers = 1
+  if workers > 1:
+    _replay_usecases_in_processes(
+        usecases,
+        logtypes,
+        entities,
+        timestamp_delta,
+        logstory_exe_time,
+        local_file_output,
+        max_in_flight,
+        ordered,
+        adaptive,
+        save_tuning,
+        workers,
+        chunk_workers,
+        eps,
+        bytes_per_sec,
+    )
+    return
+  # imported on use, like the Google Cloud SDKs, to keep the CLI's startup fast
+  from logstory import main as imported_main  # noqa: PLC0415
+
   logs_loaded = False
 
-  for use_case in usecases:
-    if logtypes == "*":
-      current_logtypes = _get_logtypes(use_case, entities=entities)
-    else:
-      current_logtypes = logtypes if isinstance(logtypes, list) else [logtypes]
+  backend = imported_main.get_replay_context().ingestion_backend
+  controller = None
+  if adaptive and backend is not None:
+    controller = imported_main.AdaptiveController.for_backend(
+        backend, max_in_flight, save_tuning
+    )
+  # one poster for the whole replay, so logtypes can overlap their posting
+  with imported_main.BatchPoster(
+      backend,
+      max_in_flight,
+      ordered,
+      controller=controller,
+      rate_limiter=imported_main.RateLimiter.for_rates(eps, bytes_per_sec),
+  ) as poster:
+    for use_case in usecases:
+      current_logtypes = _get_usecase_logtypes(use_case, logtypes, entities)
+      if realtime:
+        current_logtypes = [log_type.strip() for log_type in current_logtypes]
+        typer.echo(
+            f"Replaying usecase: {use_case} in real time at {speedup:g}x, "
+            f"logtypes: {', '.join(current_logtypes)}"
+        )
+        imported_main.usecase_replay_realtime(
+            use_case,
+            current_logtypes,
+            logstory_exe_time,
+            poster,
+            timestamp_delta=timestamp_delta,
+            entities=entities,
+            speedup=speedup,
+        )
+        _echo_udm_search(use_case, logstory_exe_time)
+        continue
 
-    old_base_time = None
-    for log_type in current_logtypes:
       old_base_time = None
-      log_type = log_type.strip()
-      typer.echo(f"Processing usecase: {use_case}, logtype: {log_type}")
+      for log_type in current_logtypes:
+        old_base_time = None
+        log_type = log_type.strip()
+        typer.echo(f"Processing usecase: {use_case}, logtype: {log_type}")
+
+        old_base_time = imported_main.usecase_replay_logtype(
+            use_case,
+            log_type,
+            logstory_exe_time,
+            old_base_time,
+            timestamp_delta=timestamp_delta,
+            entities=entities,
+            local_file_output=local_file_output,
+            poster=poster,
+            chunk_workers=chunk_workers,
+        )
+        logs_loaded = True
+
+      if logs_loaded:
+        _echo_udm_search(use_case, logstory_exe_time)
+
+
+def _replay_usecases_in_processes(
+    usecases: list[str],
+    logtypes: list[str] | str,
+    entities: bool,
+    timestamp_delta: str | None,
+    logstory_exe_time: datetime.datetime,
+    local_file_output: bool,
+    max_in_flight: int,
+    ordered: bool,
+    adaptive: bool,
+    save_tuning: bool,
+    workers: int,
+    chunk_workers: int = 1,
+    eps: float = 0,
+    bytes_per_sec: float = 0,
+):
+  """Replays every (usecase, logtype) as a job in a pool of worker processes.
 
-      old_base_time = imported_main.usecase_replay_logtype(
+  Workers read their credentials and settings from the environment set up by
+  the replay command. A failed logtype does not stop the others; the command
+  exits with an error once all have finished.
+  """
+  from logstory import main as imported_main  # noqa: PLC0415
+
+  jobs = [
+      imported_main.ReplayJob(
           use_case,
-          log_type,
+          log_type.strip(),
           logstory_exe_time,
-          old_base_time,
           timestamp_delta=timestamp_delta,
           entities=entities,
           local_file_output=local_file_output,
+          max_in_flight=max_in_flight,
+          ordered=ordered,
+          adaptive=adaptive,
+          save_tuning=save_tuning,
+          chunk_workers=chunk_workers,
+          eps=eps,
+          bytes_per_sec=bytes_per_sec,
+      )
+      for use_case in usecases
+      for log_type in _get_usecase_logtypes(use_case, logtypes, entities)
+  ]
+  typer.echo(f"Replaying {len(jobs)} logtypes with {workers} workers")
+  loaded = set()
+  failures = []
+  for result in imported_main.replay_jobs(jobs, workers):
+    job = result.job
+    if result.error:
+      typer.echo(
+          f"Failed usecase: {job.use_case}, logtype: {job.log_type}: {result.error}",
+          err=True,
       )
-      logs_loaded = True
+      failures.append(result)
+    else:
+      typer.echo(f"Replayed usecase: {job.use_case}, logtype: {job.log_type}")
+      loaded.add(job.use_case)
 
-    if logs_loaded:
-      typer.echo(f"""UDM Search for the loaded logs:
-    metadata.ingested_timestamp.seconds >= {int(logstory_exe_time.timestamp())}
-    metadata.ingestion_labels["log_replay"]="true"
-    metadata.ingestion_labels["replayed_from"]="logstory"
-    metadata.ingestion_labels["source_usecase"]="{use_case}"
-    """)
+  for use_case in usecases:
+    if use_case in loaded:
+      _echo_udm_search(use_case, logstory_exe_time)
+  if failures:
+    typer.echo(f"Error: {len(failures)} of {len(jobs)} logtypes failed", err=True)
+    raise typer.Exit(1)
 
 
 def entry_point():
@@ -13,35 +13,68 @@
 # limitations under the License.
 """Logstory Events replay."""
 
+import collections
+import concurrent.futures
+import dataclasses
 import datetime
+import functools
+import hashlib
+import heapq
+import itertools
 import json
+import multiprocessing
+import operator
 import os
 import re
+import threading
+import time
+from collections.abc import Iterable, Iterator
 from pathlib import Path
-from typing import Any, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
 import yaml
-from google.auth.transport import requests
-from google.cloud import secretmanager, storage
-from google.oauth2 import service_account
+
+if TYPE_CHECKING:
+  from google.cloud import storage
 
 # Import the new abstraction modules
 try:
+  from . import codec
   from .auth import (
       create_auth_handler,
       detect_auth_type,
       has_application_default_credentials,
   )
-  from .ingestion import IngestionBackend, create_ingestion_backend, sanitize_log_text
+  from .cache import read_json_cache, write_json_cache
+  from .env import env_flag
+  from .ingestion import (
+      BatchSizer,
+      CompressionStats,
+      IngestionBackend,
+      RetryPolicy,
+      RetryStats,
+      create_ingestion_backend,
+      sanitize_log_text,
+  )
 except ImportError:
   # Fallback for when running as main module
+  import codec  # type: ignore[no-redef]
   from auth import (  # type: ignore[import-not-found,no-redef]
       create_auth_handler,
       detect_auth_type,
       has_application_default_credentials,
   )
+  from cache import (  # type: ignore[import-not-found,no-redef]
+      read_json_cache,
+      write_json_cache,
+  )
+  from env import env_flag  # type: ignore[import-not-found,no-redef]
   from ingestion import (  # type: ignore[import-not-found,no-redef]
+      BatchSizer,
+      CompressionStats,
       IngestionBackend,
+      RetryPolicy,
+      RetryStats,
       create_ingestion_backend,
       sanitize_log_text,
   )
@@ -67,12 +100,24 @@ class MatchLike(Protocol):
 # Constants
 DEFAULT_YEAR_FOR_INCOMPLETE_TIMESTAMPS = 1900
 BATCH_SIZE_THRESHOLD = 1000
+# Batch size limit when the backend cannot measure its encoded requests
 BATCH_BYTES_THRESHOLD = 500_000
 # Windows epoch (Jan 1, 1601) in Unix epoch (Jan 1, 1970) seconds
 # This is the difference in 100-nanosecond intervals between the two epochs.
 EPOCH_AS_FILETIME = 116444736000000000
 # Number of 100-nanosecond intervals in one second
 HUNDREDS_OF_NANOSECONDS = 10000000
+SECONDS_PER_DAY = 86400
+# Bump when the serialized TimestampPlan layout changes
+TIMESTAMP_PLAN_CACHE_VERSION = 1
+# Distinct (timestamp, dateformat) pairs remembered per logtype replay
+TIMESTAMP_SHIFT_CACHE_SIZE = 65536
+# Bounds and additive step of the adaptive controller's batch size
+MIN_BATCH_ENTRIES = 100
+MAX_BATCH_ENTRIES = 10_000
+BATCH_ENTRIES_STEP = 100
+# Bump when the saved AdaptiveController state changes
+TUNING_CACHE_VERSION = 1
 
 level = os.environ.get("PYTHONLOGLEVEL", "INFO").upper()
 try:  # main.py shouldn't need abseil
@@ -99,115 +144,202 @@ except ImportError:  # set up logging without abseil
 
 # Constants common to all cloud functions
 SCOPES = ["https://www.googleapis.com/auth/malachite-ingestion"]
-SECRET_MANAGER_CREDENTIALS = os.environ.get("SECRET_MANAGER_CREDENTIALS")
-CUSTOMER_ID = os.environ.get("CUSTOMER_ID")
-CREDENTIALS_PATH = os.environ.get("CREDENTIALS_PATH")
-CREDENTIALS_JSON = os.environ.get("LOGSTORY_CREDENTIALS")
-
-REGION = os.environ.get("REGION")
-url_prefix = f"{REGION}-" if REGION else ""
-if url_prefix.lower().strip() == "us-":  # Region US is blank rather than "us-"
-  url_prefix = ""
-
-INGESTION_API_BASE_URL = (
-    os.environ.get("INGESTION_API_BASE_URL")
-    or f"https://{url_prefix}malachiteingestion-pa.googleapis.com"
-)
 # varies by cloud function
 BUCKET_NAME = os.environ.get("BUCKET_NAME")
 UTC = datetime.UTC
 
-# New configuration for REST API
-PROJECT_ID = os.environ.get("LOGSTORY_PROJECT_ID")
-FORWARDER_NAME = os.environ.get("LOGSTORY_FORWARDER_NAME")
+# Service account the REST API's application default credentials impersonate
 IMPERSONATE_SERVICE_ACCOUNT = os.environ.get("LOGSTORY_IMPERSONATE_SERVICE_ACCOUNT")
-
-# Global variables for backend and client
-storage_client = None
-http_client = None  # Will be set based on API type
-
-# Initialize storage client if running in cloud function
-if os.getenv("SECRET_MANAGER_CREDENTIALS"):  # Running in a cloud function
-  secretmanager_client = secretmanager.SecretManagerServiceClient()
-  storage_client = storage.Client()
-  sec_request = {"name": f"{SECRET_MANAGER_CREDENTIALS}/versions/latest"}
-  sec_response = secretmanager_client.access_secret_version(sec_request)
-  ret = sec_response.payload.data.decode("UTF-8")
-  service_account_info = json.loads(ret)
-elif CREDENTIALS_JSON:  # Credentials provided as JSON string
-  service_account_info = json.loads(CREDENTIALS_JSON)
-elif CREDENTIALS_PATH:  # Running locally with credentials file
-  with open(CREDENTIALS_PATH) as f:
-    service_account_info = json.load(f)
-else:
-  service_account_info = None
+# Concurrent batch posting; 1 posts each batch synchronously
+MAX_IN_FLIGHT = int(os.environ.get("LOGSTORY_MAX_IN_FLIGHT", "1"))
+ORDERED_POSTING = env_flag("LOGSTORY_ORDERED")
+# Adaptive batch size and concurrency (AIMD); MAX_IN_FLIGHT is the ceiling
+ADAPTIVE_POSTING = env_flag("LOGSTORY_ADAPTIVE")
+# Start adaptive runs from, and save, the previous run's settings
+SAVE_TUNING = env_flag("LOGSTORY_SAVE_TUNING")
+# Batches slower than this (seconds) make the adaptive controller back off
+ADAPTIVE_TARGET_LATENCY = float(os.environ.get("LOGSTORY_TARGET_LATENCY", "5"))
+# Target events and bytes per second posted to the API; 0 posts as fast as
+# possible
+TARGET_EPS = float(os.environ.get("LOGSTORY_EPS", "0"))
+TARGET_BYTES_PER_SEC = float(os.environ.get("LOGSTORY_BYTES_PER_SEC", "0"))
+# Fraction of the time posting may fall behind the target rate before a
+# warning is logged, and how often (seconds) that is checked
+RATE_DRIFT_TOLERANCE = float(os.environ.get("LOGSTORY_RATE_DRIFT", "0.05"))
+RATE_CHECK_INTERVAL = 60.0
+# Real-time replay: how many times faster than the log's own pace events are
+# released, and how long (seconds) a batch may wait for more events
+REALTIME_SPEEDUP = float(os.environ.get("LOGSTORY_SPEEDUP", "1"))
+REALTIME_MAX_DELAY = 1.0
+# Worker processes replaying (usecase, logtype) jobs in parallel; 1 replays
+# them one after another in this process
+WORKERS = int(os.environ.get("LOGSTORY_WORKERS", "1"))
+# Worker processes transforming one large local log file in chunks of about
+# CHUNK_BYTES; 1 transforms it line by line in this process
+CHUNK_WORKERS = int(os.environ.get("LOGSTORY_CHUNK_WORKERS", "1"))
+CHUNK_BYTES = 32 * 1024 * 1024
+# Send UDM/entity lines as they are instead of parsing and re-encoding them
+RAW_JSON = env_flag("LOGSTORY_RAW_JSON", default=True)
 
 
 # Check if we can use ADC with impersonation for REST API
-def can_use_application_default_credentials() -> bool:
+def can_use_application_default_credentials(
+    impersonate_service_account: str | None = None,
+) -> bool:
   """Check if Application Default Credentials can be used for REST API.
 
+  Args:
+    impersonate_service_account: Service account to impersonate. Defaults
+      to LOGSTORY_IMPERSONATE_SERVICE_ACCOUNT as of import.
+
   Returns:
     True if ADC credentials with impersonation are configured, False otherwise.
   """
   try:
     api_type = detect_auth_type()
+    # ADC detection is cached but may wait for a metadata server, so last
     return (
-        has_application_default_credentials()
-        and IMPERSONATE_SERVICE_ACCOUNT
+        bool(impersonate_service_account or IMPERSONATE_SERVICE_ACCOUNT)
         and api_type == "rest"
+        and has_application_default_credentials()
     )
   except ValueError:
     return False
 
 
-can_use_adc = can_use_application_default_credentials()
+class ReplayContext:
+  """Credentials, clients and ingestion backend of the replays of a process.
+
+  Settings are read from the environment when the context is created;
+  credentials are loaded and clients created on first use of each
+  attribute, so importing this module does no I/O. The CLI creates the
+  context after applying its options to the environment.
+
+  Attributes:
+    secret_manager_credentials: Secret Manager secret holding the service
+      account key; set when running as a Cloud Function.
+    customer_id: SecOps customer ID.
+    credentials_path: Path of a service account key file.
+    credentials_json: Service account key as a JSON string.
+    region: SecOps tenant region.
+    project_id: Google Cloud project of the REST API.
+    forwarder_name: Forwarder display name for the REST API.
+    impersonate_service_account: Service account ADC impersonate.
+    api_base_url: URL replacing the region's ingestion API endpoint, e.g.
+      of a local logstory.mock_server; INGESTION_API_BASE_URL is read when
+      LOGSTORY_API_BASE_URL is unset.
+    max_retries: Retries of throttled (429) and unavailable (502/503)
+      requests per batch.
+    compression: Content-Encoding of batch request bodies, e.g. "gzip", or
+      None to send plain JSON.
+  """
 
-# Initialize ingestion_backend as None by default
-ingestion_backend = None
+  def __init__(self, environ: dict[str, str] | None = None):
+    """Initializes the context from environment variables.
+
+    Args:
+      environ: Environment to read the settings from; defaults to os.environ.
+    """
+    environ = os.environ if environ is None else environ
+    self.secret_manager_credentials = environ.get("SECRET_MANAGER_CREDENTIALS")
+    self.customer_id = environ.get("CUSTOMER_ID")
+    self.credentials_path = environ.get("CREDENTIALS_PATH")
+    self.credentials_json = environ.get("LOGSTORY_CREDENTIALS")
+    self.region = environ.get("REGION")
+    self.project_id = environ.get("LOGSTORY_PROJECT_ID")
+    self.forwarder_name = environ.get("LOGSTORY_FORWARDER_NAME")
+    self.impersonate_service_account = environ.get(
+        "LOGSTORY_IMPERSONATE_SERVICE_ACCOUNT"
+    )
+    self.api_base_url = environ.get("LOGSTORY_API_BASE_URL") or environ.get(
+        "INGESTION_API_BASE_URL"
+    )
+    self.max_retries = int(environ.get("LOGSTORY_MAX_RETRIES", "5"))
+    self.compression = environ.get("LOGSTORY_COMPRESSION", "").lower() or None
+
+  @functools.cached_property
+  def storage_client(self) -> "storage.Client | None":
+    """GCS client reading usecases from BUCKET_NAME in a Cloud Function."""
+    if not self.secret_manager_credentials:
+      return None
+    # imported on use: only Cloud Functions read usecases from GCS
+    from google.cloud import storage  # noqa: PLC0415
+
+    return storage.Client()
+
+  @functools.cached_property
+  def service_account_info(self) -> dict[str, Any] | None:
+    """Service account key from Secret Manager, JSON or a file, if any."""
+    if self.secret_manager_credentials:  # Running in a cloud function
+      from google.cloud import secretmanager  # noqa: PLC0415
+
+      secretmanager_client = secretmanager.SecretManagerServiceClient()
+      sec_request = {"name": f"{self.secret_manager_credentials}/versions/latest"}
+      sec_response = secretmanager_client.access_secret_version(sec_request)
+      return json.loads(sec_response.payload.data.decode("UTF-8"))
+    if self.credentials_json:  # Credentials provided as JSON string
+      return json.loads(self.credentials_json)
+    if self.credentials_path:  # Running locally with credentials file
+      with open(self.credentials_path) as f:
+        return json.load(f)
+    return None
+
+  @functools.cached_property
+  def auth_handler(self) -> Any | None:
+    """Auth handler for LOGSTORY_API_TYPE, or None without credentials."""
+    # ADC is only probed when no credentials were given
+    if not (
+        self.service_account_info
+        or can_use_application_default_credentials(self.impersonate_service_account)
+    ):
+      return None
+    api_type = detect_auth_type()
+    LOGGER.info("Using API type: %s", api_type)
+    LOGGER.info("PROJECT_ID env var: %s", self.project_id)
+    return create_auth_handler(
+        api_type=api_type,
+        credentials_path=self.credentials_path,
+        service_account_info=self.service_account_info,
+        secret_manager_credentials=self.secret_manager_credentials,
+        impersonate_service_account=self.impersonate_service_account,
+    )
 
-# Create authentication and backend based on API type
-if (
-    service_account_info
-    or CREDENTIALS_PATH
-    or CREDENTIALS_JSON
-    or SECRET_MANAGER_CREDENTIALS
-    or can_use_adc
-):
-  # Get API type from environment variable
-  api_type = detect_auth_type()
-
-  LOGGER.info("Using API type: %s", api_type)
-  LOGGER.info("PROJECT_ID env var: %s", PROJECT_ID)
-
-  # Create appropriate auth handler
-  auth_handler = create_auth_handler(
-      api_type=api_type,
-      credentials_path=CREDENTIALS_PATH,
-      service_account_info=service_account_info,
-      secret_manager_credentials=SECRET_MANAGER_CREDENTIALS,
-      impersonate_service_account=IMPERSONATE_SERVICE_ACCOUNT,
-  )
+  @functools.cached_property
+  def http_client(self) -> Any | None:
+    """Authorized HTTP session of the auth handler, if any."""
+    if self.auth_handler is None:
+      return None
+    return self.auth_handler.get_http_client()
+
+  @functools.cached_property
+  def ingestion_backend(self) -> IngestionBackend | None:
+    """Ingestion backend, or None without credentials or a customer ID."""
+    if self.auth_handler is None or not self.customer_id:
+      return None
+    return create_ingestion_backend(
+        auth_handler=self.auth_handler,
+        customer_id=self.customer_id,
+        api_type=detect_auth_type(),
+        project_id=self.project_id,
+        region=self.region,
+        forwarder_name=self.forwarder_name,
+        retry_policy=RetryPolicy(max_retries=self.max_retries),
+        compression=self.compression,
+        base_url=self.api_base_url,
+    )
 
-  # Get HTTP client from auth handler
-  http_client = auth_handler.get_http_client()
 
-  # Create ingestion backend if we have customer ID
-  if CUSTOMER_ID:
-    ingestion_backend = create_ingestion_backend(
-        auth_handler=auth_handler,
-        customer_id=CUSTOMER_ID,
-        api_type=api_type,
-        project_id=PROJECT_ID,
-        region=REGION,
-        forwarder_name=FORWARDER_NAME,
-    )
-# Legacy fallback for backward compatibility when no auth is configured
-elif service_account_info:
-  credentials = service_account.Credentials.from_service_account_info(
-      service_account_info, scopes=SCOPES
-  )
-  http_client = requests.AuthorizedSession(credentials)
+@functools.cache
+def get_replay_context() -> ReplayContext:
+  """Gets the process's ReplayContext, creating it on first use."""
+  return ReplayContext()
+
+
+def __getattr__(name: str) -> Any:
+  """Resolves the former module globals through the replay context."""
+  if name in {"ingestion_backend", "storage_client", "http_client"}:
+    return getattr(get_replay_context(), name)
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def filetime_to_datetime(filetime):
@@ -314,16 +446,434 @@ def _validate_timestamp_config(log_type: str, timestamp_map: dict[str, Any]) ->
   LOGGER.debug("Timestamp configuration validation passed for log type '%s'", log_type)
 
 
+_MONTH_ABBREVIATIONS = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+_MONTH_NUMBERS = {name: number for number, name in enumerate(_MONTH_ABBREVIATIONS, 1)}
+# Earliest year whose %Y is four digits without padding
+FOUR_DIGIT_YEAR_MIN = 1000
+# Directives with a fixed width in strftime output, and their widths
+_FIXED_WIDTH_DIRECTIVES = {"Y": 4, "m": 2, "d": 2, "H": 2, "M": 2, "S": 2, "b": 3}
+
+
+class FastDateformat:
+  """Fixed-width parser and formatter for a simple strftime dateformat.
+
+  Covers dateformats built only from %Y %m %d %H %M %S %b and literal text,
+  such as "%Y-%m-%dT%H:%M:%S" or syslog's "%b %d %H:%M:%S". Only the
+  zero-padded layout that strftime writes is accepted, which lets parse()
+  skip strptime's locale handling and regex building; anything else makes
+  parse() and format() return None and the caller falls back to
+  strptime/strftime. Both paths therefore give the same datetime, string or
+  ValueError.
+  """
+
+  __slots__ = (
+      "_attrs",
+      "_in_order",
+      "_month_name_index",
+      "_positions",
+      "_regex",
+      "_template",
+      "dateformat",
+  )
+
+  # datetime() arguments in order, with strptime's defaults
+  _PARTS = (("Y", 1900), ("m", 1), ("d", 1), ("H", 0), ("M", 0), ("S", 0))
+  _ATTRIBUTES = {
+      "Y": "year",
+      "m": "month",
+      "d": "day",
+      "H": "hour",
+      "M": "minute",
+      "S": "second",
+      "b": "month",
+  }
+
+  def __init__(self, dateformat: str, tokens: list[tuple[str, str]]):
+    """Initialize from a tokenized dateformat; see _get_fast_dateformat."""
+    self.dateformat = dateformat
+    regex = []
+    template = []
+    directives = []
+    for kind, text in tokens:
+      if kind == "literal":
+        regex.append(re.escape(text))
+        template.append(text.replace("%", "%%"))
+      elif text == "b":
+        regex.append(f"({'|'.join(_MONTH_ABBREVIATIONS)})")
+        template.append("%s")
+        directives.append(text)
+      else:
+        width = _FIXED_WIDTH_DIRECTIVES[text]
+        regex.append(rf"(\d{{{width}}})")
+        template.append(f"%0{width}d")
+        directives.append(text)
+    self._regex = re.compile("".join(regex), re.ASCII)
+    self._template = "".join(template)
+    self._attrs = operator.attrgetter(*(self._ATTRIBUTES[d] for d in directives))
+    if len(directives) == 1:
+      # attrgetter returns a bare value for a single attribute
+      single = self._attrs
+      self._attrs = lambda value: (single(value),)
+    group_index = {name: i for i, name in enumerate(directives)}
+    self._month_name_index = group_index.pop("b", None)
+    if self._month_name_index is not None:
+      group_index["m"] = self._month_name_index
+    # group index (or None for the default) of each datetime() argument
+    self._positions = tuple(group_index.get(name) for name, _ in self._PARTS)
+    # "%Y-%m-%d..." style formats map straight onto datetime()'s arguments
+    self._in_order = self._positions[: len(directives)] == tuple(range(len(directives)))
+
+  def parse(self, value: str) -> datetime.datetime | None:
+    """Parses value like datetime.strptime, or returns None if not canonical.
+
+    Raises:
+      ValueError: If a field is out of range (as strptime would).
+    """
+    match = self._regex.fullmatch(value)
+    if match is None:
+      return None
+    groups = match.groups()
+    if self._in_order:
+      return datetime.datetime(*map(int, groups))
+    args = []
+    for (_, default), position in zip(self._PARTS, self._positions, strict=True):
+      if position is None:
+        args.append(default)
+      elif position == self._month_name_index:
+        args.append(_MONTH_NUMBERS[groups[position]])
+      else:
+        args.append(int(groups[position]))
+    return datetime.datetime(*args)
+
+  def format(self, value: datetime.datetime) -> str | None:
+    """Formats value like strftime, or returns None if it can't be fixed-width."""
+    if value.year < FOUR_DIGIT_YEAR_MIN:  # strftime may not pad %Y
+      return None
+    fields = self._attrs(value)
+    if self._month_name_index is not None:
+      fields = list(fields)
+      fields[self._month_name_index] = _MONTH_ABBREVIATIONS[value.month - 1]
+    return self._template % tuple(fields)
+
+
+# dateformat -> FastDateformat, or None when strptime/strftime must be used
+_FAST_DATEFORMATS: dict[str, FastDateformat | None] = {}
+
+
+def _get_fast_dateformat(dateformat: str) -> FastDateformat | None:
+  """Returns the registered fast parser/formatter for a dateformat, if any."""
+  if dateformat in _FAST_DATEFORMATS:
+    return _FAST_DATEFORMATS[dateformat]
+
+  tokens = []
+  fast_dateformat = None
+  for directive, literal in re.findall(r"%(.?)|([^%]+)", dateformat):
+    if literal:
+      tokens.append(("literal", literal))
+    elif directive in _FIXED_WIDTH_DIRECTIVES:
+      tokens.append(("directive", directive))
+    else:
+      break
+  else:
+    directives = [text for kind, text in tokens if kind == "directive"]
+    # strptime rejects repeated directives; %b and %m both set the month
+    if (
+        directives
+        and len(set(directives)) == len(directives)
+        and not {"b", "m"} <= set(directives)
+    ):
+      fast_dateformat = FastDateformat(dateformat, tokens)
+
+  _FAST_DATEFORMATS[dateformat] = fast_dateformat
+  return fast_dateformat
+
+
+def _get_dateformat_kind(dateformat: str) -> str:
+  """Classifies a YAML dateformat as 'epoch', 'filetime' or 'strftime'."""
+  if dateformat == "epoch":
+    return "epoch"
+  if dateformat in ("windowsfiletime", "filetime"):
+    return "filetime"
+  return "strftime"
+
+
+@dataclasses.dataclass(frozen=True)
+class TimestampRule:
+  """A compiled timestamp entry from a logtypes_*_timestamps.yaml file."""
+
+  name: str
+  pattern: re.Pattern[str]
+  group: int
+  dateformat: str
+  kind: str
+  base_time: bool = False
+  # resolved once here so the per-line code does not look it up
+  fast_dateformat: FastDateformat | None = dataclasses.field(
+      default=None, compare=False, repr=False
+  )
+
+  @classmethod
+  def from_config(cls, timestamp: dict[str, Any]) -> "TimestampRule":
+    """Builds a rule from one YAML timestamp entry.
+
+    Args:
+      timestamp: dict with pattern, group, dateformat and optionally
+        name and base_time.
+
+    Returns:
+      The compiled TimestampRule.
+    """
+    dateformat = timestamp["dateformat"]
+    kind = _get_dateformat_kind(dateformat)
+    return cls(
+        name=timestamp.get("name", ""),
+        pattern=re.compile(timestamp["pattern"]),
+        group=timestamp["group"],
+        dateformat=dateformat,
+        kind=kind,
+        base_time=bool(timestamp.get("base_time")),
+        fast_dateformat=(
+            _get_fast_dateformat(dateformat) if kind == "strftime" else None
+        ),
+    )
+
+  def to_config(self) -> dict[str, Any]:
+    """Returns the YAML-equivalent dict for this rule."""
+    return {
+        "name": self.name,
+        "pattern": self.pattern.pattern,
+        "group": self.group,
+        "dateformat": self.dateformat,
+        "base_time": self.base_time,
+    }
+
+
+@dataclasses.dataclass(frozen=True)
+class LogTypePlan:
+  """Everything usecase_replay_logtype needs to know about one logtype."""
+
+  log_type: str
+  api: str
+  log_dir: str | None
+  rules: tuple[TimestampRule, ...]
+  base_rule: TimestampRule
+
+  @classmethod
+  def from_config(cls, log_type: str, entry_data: dict[str, Any]) -> "LogTypePlan":
+    """Builds the plan for a logtype that passed _validate_timestamp_config.
+
+    Args:
+      log_type: The log type name.
+      entry_data: The logtype's YAML mapping.
+
+    Returns:
+      The compiled LogTypePlan.
+
+    Raises:
+      ValueError: If the api is missing or a pattern does not compile.
+    """
+    if "api" not in entry_data:
+      raise ValueError(f"Log type '{log_type}' missing 'api' configuration")
+    try:
+      rules = tuple(
+          TimestampRule.from_config(timestamp) for timestamp in entry_data["timestamps"]
+      )
+    except re.error as e:
+      raise ValueError(f"Log type '{log_type}' has an invalid pattern: {e}") from e
+    return cls(
+        log_type=log_type,
+        api=entry_data["api"],
+        log_dir=entry_data.get("log_dir"),
+        rules=rules,
+        base_rule=next(rule for rule in rules if rule.base_time),
+    )
+
+
+class TimestampPlan:
+  """Validated and precompiled form of a logtypes_*_timestamps.yaml file.
+
+  A plan is built once per YAML content hash and shared by every logtype and
+  usecase replayed by the process. Logtypes that fail validation keep their
+  error so that it is raised only when that logtype is replayed, as before.
+  """
+
+  def __init__(
+      self,
+      content_hash: str,
+      log_types: dict[str, LogTypePlan],
+      errors: dict[str, str],
+  ):
+    """Initialize the plan.
+
+    Args:
+      content_hash: sha256 of the YAML file the plan was built from.
+      log_types: compiled plans keyed by log type.
+      errors: validation error messages keyed by log type.
+    """
+    self.content_hash = content_hash
+    self.log_types = log_types
+    self.errors = errors
+
+  @classmethod
+  def from_timestamp_map(
+      cls, timestamp_map: dict[str, Any], content_hash: str
+  ) -> "TimestampPlan":
+    """Validates and compiles every logtype of a loaded YAML map."""
+    log_types = {}
+    errors = {}
+    for log_type, entry_data in timestamp_map.items():
+      try:
+        _validate_timestamp_config(log_type, timestamp_map)
+        log_types[log_type] = LogTypePlan.from_config(log_type, entry_data)
+      except ValueError as e:
+        errors[log_type] = str(e)
+    return cls(content_hash, log_types, errors)
+
+  @classmethod
+  def from_cache_dict(cls, data: dict[str, Any]) -> "TimestampPlan":
+    """Rebuilds a plan from to_cache_dict() output, recompiling the regexes."""
+    log_types = {}
+    for log_type, entry in data["log_types"].items():
+      rules = tuple(TimestampRule.from_config(rule) for rule in entry["rules"])
+      log_types[log_type] = LogTypePlan(
+          log_type=log_type,
+          api=entry["api"],
+          log_dir=entry["log_dir"],
+          rules=rules,
+          base_rule=next(rule for rule in rules if rule.base_time),
+      )
+    return cls(data["content_hash"], log_types, data["errors"])
+
+  def to_cache_dict(self) -> dict[str, Any]:
+    """Serializes the plan for the on-disk cache."""
+    return {
+        "version": TIMESTAMP_PLAN_CACHE_VERSION,
+        "content_hash": self.content_hash,
+        "log_types": {
+            log_type: {
+                "api": plan.api,
+                "log_dir": plan.log_dir,
+                "rules": [rule.to_config() for rule in plan.rules],
+            }
+            for log_type, plan in self.log_types.items()
+        },
+        "errors": self.errors,
+    }
+
+  def get(self, log_type: str) -> LogTypePlan:
+    """Returns the plan for a logtype.
+
+    Args:
+      log_type: The log type name.
+
+    Returns:
+      The compiled LogTypePlan.
+
+    Raises:
+      ValueError: If the logtype is unknown or its configuration is invalid.
+    """
+    if log_type in self.errors:
+      raise ValueError(self.errors[log_type])
+    if log_type not in self.log_types:
+      raise ValueError(f"Log type '{log_type}' not found in timestamp configuration")
+    return self.log_types[log_type]
+
+
+# TimestampPlans built by this process, keyed by YAML content hash
+_TIMESTAMP_PLANS: dict[str, TimestampPlan] = {}
+
+
+def load_timestamp_plan(file_path: str) -> TimestampPlan:
+  """Loads the TimestampPlan for a logtypes_*_timestamps.yaml file.
+
+  Plans are memoized per process and persisted to the on-disk cache keyed by
+  the YAML content hash, so YAML parsing and validation only happen when the
+  file changes.
+
+  Args:
+    file_path: path of the YAML file.
+
+  Returns:
+    The shared TimestampPlan for the file's current content.
+  """
+  with open(file_path, "rb") as fh:
+    raw_yaml = fh.read()
+  content_hash = hashlib.sha256(raw_yaml).hexdigest()
+  plan = _TIMESTAMP_PLANS.get(content_hash)
+  if plan:
+    return plan
+
+  cache_name = f"timestamp_plans/{content_hash}.json"
+  cached = read_json_cache(cache_name)
+  if cached and cached.get("version") == TIMESTAMP_PLAN_CACHE_VERSION:
+    try:
+      plan = TimestampPlan.from_cache_dict(cached)
+    except (KeyError, TypeError, StopIteration, re.error) as e:
+      LOGGER.debug("Discarding stale timestamp plan cache %s: %s", cache_name, e)
+  if not plan:
+    plan = TimestampPlan.from_timestamp_map(yaml.safe_load(raw_yaml), content_hash)
+    write_json_cache(cache_name, plan.to_cache_dict())
+
+  _TIMESTAMP_PLANS[content_hash] = plan
+  return plan
+
+
+def _get_timestamp_map_path(ts_map_path: str, entities: bool | None) -> str:
+  """Returns the path of the events or entities timestamp YAML file."""
+  if entities:
+    file_path = os.path.join(ts_map_path, "logtypes_entities_timestamps.yaml")
+  else:
+    file_path = os.path.join(ts_map_path, "logtypes_events_timestamps.yaml")
+
+  if file_path.startswith("."):
+    file_path = os.path.split(__file__)[0] + "/" + file_path
+  return file_path
+
+
+def _parse_event_time(event_timestamp: str, rule: TimestampRule) -> datetime.datetime:
+  """Parses a captured timestamp string according to the rule's dateformat."""
+  if rule.kind == "epoch":
+    # Unix epoch timestamp, in UTC like the shifted values
+    return datetime.datetime.fromtimestamp(int(event_timestamp), UTC)
+  if rule.kind == "filetime":
+    # Special handling for Windows FileTime
+    return filetime_to_datetime(int(event_timestamp))
+  if rule.fast_dateformat:
+    event_time = rule.fast_dateformat.parse(event_timestamp)
+    if event_time is not None:
+      return event_time
+  # Standard strptime format
+  return datetime.datetime.strptime(event_timestamp, rule.dateformat)
+
+
+def _get_log_object_name(use_case: str, log_type: str, entities: bool | None) -> str:
+  """Returns the usecase-relative path of a logtype's log file."""
+  if entities:
+    return f"{use_case}/ENTITIES/{log_type}.log"
+  return f"{use_case}/EVENTS/{log_type}.log"
+
+
 def _get_log_content(
     use_case: str, log_type: str, entities: bool | None = False
 ) -> str:
   """Retrieves log content from either GCS or local filesystem."""
-  if entities:
-    object_name = f"{use_case}/ENTITIES/{log_type}.log"
-  else:
-    object_name = f"{use_case}/EVENTS/{log_type}.log"
+  object_name = _get_log_object_name(use_case, log_type, entities)
 
   LOGGER.info("Processing file: %s", object_name)
+  storage_client = get_replay_context().storage_client
   if storage_client:  # running in cloud function
     bucket = storage_client.bucket(BUCKET_NAME)
     file_object = bucket.get_blob(object_name)
@@ -335,6 +885,38 @@ def _get_log_content(
     return f.read()
 
 
+def _get_local_log_path(
+    use_case: str, log_type: str, entities: bool | None = False
+) -> str:
+  """Returns the path of a logtype's log file in the installed usecases."""
+  script_dir = os.path.dirname(os.path.abspath(__file__))
+  return os.path.join(
+      script_dir, "usecases/", _get_log_object_name(use_case, log_type, entities)
+  )
+
+
+def _iter_log_lines(
+    use_case: str, log_type: str, entities: bool | None = False
+) -> Iterator[str]:
+  """Streams the lines of a log file from either GCS or local filesystem.
+
+  Yields the same lines as _get_log_content(...).splitlines() while holding
+  only one line in memory; each call starts a new pass over the file.
+  """
+  storage_client = get_replay_context().storage_client
+  if storage_client:  # running in cloud function
+    object_name = _get_log_object_name(use_case, log_type, entities)
+    bucket = storage_client.bucket(BUCKET_NAME)
+    file_object = bucket.get_blob(object_name).open("r", encoding="utf-8")
+  else:
+    local_file_path = _get_local_log_path(use_case, log_type, entities)
+    file_object = open(local_file_path, encoding="utf-8", errors="replace")  # noqa: SIM115
+  with file_object:
+    for line in file_object:
+      # also splits on the separators str.splitlines() knows beyond \n
+      yield from line.splitlines()
+
+
 def _get_ingestion_labels(
     use_case: str,
     logstory_exe_time: datetime.datetime,
@@ -376,9 +958,202 @@ def _get_current_time():
   return datetime.datetime.now(UTC)
 
 
+class _GroupMatch:
+  """Match-like view of the single capture group that gets replaced."""
+
+  __slots__ = ("group_num", "match")
+
+  def __init__(self, match: re.Match[str], group_num: int):
+    self.match = match
+    self.group_num = group_num
+
+  def start(self) -> int:
+    """Return start index of the group."""
+    return self.match.start(self.group_num)
+
+  def end(self) -> int:
+    """Return end index of the group."""
+    return self.match.end(self.group_num)
+
+  def group(self, n: int = 0) -> str:  # noqa: ARG002
+    """Return the group's text, whatever group number is asked for."""
+    return self.match.group(self.group_num)
+
+
+def _get_shift_seconds(
+    old_base_time: datetime.datetime,
+    ts_delta_dict: dict[str, int],
+    now: datetime.datetime,
+) -> int:
+  """Returns how far numeric (epoch/FileTime) timestamps move, in seconds.
+
+  Every timestamp keeps its distance in days from old_base_time and its time
+  of day, so in UTC the shift is the same number of whole days for all of
+  them: today - [Nd] - the base date, less the optional [Nh][Nm].
+  """
+  day_offset = (now.date() - old_base_time.date()).days - ts_delta_dict.get("d", 0)
+  return (
+      day_offset * SECONDS_PER_DAY
+      - ts_delta_dict.get("h", 0) * 3600
+      - ts_delta_dict.get("m", 0) * 60
+  )
+
+
+def _shift_numeric_timestamp(
+    event_timestamp: str, rule: TimestampRule, shift_seconds: int
+) -> str:
+  """Shifts an epoch or Windows FileTime string with integer arithmetic only."""
+  if rule.kind == "filetime":
+    # exact to the 100ns tick; no float round trip
+    return str(int(event_timestamp) + shift_seconds * HUNDREDS_OF_NANOSECONDS)
+  return str(int(event_timestamp) + shift_seconds)
+
+
+def _shift_timestamp(
+    event_timestamp: str,
+    rule: TimestampRule,
+    old_base_time: datetime.datetime,
+    ts_delta_dict: dict[str, int],
+    now: datetime.datetime | None = None,
+) -> str:
+  """Rewrites one captured timestamp string relative to old_base_time.
+
+  Args:
+    event_timestamp: the text captured by the rule's group
+    rule: the timestamp rule that captured it
+    old_base_time: the first ts in the first line of the first logfile
+    ts_delta_dict: user configured offset from current datetime
+    now: the run anchor; defaults to the current time
+
+  Returns:
+    The replacement timestamp string, in the rule's dateformat.
+  """
+  if rule.kind != "strftime":
+    shift_seconds = _get_shift_seconds(
+        old_base_time, ts_delta_dict, now or _get_current_time()
+    )
+    return _shift_numeric_timestamp(event_timestamp, rule, shift_seconds)
+
+  dateformat = rule.dateformat
+  event_time = _parse_event_time(event_timestamp, rule)
+
+  # `old_base_time` is the base t (bts) in the first line of the
+  #  first logfile of the usecase's set of logfiles.
+  # If the current timestamp has a different date from the old_base_time
+  #  we want the same N days different to be in the final ts
+
+  if event_time.year == DEFAULT_YEAR_FOR_INCOMPLETE_TIMESTAMPS:
+    event_time = event_time.replace(year=old_base_time.year)
+  more_days = (event_time.date() - old_base_time.date()).days
+  # Get today's date minus N days
+  subtract_n_days = ts_delta_dict.get("d", 0) - more_days
+  new_day = (now or _get_current_time()) - datetime.timedelta(days=subtract_n_days)
+  # Update date but keep the original time
+  new_event_time = event_time.replace(
+      year=new_day.year,
+      month=new_day.month,
+      day=new_day.day,
+  )
+  # now update the time if user provided [Nh][Nm]
+  # the optional h/m delta enables running > 1x/day
+  if "h" in ts_delta_dict or "m" in ts_delta_dict:
+    hm_delta = datetime.timedelta(
+        hours=ts_delta_dict.get("h", 0),
+        minutes=ts_delta_dict.get("m", 0),
+    )
+    new_event_time = new_event_time - hm_delta
+
+  if rule.fast_dateformat:
+    new_event_timestamp = rule.fast_dateformat.format(new_event_time)
+    if new_event_timestamp is not None:
+      return new_event_timestamp
+  # Use strftime with the dateformat
+  return new_event_time.strftime(dateformat)
+
+
+class TimestampShifter:
+  """Shifts the timestamps of one logtype replay, memoizing the results.
+
+  Usecase logs repeat the same timestamp strings across many lines, so the
+  replacement for each (raw timestamp, dateformat) pair is computed once and
+  kept in a bounded LRU cache. The run anchor ("now") is taken when the
+  shifter is created and the delta is fixed, so both are implicitly part of
+  the cache key and every line of the replay is shifted against the same
+  instant.
+  """
+
+  def __init__(
+      self,
+      old_base_time: datetime.datetime,
+      ts_delta_dict: dict[str, int],
+      now: datetime.datetime | None = None,
+      maxsize: int = TIMESTAMP_SHIFT_CACHE_SIZE,
+  ):
+    """Initialize the shifter.
+
+    Args:
+      old_base_time: the first ts in the first line of the first logfile
+      ts_delta_dict: user configured offset from current datetime
+      now: the run anchor; defaults to the current time
+      maxsize: maximum number of cached replacements
+    """
+    self.old_base_time = old_base_time
+    self.ts_delta_dict = ts_delta_dict
+    self.now = now or _get_current_time()
+    self._rules: dict[str, TimestampRule] = {}
+    self._cached_shift = functools.lru_cache(maxsize=maxsize)(self._shift)
+
+  def _shift(self, event_timestamp: str, dateformat: str) -> str:
+    return _shift_timestamp(
+        event_timestamp,
+        self._rules[dateformat],
+        self.old_base_time,
+        self.ts_delta_dict,
+        self.now,
+    )
+
+  @functools.cached_property
+  def shift_seconds(self) -> int:
+    """Seconds that every epoch and FileTime timestamp of the run moves by."""
+    return _get_shift_seconds(self.old_base_time, self.ts_delta_dict, self.now)
+
+  def shift(self, event_timestamp: str, rule: TimestampRule) -> str:
+    """Returns the replacement for a timestamp captured by `rule`.
+
+    Raises:
+      ValueError: If the timestamp does not match the rule's dateformat.
+    """
+    if rule.kind != "strftime":
+      # a single integer addition; cheaper than a cache lookup
+      return _shift_numeric_timestamp(event_timestamp, rule, self.shift_seconds)
+    # the replacement only depends on the rule through its dateformat
+    self._rules.setdefault(rule.dateformat, rule)
+    return self._cached_shift(event_timestamp, rule.dateformat)
+
+  def cache_info(self) -> functools._CacheInfo:
+    """Returns the cache's hits, misses, maxsize and currsize."""
+    return self._cached_shift.cache_info()
+
+  def shifted_seconds(self, event_timestamp: str, rule: TimestampRule) -> float:
+    """Returns the time a captured timestamp is shifted to, in epoch seconds.
+
+    Every timestamp of the run moves by shift_seconds, so this is the
+    parsed timestamp plus that; timestamps without a zone count as UTC.
+
+    Raises:
+      ValueError: If the timestamp does not match the rule's dateformat.
+    """
+    event_time = _parse_event_time(event_timestamp, rule)
+    if event_time.year == DEFAULT_YEAR_FOR_INCOMPLETE_TIMESTAMPS:
+      event_time = event_time.replace(year=self.old_base_time.year)
+    if event_time.tzinfo is None:
+      event_time = event_time.replace(tzinfo=UTC)
+    return event_time.timestamp() + self.shift_seconds
+
+
 def _calculate_timestamp_replacement(
     log_text: str,
-    timestamp: dict[str, str],
+    timestamp: TimestampRule | dict[str, Any],
     old_base_time: datetime.datetime,
     ts_delta_dict: dict[str, int],
 ) -> tuple[MatchLike, str] | None:
@@ -386,7 +1161,8 @@ def _calculate_timestamp_replacement(
 
   Args:
     log_text: string containing timestamp and other text
-    timestamp: describes the timestamp pattern to search for
+    timestamp: describes the timestamp pattern to search for, either as a
+      compiled TimestampRule or as the YAML dict
     old_base_time: the first ts in the first line of the first logfile
     ts_delta_dict: user configured offset from current datetime
       the updated timestamp will be now() - [Nd]days -[Nh]hours - [Nm]mins
@@ -397,87 +1173,73 @@ def _calculate_timestamp_replacement(
   Returns:
     Tuple of (match object, replacement string) or None if no match
   """
-  ts_match = re.search(timestamp["pattern"], log_text)
-  if ts_match:
-    # Get the specific group we're updating
-    event_timestamp = ts_match.group(timestamp["group"])
-    event_time = None
-    is_filetime = False
-    is_epoch = False
-
-    dateformat = timestamp.get("dateformat")
+  if not isinstance(timestamp, TimestampRule):
+    timestamp = TimestampRule.from_config(timestamp)
+  ts_match = timestamp.pattern.search(log_text)
+  if not ts_match:
+    return None
+  # Get the specific group we're updating
+  event_timestamp = ts_match.group(timestamp.group)
+  new_event_timestamp = _shift_timestamp(
+      event_timestamp, timestamp, old_base_time, ts_delta_dict
+  )
+  # Return a match object that represents ONLY the group we're changing
+  return (_GroupMatch(ts_match, timestamp.group), new_event_timestamp)
 
-    if dateformat == "epoch":
-      # Unix epoch timestamp
-      is_epoch = True
-      event_time = datetime.datetime.fromtimestamp(int(event_timestamp))
-    elif dateformat in ("windowsfiletime", "filetime"):
-      # Special handling for Windows FileTime
-      is_filetime = True
-      event_time = filetime_to_datetime(int(event_timestamp))
-    else:
-      # Standard strptime format
-      event_time = datetime.datetime.strptime(event_timestamp, dateformat)
-
-    if event_time:
-      # `old_base_time` is the base t (bts) in the first line of the
-      #  first logfile of the usecase's set of logfiles.
-      # If the current timestamp has a different date from the old_base_time
-      #  we want the same N days different to be in the final ts
-
-      if event_time.year == DEFAULT_YEAR_FOR_INCOMPLETE_TIMESTAMPS:
-        event_time = event_time.replace(year=old_base_time.year)
-      more_days = (event_time.date() - old_base_time.date()).days
-      # Get today's date minus N days
-      subtract_n_days = ts_delta_dict.get("d", 0) - more_days
-      new_day = _get_current_time() - datetime.timedelta(days=subtract_n_days)
-      # Update date but keep the original time
-      new_event_time = event_time.replace(
-          year=new_day.year,
-          month=new_day.month,
-          day=new_day.day,
-      )
-      # now update the time if user provided [Nh][Nm]
-      # the optional h/m delta enables running > 1x/day
-      if "h" in ts_delta_dict or "m" in ts_delta_dict:
-        hm_delta = datetime.timedelta(
-            hours=ts_delta_dict.get("h", 0),
-            minutes=ts_delta_dict.get("m", 0),
-        )
-        new_event_time = new_event_time - hm_delta
-
-      # Format the new timestamp appropriately
-      if is_filetime:
-        # Convert back to Windows FileTime
-        new_event_timestamp = str(datetime_to_filetime(new_event_time))
-      elif is_epoch:
-        # Convert back to Unix epoch
-        new_event_timestamp = str(int(new_event_time.timestamp()))
-      else:
-        # Use strftime with the dateformat
-        new_event_timestamp = new_event_time.strftime(dateformat)
 
-      # Return a match object that represents ONLY the group we're changing
-      # Create a GroupMatch object that has the start/end of the specific group
-      class GroupMatch:
+def _scan_timestamp_changes(
+    log_text: str,
+    rules: tuple[TimestampRule, ...],
+    shifter: TimestampShifter,
+) -> dict[tuple[int, int, str], str]:
+  """Finds every timestamp slot of a line and its replacement.
 
-        def __init__(self, match, group_num):
-          self.match = match
-          self.group_num = group_num
+  Runs one regex search per precompiled rule, in rule order, and merges the
+  matches into a change map keyed by position, which
+  _apply_timestamp_changes applies in position order. Identical changes
+  requested by overlapping rules collapse into one; on conflicting
+  replacements the first rule wins.
 
-        def start(self):
-          return self.match.start(self.group_num)
+  Args:
+    log_text: one line of the log file
+    rules: the logtype's compiled timestamp rules
+    shifter: computes (and caches) the replacement timestamps
 
-        def end(self):
-          return self.match.end(self.group_num)
+  Returns:
+    Change map of (start, end, original_text) -> replacement_text.
+  """
+  change_map: dict[tuple[int, int, str], str] = {}
+  for rule in rules:
+    ts_match = rule.pattern.search(log_text)
+    if not ts_match:
+      continue
+    group = rule.group
+    event_timestamp = ts_match.group(group)
+    replacement = shifter.shift(event_timestamp, rule)
+    change_key = (ts_match.start(group), ts_match.end(group), event_timestamp)
+    previous = change_map.setdefault(change_key, replacement)
+    if previous != replacement:
+      LOGGER.warning(
+          "Timestamp replacement conflict at position %d-%d: '%s' -> '%s' vs '%s'",
+          change_key[0],
+          change_key[1],
+          event_timestamp,
+          previous,
+          replacement,
+      )
+  return change_map
 
-        def group(self, n=0):
-          if n == 0:
-            return self.match.group(self.group_num)
-          return self.match.group(self.group_num)
 
-      return (GroupMatch(ts_match, timestamp["group"]), new_event_timestamp)
-  return None
+def _apply_timestamp_changes(
+    log_text: str, change_map: dict[tuple[int, int, str], str]
+) -> str:
+  """Applies a change map from _scan_timestamp_changes to the line."""
+  # Apply all unique replacements in reverse order to preserve positions
+  for (start, end, _), replacement in sorted(
+      change_map.items(), key=lambda x: x[0][0], reverse=True
+  ):
+    log_text = log_text[:start] + replacement + log_text[end:]
+  return log_text
 
 
 def _update_timestamp(
@@ -499,14 +1261,14 @@ def _update_timestamp(
 
 def _write_entries_to_local_file(
     log_type: str,
-    all_entries: list[dict[str, str]],
+    all_entries: Iterable[dict[str, str]],
     log_dir: str | None = None,
 ) -> None:
   """Write entries to local log files instead of sending to API.
 
   Args:
     log_type: The log type name for the filename
-    all_entries: List of log entries to write
+    all_entries: Log entries to write; consumed as they are written
     log_dir: Directory to write log files to (defaults to /tmp/var/log/logstory)
   """
   # Get log directory from environment or use default
@@ -524,77 +1286,834 @@ def _write_entries_to_local_file(
     LOGGER.error("Error creating directory %s: %s", log_path, e)
     raise
 
-  # Write or overwrite entries to log file
+  # Write or overwrite entries to log file; written to a temporary file and
+  # renamed, so replays of the same logtype in parallel workers never mix
   log_file_path = log_path / f"{log_type}.log"
+  tmp_file_path = log_path / f".{log_type}.log.{os.getpid()}"
+  written = 0
   try:
-    with open(log_file_path, "w", encoding="utf-8") as f:
+    with open(tmp_file_path, "w", encoding="utf-8") as f:
       for entry in all_entries:
+        written += 1
         try:
           # Handle different entry types
           if isinstance(entry, dict) and "logText" in entry:
             # unstructuredlogentries format
             f.write(entry["logText"] + "\n")
+          elif isinstance(entry, codec.RawJson):
+            # udmevents/entities lines passed through as JSON
+            f.write(entry.decode("ascii") + "\n")
           elif isinstance(entry, dict):
             # udmevents/entities format - write as JSON
-            f.write(json.dumps(entry) + "\n")
+            f.write(codec.dumps(entry).decode("ascii") + "\n")
           else:
             # fallback for other formats
             f.write(str(entry) + "\n")
         except Exception as e:
           LOGGER.error("Error writing entry to %s: %s", log_file_path, e)
           continue
+    os.replace(tmp_file_path, log_file_path)
 
-    LOGGER.info("Successfully wrote %d entries to %s", len(all_entries), log_file_path)
+    LOGGER.info("Successfully wrote %d entries to %s", written, log_file_path)
 
   except PermissionError:
     LOGGER.error("Permission denied writing to file: %s", log_file_path)
+    tmp_file_path.unlink(missing_ok=True)
     raise
   except Exception as e:
     LOGGER.error("Error writing to file %s: %s", log_file_path, e)
+    tmp_file_path.unlink(missing_ok=True)
     raise
 
 
+def _get_tuning_cache_name(backend: IngestionBackend) -> str:
+  """Gets the cache entry holding the tuning for one tenant and API."""
+  key = "|".join([
+      type(backend).__name__,
+      str(getattr(backend, "region", "")),
+      str(getattr(backend, "customer_id", "")),
+  ])
+  digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+  return f"tuning-v{TUNING_CACHE_VERSION}/{digest}.json"
+
+
+class AdaptiveController:
+  """Tunes batch size and requests in flight from ingestion feedback (AIMD).
+
+  Every posted batch reports its latency and whether it had to be retried.
+  After a round of healthy batches (one per request in flight) the
+  controller allows one more request in flight, up to max_in_flight, and
+  BATCH_ENTRIES_STEP more entries per batch. A retried (throttled) batch
+  halves the requests in flight and a batch slower than target_latency
+  halves the batch size. Only batches started after the last decrease can
+  decrease again, so one burst of 429s backs off once rather than once per
+  batch that was in flight.
+  """
+
+  def __init__(
+      self,
+      max_in_flight: int,
+      target_latency: float = ADAPTIVE_TARGET_LATENCY,
+      in_flight: int = 1,
+      batch_entries: int | None = None,
+      state_name: str | None = None,
+  ):
+    """Initialize the controller.
+
+    Args:
+      max_in_flight: upper bound of requests in flight
+      target_latency: seconds a batch may take before it counts as slow
+      in_flight: starting number of requests in flight
+      batch_entries: starting entries per batch (default BATCH_SIZE_THRESHOLD)
+      state_name: cache entry the final settings are saved to, if any
+    """
+    self.max_in_flight = max_in_flight
+    self.target_latency = target_latency
+    self.in_flight = min(max(in_flight, 1), max_in_flight)
+    self.batch_entries = min(
+        max(batch_entries or BATCH_SIZE_THRESHOLD, MIN_BATCH_ENTRIES),
+        MAX_BATCH_ENTRIES,
+    )
+    self.state_name = state_name
+    self.batches = 0
+    self.throttled = 0
+    self.slow = 0
+    self._lock = threading.Lock()
+    self._epoch = 0
+    self._healthy = 0
+
+  @classmethod
+  def for_backend(
+      cls, backend: IngestionBackend, max_in_flight: int, save_tuning: bool = False
+  ) -> "AdaptiveController":
+    """Creates a controller, resuming the tenant's saved tuning if asked to.
+
+    Args:
+      backend: ingestion backend the batches are posted through
+      max_in_flight: upper bound of requests in flight
+      save_tuning: start from the settings saved by the previous run and
+        save the final settings for the next one
+
+    Returns:
+      The controller.
+    """
+    if not save_tuning:
+      return cls(max_in_flight)
+    state_name = _get_tuning_cache_name(backend)
+    state = read_json_cache(state_name)
+    try:
+      in_flight = int(state["in_flight"])
+      batch_entries = int(state["batch_entries"])
+    except (KeyError, TypeError, ValueError):
+      return cls(max_in_flight, state_name=state_name)
+    LOGGER.info(
+        "Resuming tuning: batch_entries=%d in_flight=%d", batch_entries, in_flight
+    )
+    return cls(
+        max_in_flight, ADAPTIVE_TARGET_LATENCY, in_flight, batch_entries, state_name
+    )
+
+  def start_batch(self) -> int:
+    """Returns the token a batch passes back to record_batch()."""
+    with self._lock:
+      return self._epoch
+
+  def record_batch(self, token: int, latency: float, throttled: bool) -> None:
+    """Adjusts the settings from the outcome of one posted batch.
+
+    Args:
+      token: value of start_batch() when the batch was started
+      latency: seconds the batch took, including retries
+      throttled: whether any request had to be retried
+    """
+    slow = latency > self.target_latency
+    with self._lock:
+      self.batches += 1
+      self.throttled += throttled
+      self.slow += slow
+      if throttled or slow:
+        self._healthy = 0
+        if token != self._epoch:
+          return  # already backed off for this round
+        self._epoch += 1
+        if throttled:
+          self.in_flight = max(1, self.in_flight // 2)
+        if slow:
+          self.batch_entries = max(MIN_BATCH_ENTRIES, self.batch_entries // 2)
+        LOGGER.info(
+            "Backing off (%s): batch_entries=%d in_flight=%d",
+            "throttled" if throttled else f"{latency:.1f}s batch",
+            self.batch_entries,
+            self.in_flight,
+        )
+        return
+      self._healthy += 1
+      if self._healthy >= self.in_flight:
+        self._healthy = 0
+        self.in_flight = min(self.in_flight + 1, self.max_in_flight)
+        self.batch_entries = min(
+            self.batch_entries + BATCH_ENTRIES_STEP, MAX_BATCH_ENTRIES
+        )
+
+  def get_state(self) -> dict[str, int]:
+    """Returns the current settings and counters."""
+    with self._lock:
+      return {
+          "batch_entries": self.batch_entries,
+          "in_flight": self.in_flight,
+          "batches": self.batches,
+          "throttled": self.throttled,
+          "slow": self.slow,
+      }
+
+  def finish(self) -> None:
+    """Logs the settings the run ended with and saves them if requested."""
+    state = self.get_state()
+    LOGGER.info("Adaptive posting settled at %s", state)
+    if self.state_name and state["batches"]:
+      write_json_cache(
+          self.state_name,
+          {"batch_entries": state["batch_entries"], "in_flight": state["in_flight"]},
+      )
+
+
+class RateLimiter:
+  """Holds posting to a target rate of events and/or bytes per second.
+
+  A token bucket that holds no tokens in reserve: each batch is released
+  once the batches before it have been paid for at the target rate, and
+  then pays for its own events and bytes. However many threads post
+  through it, the achieved rate over a replay is the target to within one
+  batch. Replay worker processes share one schedule through a shared-memory
+  array (see create_shared_state()).
+
+  When posting cannot keep up (reading, transforming or the API is too
+  slow), a batch arrives after it was due and the time in between is lost.
+  A warning is logged when more than drift_tolerance of the time over the
+  last check_interval seconds was lost.
+  """
+
+  # slots of the state array
+  _DUE_EVENTS, _DUE_BYTES, _STARTED, _EVENTS, _BYTES, _LOST = range(6)
+  STATE_SIZE = 6
+
+  def __init__(
+      self,
+      eps: float = 0,
+      bytes_per_sec: float = 0,
+      drift_tolerance: float = RATE_DRIFT_TOLERANCE,
+      check_interval: float = RATE_CHECK_INTERVAL,
+      shared_state: Any = None,
+  ):
+    """Initialize the limiter.
+
+    Args:
+      eps: target events per second, or 0 for no limit
+      bytes_per_sec: target encoded entry bytes per second, or 0 for no limit
+      drift_tolerance: fraction of the time posting may fall behind
+      check_interval: seconds between drift checks
+      shared_state: array from create_shared_state() to share the schedule
+        with limiters in other processes
+
+    Raises:
+      ValueError: If a rate is negative or neither is set.
+    """
+    if eps < 0 or bytes_per_sec < 0:
+      raise ValueError(
+          f"Rates must not be negative, got eps={eps} bytes_per_sec={bytes_per_sec}"
+      )
+    if not eps and not bytes_per_sec:
+      raise ValueError("eps or bytes_per_sec must be set")
+    self.eps = eps
+    self.bytes_per_sec = bytes_per_sec
+    self.drift_tolerance = drift_tolerance
+    self.check_interval = check_interval
+    self.drift_warnings = 0
+    if shared_state is None:
+      self._state = [0.0] * self.STATE_SIZE
+      self._lock = threading.Lock()
+    else:
+      self._state = shared_state
+      self._lock = shared_state.get_lock()
+    self._last_check: tuple[float, float] | None = None
+
+  @classmethod
+  def for_rates(
+      cls, eps: float, bytes_per_sec: float, shared_state: Any = None
+  ) -> "RateLimiter | None":
+    """Creates a limiter, or returns None if neither rate is set."""
+    if not eps and not bytes_per_sec:
+      return None
+    return cls(eps, bytes_per_sec, shared_state=shared_state)
+
+  @classmethod
+  def create_shared_state(cls, context: Any = None) -> Any:
+    """Creates a schedule that limiters in child processes can share.
+
+    Args:
+      context: multiprocessing context the child processes are started with
+
+    Returns:
+      A synchronized array, to be passed to the children when they start.
+    """
+    return (context or multiprocessing).Array("d", cls.STATE_SIZE)
+
+  def acquire(self, events: int, entries_bytes: int = 0) -> float:
+    """Blocks until a batch is due and charges it to the schedule.
+
+    Args:
+      events: entries in the batch
+      entries_bytes: encoded size of the entries
+
+    Returns:
+      Seconds waited.
+    """
+    drift = None
+    with self._lock:
+      state = self._state
+      now = time.monotonic()
+      if not state[self._STARTED]:
+        state[self._STARTED] = state[self._DUE_EVENTS] = state[self._DUE_BYTES] = now
+      due = max(state[self._DUE_EVENTS], state[self._DUE_BYTES])
+      start = max(now, due)
+      state[self._LOST] += start - due
+      if self.eps:
+        state[self._DUE_EVENTS] = start + events / self.eps
+      if self.bytes_per_sec:
+        state[self._DUE_BYTES] = start + entries_bytes / self.bytes_per_sec
+      state[self._EVENTS] += events
+      state[self._BYTES] += entries_bytes
+      lost = state[self._LOST]
+      if self._last_check is None:
+        self._last_check = (now, lost)
+      elif now - self._last_check[0] >= self.check_interval:
+        drift = (lost - self._last_check[1]) / (now - self._last_check[0])
+        self._last_check = (now, lost)
+    if drift is not None and drift > self.drift_tolerance:
+      self.drift_warnings += 1
+      LOGGER.warning(
+          "Posting fell %.0f%% behind the target rate over the last %.0fs; "
+          "the replay cannot keep up: %s",
+          drift * 100,
+          self.check_interval,
+          self.get_stats(),
+      )
+    if start > now:
+      time.sleep(start - now)
+    return start - now
+
+  def get_stats(self) -> dict[str, float]:
+    """Returns the target and achieved rates and the time lost so far."""
+    with self._lock:
+      state = list(self._state)
+    # from the first batch to the end of the last one's time slot
+    elapsed = max(state[self._DUE_EVENTS], state[self._DUE_BYTES])
+    elapsed -= state[self._STARTED]
+    return {
+        "target_eps": self.eps,
+        "achieved_eps": round(state[self._EVENTS] / elapsed, 1) if elapsed else 0.0,
+        "target_bytes_per_sec": self.bytes_per_sec,
+        "achieved_bytes_per_sec": (
+            round(state[self._BYTES] / elapsed, 1) if elapsed else 0.0
+        ),
+        "events": int(state[self._EVENTS]),
+        "bytes": int(state[self._BYTES]),
+        "seconds": round(elapsed, 3),
+        "lost_seconds": round(state[self._LOST], 3),
+    }
+
+  def finish(self) -> None:
+    """Logs the achieved rates, and a warning if they fell short."""
+    stats = self.get_stats()
+    if not stats["events"]:
+      return
+    LOGGER.info("Rate limited posting: %s", stats)
+    if stats["seconds"] and (
+        stats["lost_seconds"] / stats["seconds"] > self.drift_tolerance
+    ):
+      LOGGER.warning(
+          "Posting achieved %.0f%% of the target rate",
+          100 * (1 - stats["lost_seconds"] / stats["seconds"]),
+      )
+
+
+class BatchPoster:
+  """Posts batches through an IngestionBackend with bounded concurrency.
+
+  With max_in_flight=1 every batch is posted synchronously by the caller, as
+  before. With N > 1 batches are posted by a pool of N threads and submit()
+  blocks while N batches are in flight, so the producer can never get more
+  than N batches ahead (backpressure). The first failure is re-raised by the
+  next submit() or by wait(), and batches that have not started yet are
+  dropped (fail fast). With ordered=True the batches of each logtype are
+  posted one after another in submission order; different logtypes still
+  overlap when the poster is shared across a replay. With a controller, the
+  limit on batches in flight and the batch size follow the controller, and
+  max_in_flight is only the ceiling. With a rate_limiter, each batch waits
+  until the limiter releases it before it is posted.
+  """
+
+  def __init__(
+      self,
+      backend: IngestionBackend | None,
+      max_in_flight: int = 1,
+      ordered: bool = False,
+      controller: AdaptiveController | None = None,
+      rate_limiter: RateLimiter | None = None,
+  ):
+    """Initialize the poster.
+
+    Args:
+      backend: ingestion backend to post through
+      max_in_flight: maximum number of batches being posted at once
+      ordered: post each logtype's batches strictly in order
+      controller: adapts the batch size and the batches in flight
+      rate_limiter: holds posting to a target rate
+
+    Raises:
+      ValueError: If max_in_flight is less than 1.
+    """
+    if max_in_flight < 1:
+      raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+    self.backend = backend
+    self.max_in_flight = max_in_flight
+    self.ordered = ordered
+    self.controller = controller
+    self.rate_limiter = rate_limiter
+    self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+    self._lock = threading.Lock()
+    self._slot_freed = threading.Condition(self._lock)
+    self._in_flight = 0
+    self._pending: set[concurrent.futures.Future] = set()
+    self._last_batch: dict[str, concurrent.futures.Future] = {}
+    self._error: BaseException | None = None
+
+  def __enter__(self) -> "BatchPoster":
+    """Returns the poster; it is closed when the block exits."""
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback) -> None:
+    """Drains the poster, or just stops it if the block raised."""
+    if exc_type is None:
+      self.close()
+    else:
+      # don't mask the caller's exception; just stop posting
+      self._shutdown(cancel=True)
+
+  @property
+  def batch_entries(self) -> int:
+    """Maximum number of entries in the next batch."""
+    if self.controller is not None:
+      return self.controller.batch_entries
+    return BATCH_SIZE_THRESHOLD
+
+  def submit(
+      self,
+      api: str,
+      log_type: str,
+      entries: list[dict[str, Any]],
+      ingestion_labels: list[dict[str, Any]],
+      entries_bytes: int = 0,
+  ) -> None:
+    """Posts one batch, or queues it once a slot is free.
+
+    Args:
+      api: ingestion API of the log type
+      log_type: log type of the entries
+      entries: entries of the batch
+      ingestion_labels: labels attached to the batch
+      entries_bytes: encoded size of the entries, for the rate limiter
+
+    Raises:
+      Exception: The error of an earlier batch that failed.
+    """
+    self._raise_error()
+    if self.max_in_flight == 1:
+      self._post_batch(api, log_type, entries, ingestion_labels, entries_bytes)
+      return
+
+    if self._executor is None:
+      self._executor = concurrent.futures.ThreadPoolExecutor(
+          max_workers=self.max_in_flight, thread_name_prefix="logstory-post"
+      )
+    with self._slot_freed:  # backpressure: wait for a batch to finish
+      while self._in_flight >= self._get_limit():
+        self._slot_freed.wait()
+      self._in_flight += 1
+    try:
+      self._raise_error()
+      previous = self._last_batch.get(log_type) if self.ordered else None
+      future = self._executor.submit(
+          self._post, previous, api, log_type, entries, ingestion_labels, entries_bytes
+      )
+    except BaseException:
+      with self._slot_freed:  # the batch never took its slot
+        self._in_flight -= 1
+        self._slot_freed.notify_all()
+      raise
+    with self._lock:
+      self._pending.add(future)
+    if self.ordered:
+      self._last_batch[log_type] = future
+    future.add_done_callback(self._release)
+
+  def wait(self) -> None:
+    """Waits for every submitted batch.
+
+    Raises:
+      Exception: The error of the first batch that failed.
+    """
+    with self._lock:
+      pending = list(self._pending)
+    concurrent.futures.wait(pending)
+    self._last_batch.clear()
+    self._raise_error()
+
+  def close(self) -> None:
+    """Waits for every submitted batch and stops the worker threads."""
+    try:
+      self.wait()
+    finally:
+      self._shutdown(cancel=False)
+    retry_stats = self._get_retry_stats()
+    if retry_stats is not None and retry_stats.retries:
+      LOGGER.info("Ingestion retry stats: %s", retry_stats.as_dict())
+    compression_stats = getattr(self.backend, "compression_stats", None)
+    if isinstance(compression_stats, CompressionStats) and compression_stats.requests:
+      LOGGER.info("Ingestion compression stats: %s", compression_stats.as_dict())
+    if self.controller is not None:
+      self.controller.finish()
+    if self.rate_limiter is not None:
+      self.rate_limiter.finish()
+
+  def _get_limit(self) -> int:
+    if self.controller is not None:
+      return self.controller.in_flight
+    return self.max_in_flight
+
+  def _get_retry_stats(self) -> RetryStats | None:
+    retry_stats = getattr(self.backend, "retry_stats", None)
+    return retry_stats if isinstance(retry_stats, RetryStats) else None
+
+  def _post_batch(
+      self,
+      api: str,
+      log_type: str,
+      entries: list[dict[str, Any]],
+      ingestion_labels: list[dict[str, Any]],
+      entries_bytes: int = 0,
+  ) -> None:
+    if self.rate_limiter is not None:
+      self.rate_limiter.acquire(len(entries), entries_bytes)
+    if self.controller is None:
+      post_entries(api, log_type, entries, ingestion_labels, self.backend)
+      return
+    retry_stats = self._get_retry_stats()
+    retries = retry_stats.retries if retry_stats else 0
+    token = self.controller.start_batch()
+    start = time.monotonic()
+    post_entries(api, log_type, entries, ingestion_labels, self.backend)
+    # with batches in flight a retry may belong to another batch; either
+    # way the API is throttling this run
+    throttled = bool(retry_stats and retry_stats.retries > retries)
+    self.controller.record_batch(token, time.monotonic() - start, throttled)
+
+  def _post(
+      self,
+      previous: concurrent.futures.Future | None,
+      api: str,
+      log_type: str,
+      entries: list[dict[str, Any]],
+      ingestion_labels: list[dict[str, Any]],
+      entries_bytes: int,
+  ) -> None:
+    if previous is not None:
+      # submitted earlier, so it is already running in another worker
+      concurrent.futures.wait([previous])
+    if self._error is not None:
+      return  # fail fast: drop batches queued behind a failure
+    try:
+      self._post_batch(api, log_type, entries, ingestion_labels, entries_bytes)
+    except BaseException as e:
+      with self._lock:
+        if self._error is None:
+          self._error = e
+      raise
+
+  def _release(self, future: concurrent.futures.Future) -> None:
+    with self._slot_freed:
+      self._pending.discard(future)
+      self._in_flight -= 1
+      self._slot_freed.notify_all()
+
+  def _raise_error(self) -> None:
+    if self._error is not None:
+      raise self._error
+
+  def _shutdown(self, cancel: bool) -> None:
+    if self._executor is not None:
+      self._executor.shutdown(wait=True, cancel_futures=cancel)
+      self._executor = None
+
+
+def _create_batch_poster(backend: IngestionBackend | None) -> BatchPoster:
+  """Creates a BatchPoster configured by the LOGSTORY_* environment."""
+  controller = None
+  if ADAPTIVE_POSTING and backend is not None:
+    controller = AdaptiveController.for_backend(backend, MAX_IN_FLIGHT, SAVE_TUNING)
+  return BatchPoster(
+      backend,
+      MAX_IN_FLIGHT,
+      ORDERED_POSTING,
+      controller=controller,
+      rate_limiter=RateLimiter.for_rates(TARGET_EPS, TARGET_BYTES_PER_SEC),
+  )
+
+
 def _post_entries_in_batches(
     api: str,
     log_type: str,
-    all_entries: list[dict[str, str]],
+    all_entries: Iterable[dict[str, str]],
     ingestion_labels: list[dict[str, str]],
     backend: IngestionBackend | None = None,
     local_file_output: bool = False,
     log_dir: str | None = None,
+    poster: BatchPoster | None = None,
 ):
-  """Posts entries to the ingestion API in batches or writes to local files."""
+  """Posts entries to the ingestion API in batches or writes to local files.
+
+  all_entries may be a generator: it is consumed one batch at a time, so only
+  the batches being posted are held in memory.
+
+  Batches go through `poster` when one is given (which may still be posting
+  them when this returns); otherwise through a BatchPoster configured by
+  LOGSTORY_MAX_IN_FLIGHT, LOGSTORY_ORDERED and LOGSTORY_ADAPTIVE that is
+  drained before return.
+  """
   # If local file output is enabled, write all entries to file and return
   if local_file_output:
     _write_entries_to_local_file(log_type, all_entries, log_dir)
     return
 
-  # Check that backend is provided for API posting
-  if not backend:
-    raise RuntimeError("Backend must be provided when not using local file output")
+  if poster is None:
+    # Check that backend is provided for API posting
+    if not backend:
+      raise RuntimeError("Backend must be provided when not using local file output")
+    with _create_batch_poster(backend) as own_poster:
+      _submit_batches(api, log_type, all_entries, ingestion_labels, own_poster)
+  else:
+    _submit_batches(api, log_type, all_entries, ingestion_labels, poster)
+
+
+def _get_batch_sizer(
+    api: str,
+    log_type: str,
+    ingestion_labels: list[dict[str, str]],
+    backend: IngestionBackend | None,
+) -> BatchSizer:
+  """Gets the backend's batch size accounting, or a generic JSON estimate."""
+  if isinstance(backend, IngestionBackend):
+    return backend.get_batch_sizer(api, log_type, ingestion_labels)
+  return BatchSizer(BATCH_BYTES_THRESHOLD, lambda entry: len(codec.dumps(entry)))
 
-  # Original API posting logic
+
+def _submit_batches(
+    api: str,
+    log_type: str,
+    all_entries: Iterable[dict[str, str]],
+    ingestion_labels: list[dict[str, str]],
+    poster: BatchPoster,
+) -> None:
+  """Splits entries into batches by count and encoded size and submits them.
+
+  A batch is submitted before the next entry would take its request body
+  over the backend's size limit, or once it holds poster.batch_entries
+  entries.
+  """
+  sizer = _get_batch_sizer(api, log_type, ingestion_labels, poster.backend)
   entries_bytes = 0
   entries = []
   for i, entry in enumerate(all_entries):
+    entry_bytes = sizer.entry_bytes(entry)
+    if entries and entries_bytes + entry_bytes > sizer.max_bytes:
+      LOGGER.info("posting entry N: %s, entries_bytes: %s", i - 1, entries_bytes)
+      poster.submit(api, log_type, entries, ingestion_labels, entries_bytes)
+      entries = []
+      entries_bytes = 0
+    if entry_bytes > sizer.max_bytes:
+      LOGGER.warning(
+          "Entry %s of %s is %s bytes, over the %s byte batch limit",
+          i,
+          log_type,
+          entry_bytes,
+          sizer.max_bytes,
+      )
     entries.append(entry)
-    try:
-      entries_bytes += len(entry["logText"])  # unstructuredlogentry
-    except (TypeError, KeyError):
-      entries_bytes += len(entry)  # udmevent
-    if (
-        len(entries) % BATCH_SIZE_THRESHOLD == 0
-        or entries_bytes > BATCH_BYTES_THRESHOLD
-    ):
+    entries_bytes += entry_bytes
+    if len(entries) >= poster.batch_entries:
       LOGGER.info("posting entry N: %s, entries_bytes: %s", i, entries_bytes)
-      post_entries(api, log_type, entries, ingestion_labels, backend)
+      poster.submit(api, log_type, entries, ingestion_labels, entries_bytes)
       entries = []
       entries_bytes = 0
 
   # after the loop, also submit if there are leftover entries
   if entries:
     LOGGER.info("posting remaining entries")
-    post_entries(api, log_type, entries, ingestion_labels, backend)
+    poster.submit(api, log_type, entries, ingestion_labels, entries_bytes)
+
+
+@dataclasses.dataclass
+class _CadenceStream:
+  """One logtype of a CadenceScheduler and its batch being filled."""
+
+  api: str
+  log_type: str
+  ingestion_labels: list[dict[str, Any]]
+  timed_entries: Iterator[tuple[float, Any]]
+  sizer: BatchSizer
+  entries: list[Any] = dataclasses.field(default_factory=list)
+  entries_bytes: int = 0
+  deadline: float = 0.0
+
+
+class CadenceScheduler:
+  """Posts the entries of several logtypes as they come due, like a live source.
+
+  Each stream yields (time, entry) pairs in file order, the time being when
+  the line's event happened after its timestamps were shifted. A heap holds
+  the next entry of every stream keyed by that time, so the streams merge
+  into one timeline: an entry is released (time - first time) / speedup
+  seconds after the first one and added to its logtype's batch. A batch is
+  submitted once it is full or its first entry has waited max_delay
+  seconds, so busy logtypes are still batched but no event is held back
+  for long. Only the next entry of each stream and the open batches are
+  held in memory.
+
+  An entry whose release time has already passed (its line is earlier than
+  the one before it, or posting cannot keep up) is released at once; it is
+  counted as late if it missed its time by more than max_delay.
+  """
+
+  def __init__(
+      self,
+      poster: BatchPoster,
+      speedup: float = REALTIME_SPEEDUP,
+      max_delay: float = REALTIME_MAX_DELAY,
+  ):
+    """Initialize the scheduler.
+
+    Args:
+      poster: poster the batches are submitted to
+      speedup: how many times faster than the original pace to replay
+      max_delay: seconds a batch may wait for more entries
+
+    Raises:
+      ValueError: If speedup is not positive.
+    """
+    if speedup <= 0:
+      raise ValueError(f"speedup must be positive, got {speedup}")
+    self.poster = poster
+    self.speedup = speedup
+    self.max_delay = max_delay
+    self._streams: list[_CadenceStream] = []
+
+  def add_stream(
+      self,
+      api: str,
+      log_type: str,
+      ingestion_labels: list[dict[str, Any]],
+      timed_entries: Iterable[tuple[float, Any]],
+  ) -> None:
+    """Adds a logtype's (time, entry) pairs to the timeline."""
+    sizer = _get_batch_sizer(api, log_type, ingestion_labels, self.poster.backend)
+    self._streams.append(
+        _CadenceStream(api, log_type, ingestion_labels, iter(timed_entries), sizer)
+    )
+
+  def run(self) -> dict[str, Any]:
+    """Releases every entry at its time and submits the batches.
+
+    Returns:
+      How many entries were released, and how many of them late.
+    """
+    stats = {"events": 0, "batches": 0, "late": 0, "max_late_seconds": 0.0}
+    heap: list[tuple[float, int, int, Any]] = []
+    sequence = itertools.count()
+    for index in range(len(self._streams)):
+      self._push_next(heap, index, sequence)
+
+    start = time.monotonic()
+    first_time = None
+    while heap:
+      event_time, _, index, entry = heap[0]
+      if first_time is None and event_time != float("-inf"):
+        first_time = event_time
+      due = start
+      if first_time is not None and event_time != float("-inf"):
+        due += (event_time - first_time) / self.speedup
+
+      # batches whose first entry would otherwise wait too long go first
+      waiting = [stream for stream in self._streams if stream.entries]
+      expiring = min(waiting, key=lambda stream: stream.deadline, default=None)
+      if expiring is not None and expiring.deadline < due:
+        self._sleep_until(expiring.deadline)
+        self._submit(expiring, stats)
+        continue
+
+      self._sleep_until(due)
+      late = time.monotonic() - due
+      if late > self.max_delay:
+        stats["late"] += 1
+        stats["max_late_seconds"] = max(stats["max_late_seconds"], late)
+      heapq.heappop(heap)
+      self._add_entry(self._streams[index], entry, stats)
+      self._push_next(heap, index, sequence)
+
+    waiting = [stream for stream in self._streams if stream.entries]
+    for stream in sorted(waiting, key=lambda stream: stream.deadline):
+      self._submit(stream, stats)
+    stats["seconds"] = round(time.monotonic() - start, 3)
+    stats["max_late_seconds"] = round(stats["max_late_seconds"], 3)
+    LOGGER.info("Real-time replay at %gx: %s", self.speedup, stats)
+    return stats
+
+  def _push_next(
+      self, heap: list[tuple[float, int, int, Any]], index: int, sequence: Iterator
+  ) -> None:
+    item = next(self._streams[index].timed_entries, None)
+    if item is not None:
+      # the sequence number keeps ties in file order, never comparing entries
+      heapq.heappush(heap, (item[0], next(sequence), index, item[1]))
+
+  def _add_entry(self, stream: _CadenceStream, entry: Any, stats: dict) -> None:
+    entry_bytes = stream.sizer.entry_bytes(entry)
+    if stream.entries and stream.entries_bytes + entry_bytes > stream.sizer.max_bytes:
+      self._submit(stream, stats)
+    if not stream.entries:
+      stream.deadline = time.monotonic() + self.max_delay
+    stream.entries.append(entry)
+    stream.entries_bytes += entry_bytes
+    stats["events"] += 1
+    if len(stream.entries) >= self.poster.batch_entries:
+      self._submit(stream, stats)
+
+  def _submit(self, stream: _CadenceStream, stats: dict) -> None:
+    self.poster.submit(
+        stream.api,
+        stream.log_type,
+        stream.entries,
+        stream.ingestion_labels,
+        stream.entries_bytes,
+    )
+    stats["batches"] += 1
+    stream.entries = []
+    stream.entries_bytes = 0
+
+  @staticmethod
+  def _sleep_until(deadline: float) -> None:
+    delay = deadline - time.monotonic()
+    if delay > 0:
+      time.sleep(delay)
 
 
 # pylint: disable-next=g-bare-generic
@@ -634,6 +2153,227 @@ def post_entries(
   )
 
 
+def _scan_base_time(
+    lines: Iterable[str], base_rule: TimestampRule
+) -> tuple[datetime.datetime | None, int]:
+  """Returns the latest base_time timestamp in the lines and how many parsed."""
+  # base time stamp (BTS) determines the anchor point; others are relative
+  old_base_time = None
+  found = 0
+  for log_text in lines:
+    match = base_rule.pattern.search(log_text)
+    if match and match.groups():
+      timestamp_str = match.group(base_rule.group)
+      try:
+        event_time = _parse_event_time(timestamp_str, base_rule)
+      except (ValueError, OverflowError) as e:
+        LOGGER.warning("Failed to parse base timestamp '%s': %s", timestamp_str, e)
+        continue
+      found += 1
+      if old_base_time is None or event_time > old_base_time:
+        old_base_time = event_time
+  return old_base_time, found
+
+
+def _log_base_time(old_base_time: datetime.datetime | None, found: int) -> None:
+  if old_base_time is None:
+    LOGGER.error("No valid base_time timestamps found in log file")
+  else:
+    LOGGER.debug(
+        "Selected maximum base_time from %d timestamps: %s", found, old_base_time
+    )
+
+
+def _find_base_time(
+    lines: Iterable[str], base_rule: TimestampRule
+) -> datetime.datetime | None:
+  """Returns the latest base_time timestamp in the lines, or None."""
+  old_base_time, found = _scan_base_time(lines, base_rule)
+  _log_base_time(old_base_time, found)
+  return old_base_time
+
+
+def _iter_replay_entries(
+    lines: Iterable[str],
+    api: str,
+    rules: tuple[TimestampRule, ...],
+    shifter: TimestampShifter,
+    raw_json: bool = False,
+) -> Iterator[dict[str, Any] | codec.RawJson]:
+  """Yields the API entry for each line, with its timestamps updated.
+
+  With raw_json, udmevents and entities lines are yielded as codec.RawJson
+  instead of being decoded into dicts.
+  """
+  for log_text in lines:
+    # Collect all timestamp replacements for this line using a change map
+    # This prevents double-updates and handles overlapping patterns intelligently
+    change_map = _scan_timestamp_changes(log_text, rules, shifter)
+    log_text = _apply_timestamp_changes(log_text, change_map)
+
+    LOGGER.debug("log_text after all ts updates: %r", log_text)
+    if api == "unstructuredlogentries":
+      yield {"logText": sanitize_log_text(log_text)}
+    elif raw_json:  # udmevents and entities
+      yield codec.raw_json(log_text)
+    else:
+      yield codec.loads(log_text)
+
+
+def _iter_timed_replay_entries(
+    lines: Iterable[str],
+    plan: LogTypePlan,
+    shifter: TimestampShifter,
+    raw_json: bool = False,
+) -> Iterator[tuple[float, dict[str, Any] | codec.RawJson]]:
+  """Yields each line's API entry with the time its base_time is shifted to.
+
+  The time is in epoch seconds. A line without a base_time timestamp takes
+  the time of the line before it, or -inf before the first one.
+  """
+  base_rule = plan.base_rule
+  # _iter_replay_entries yields each line's entry before reading the next
+  event_time = [float("-inf")]
+
+  def timed_lines() -> Iterator[str]:
+    for log_text in lines:
+      match = base_rule.pattern.search(log_text)
+      timestamp_str = match.group(base_rule.group) if match else None
+      if timestamp_str:
+        try:
+          event_time[0] = shifter.shifted_seconds(timestamp_str, base_rule)
+        except (ValueError, OverflowError) as e:
+          LOGGER.warning("Failed to parse base timestamp '%s': %s", timestamp_str, e)
+      yield log_text
+
+  for entry in _iter_replay_entries(
+      timed_lines(), plan.api, plan.rules, shifter, raw_json
+  ):
+    yield event_time[0], entry
+
+
+@dataclasses.dataclass(frozen=True)
+class LineChunk:
+  """A newline-aligned byte range of a log file, transformed by one worker.
+
+  Attributes:
+    path: Local path of the log file.
+    start: Offset of the chunk's first byte.
+    end: Offset just past the chunk's last byte.
+    timestamp_map_path: YAML timestamp configuration of the logtype.
+    log_type: Logtype of the file.
+  """
+
+  path: str
+  start: int
+  end: int
+  timestamp_map_path: str
+  log_type: str
+
+  def read_lines(self) -> list[str]:
+    """Returns the chunk's lines, split as _iter_log_lines splits the file.
+
+    Chunks start and end after a newline byte, which never occurs inside a
+    multi-byte UTF-8 character or between the two bytes of a CRLF, so
+    decoding and splitting the chunks separately gives the file's lines.
+    """
+    with open(self.path, "rb") as fh:
+      fh.seek(self.start)
+      data = fh.read(self.end - self.start)
+    return data.decode("utf-8", errors="replace").splitlines()
+
+  def get_plan(self) -> LogTypePlan:
+    """Returns the logtype's timestamp plan, loaded once per process."""
+    return load_timestamp_plan(self.timestamp_map_path).get(self.log_type)
+
+
+def _get_line_chunks(
+    path: str, timestamp_map_path: str, log_type: str, chunk_bytes: int
+) -> list[LineChunk]:
+  """Splits a log file into chunks of about chunk_bytes that end in a newline."""
+  size = os.path.getsize(path)
+  offsets = [0]
+  with open(path, "rb") as fh:
+    while offsets[-1] + chunk_bytes < size:
+      # the next chunk starts after the first newline at or past the target
+      fh.seek(offsets[-1] + chunk_bytes - 1)
+      fh.readline()
+      if fh.tell() >= size:
+        break
+      offsets.append(fh.tell())
+  offsets.append(size)
+  return [
+      LineChunk(path, start, end, timestamp_map_path, log_type)
+      for start, end in itertools.pairwise(offsets)
+  ]
+
+
+def _scan_chunk_base_time(chunk: LineChunk) -> tuple[datetime.datetime | None, int]:
+  """Worker: returns the latest base_time timestamp of a chunk and the count."""
+  return _scan_base_time(chunk.read_lines(), chunk.get_plan().base_rule)
+
+
+def _transform_chunk(
+    chunk: LineChunk,
+    old_base_time: datetime.datetime,
+    ts_delta_dict: dict[str, int],
+    now: datetime.datetime,
+    raw_json: bool,
+) -> list[dict[str, Any] | codec.RawJson]:
+  """Worker: returns the API entries of a chunk's lines."""
+  plan = chunk.get_plan()
+  shifter = TimestampShifter(old_base_time, ts_delta_dict, now)
+  return list(
+      _iter_replay_entries(chunk.read_lines(), plan.api, plan.rules, shifter, raw_json)
+  )
+
+
+def _find_chunked_base_time(
+    executor: concurrent.futures.Executor, chunks: list[LineChunk]
+) -> datetime.datetime | None:
+  """Returns the latest base_time timestamp of all chunks, scanned in parallel."""
+  old_base_time = None
+  found = 0
+  for chunk_base_time, chunk_found in executor.map(_scan_chunk_base_time, chunks):
+    found += chunk_found
+    if chunk_base_time is not None and (
+        old_base_time is None or chunk_base_time > old_base_time
+    ):
+      old_base_time = chunk_base_time
+  _log_base_time(old_base_time, found)
+  return old_base_time
+
+
+def _iter_chunked_replay_entries(
+    executor: concurrent.futures.Executor,
+    chunks: list[LineChunk],
+    shifter: TimestampShifter,
+    raw_json: bool,
+    window: int,
+) -> Iterator[dict[str, Any] | codec.RawJson]:
+  """Yields the entries of all chunks, in file order, transformed in parallel.
+
+  At most `window` chunks are transformed or waiting to be consumed, so
+  memory stays bounded however far the workers get ahead of the batcher.
+  """
+  pending: collections.deque[concurrent.futures.Future] = collections.deque()
+  for chunk in chunks:
+    pending.append(
+        executor.submit(
+            _transform_chunk,
+            chunk,
+            shifter.old_base_time,
+            shifter.ts_delta_dict,
+            shifter.now,
+            raw_json,
+        )
+    )
+    if len(pending) >= window:
+      yield from pending.popleft().result()
+  while pending:
+    yield from pending.popleft().result()
+
+
 # pylint: disable-next=missing-function-docstring
 def usecase_replay_logtype(
     use_case: str,
@@ -644,6 +2384,8 @@ def usecase_replay_logtype(
     ts_map_path: str | None = "./",
     entities: bool | None = False,
     local_file_output: bool = False,
+    poster: BatchPoster | None = None,
+    chunk_workers: int | None = None,
 ) -> datetime.datetime | None:
   """Replays log data for a specific use case and log type.
 
@@ -657,6 +2399,10 @@ def usecase_replay_logtype(
     ts_map_path: disk location of the yaml files
     entities: bool for Entities (True) vs Events (False)
     local_file_output: bool to write to local files instead of API
+    poster: shared BatchPoster for the whole replay; its batches may still be
+      in flight on return. Defaults to one for this logtype only.
+    chunk_workers: worker processes transforming a local log file larger than
+      CHUNK_BYTES in chunks. Defaults to LOGSTORY_CHUNK_WORKERS.
 
   Returns:
     old_base_time: so that subsequent logtypes/usecases can all use the same value
@@ -664,138 +2410,330 @@ def usecase_replay_logtype(
   timestamp_delta = timestamp_delta or "1d"
   ts_delta_dict = _get_timestamp_delta_dict(timestamp_delta)
 
-  # Construct the full path to the YAML file
-  if entities:
-    file_path = os.path.join(ts_map_path, "logtypes_entities_timestamps.yaml")
-  else:
-    file_path = os.path.join(ts_map_path, "logtypes_events_timestamps.yaml")
-
-  if file_path.startswith("."):
-    file_path = os.path.split(__file__)[0] + "/" + file_path
-  with open(file_path) as fh:
-    timestamp_map = yaml.safe_load(fh)
-
-    # Validate timestamp configuration before processing
-    _validate_timestamp_config(log_type, timestamp_map)
-
-    api_for_log_type = timestamp_map[log_type]["api"]
-    # Get optional log_dir from YAML config, defaults to None for backwards compatibility
-    log_type_log_dir = timestamp_map[log_type].get("log_dir")
-    log_content = _get_log_content(use_case, log_type, entities)
-    ingestion_labels = _get_ingestion_labels(
-        use_case, logstory_exe_time, api_for_log_type
+  # Validated, precompiled timestamp rules shared by all logtypes of the run
+  plan = load_timestamp_plan(_get_timestamp_map_path(ts_map_path, entities)).get(
+      log_type
+  )
+  api_for_log_type = plan.api
+  # Get optional log_dir from YAML config, defaults to None for backwards compatibility
+  log_type_log_dir = plan.log_dir
+  if api_for_log_type not in {"unstructuredlogentries", "udmevents", "entities"}:
+    raise ValueError("Only unstructuredlogentries and udmevents are supported")
+  ingestion_labels = _get_ingestion_labels(
+      use_case, logstory_exe_time, api_for_log_type
+  )
+  LOGGER.info("Processing file: %s", _get_log_object_name(use_case, log_type, entities))
+
+  # Large local files are split into chunks transformed by worker processes
+  chunk_workers = CHUNK_WORKERS if chunk_workers is None else chunk_workers
+  chunks = []
+  if chunk_workers > 1 and not get_replay_context().storage_client:
+    chunks = _get_line_chunks(
+        _get_local_log_path(use_case, log_type, entities),
+        _get_timestamp_map_path(ts_map_path, entities),
+        log_type,
+        CHUNK_BYTES,
+    )
+  executor = None
+  if len(chunks) > 1:
+    chunk_workers = min(chunk_workers, len(chunks))
+    LOGGER.info("Transforming %d chunks with %d workers", len(chunks), chunk_workers)
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=chunk_workers, mp_context=multiprocessing.get_context("spawn")
     )
-    # base time stamp (BTS) determines the anchor point; others are relative
-    btspattern, btsgroup, btsformat = [
-        (
-            timestamp.get("pattern"),
-            timestamp.get("group"),
-            timestamp.get("dateformat"),
-        )
-        for timestamp in timestamp_map[log_type]["timestamps"]
-        if timestamp.get("base_time")
-    ][0]
 
+  try:
     # First pass: Find all base_time timestamps and get the maximum
-    if old_base_time is None:
-      base_timestamps = []
-      for log_text in log_content.splitlines():
-        match = re.search(btspattern, log_text)
-        if match and match.groups():
-          timestamp_str = match.group(btsgroup)
-          try:
-            if btsformat == "epoch":
-              # Unix epoch timestamp
-              dt = datetime.datetime.fromtimestamp(int(timestamp_str))
-            elif btsformat == "windowsfiletime":
-              # Windows FileTime
-              dt = filetime_to_datetime(int(timestamp_str))
-            else:
-              # Standard strptime format
-              dt = datetime.datetime.strptime(timestamp_str, btsformat)
-            base_timestamps.append(dt)
-          except (ValueError, OverflowError) as e:
-            LOGGER.warning("Failed to parse base timestamp '%s': %s", timestamp_str, e)
-            continue
-
-      if base_timestamps:
-        old_base_time = max(base_timestamps)
-        LOGGER.debug(
-            "Selected maximum base_time from %d timestamps: %s",
-            len(base_timestamps),
-            old_base_time,
-        )
-      else:
-        LOGGER.error("No valid base_time timestamps found in log file")
-
-    # Second pass: Process log entries
-    entries = []
-    for line_no, log_text in enumerate(log_content.splitlines()):
-
-      # Collect all timestamp replacements for this line using a change map
-      # This prevents double-updates and handles overlapping patterns intelligently
-      change_map: dict[tuple[int, int, str], str] = (
-          {}
-      )  # (start, end, original_text) -> replacement_text
-
-      for ts_n, timestamp in enumerate(timestamp_map[log_type]["timestamps"]):
-        replacement_info = _calculate_timestamp_replacement(
-            log_text,
-            timestamp,
-            old_base_time,
-            ts_delta_dict,
-        )
-        if replacement_info:
-          match, replacement = replacement_info
-          change_key = (match.start(), match.end(), match.group(0))
-
-          if change_key in change_map:
-            # Check if it's the same change or a conflict
-            if change_map[change_key] != replacement:
-              LOGGER.warning(
-                  "Timestamp replacement conflict at position %d-%d: '%s' -> '%s' vs"
-                  " '%s'",
-                  match.start(),
-                  match.end(),
-                  match.group(0),
-                  change_map[change_key],
-                  replacement,
-              )
-            # else: Same change, no-op
-          else:
-            change_map[change_key] = replacement
-
-        LOGGER.debug("Finished processing line N: %s, timestamp N: %s", line_no, ts_n)
-
-      # Apply all unique replacements in reverse order to preserve positions
-      for (start, end, _), replacement in sorted(
-          change_map.items(), key=lambda x: x[0][0], reverse=True
-      ):
-        log_text = log_text[:start] + replacement + log_text[end:]
-
-      # accumulate all of the entries into memory
-      LOGGER.debug("log_text after all ts updates: %s", log_text)
-      LOGGER.debug("now as repr:")
-      LOGGER.debug(repr(log_text))
-      if api_for_log_type == "unstructuredlogentries":
-        entries.append({"logText": sanitize_log_text(log_text)})
-      elif api_for_log_type in {"udmevents", "entities"}:
-        entries.append(json.loads(log_text))
-      else:
-        raise ValueError("Only unstructuredlogentries and udmevents are supported")
+    if old_base_time is None and executor is not None:
+      old_base_time = _find_chunked_base_time(executor, chunks)
+    elif old_base_time is None:
+      old_base_time = _find_base_time(
+          _iter_log_lines(use_case, log_type, entities), plan.base_rule
+      )
 
+    # Second pass: stream the transformed entries into the batch poster
+    shifter = TimestampShifter(old_base_time, ts_delta_dict)
+    if poster is not None:
+      backend = poster.backend
+    else:
+      backend = None if local_file_output else get_replay_context().ingestion_backend
+    raw_json = RAW_JSON and (
+        local_file_output or api_for_log_type in getattr(backend, "raw_json_apis", ())
+    )
+    if executor is not None:
+      entries = _iter_chunked_replay_entries(
+          executor, chunks, shifter, raw_json, 2 * chunk_workers
+      )
+    else:
+      entries = _iter_replay_entries(
+          _iter_log_lines(use_case, log_type, entities),
+          api_for_log_type,
+          plan.rules,
+          shifter,
+          raw_json,
+      )
     _post_entries_in_batches(
         api_for_log_type,
         log_type,
         entries,
         ingestion_labels,
-        ingestion_backend,
+        backend,
         local_file_output,
         log_type_log_dir,
+        poster,
+    )
+  finally:
+    if executor is not None:
+      executor.shutdown(cancel_futures=True)
+  if executor is None:
+    cache_info = shifter.cache_info()
+    LOGGER.info(
+        "Timestamp shift cache for %s: %d hits, %d misses",
+        log_type,
+        cache_info.hits,
+        cache_info.misses,
     )
   return old_base_time
 
 
+def usecase_replay_realtime(
+    use_case: str,
+    log_types: list[str],
+    logstory_exe_time: datetime.datetime,
+    poster: BatchPoster,
+    timestamp_delta: str | None = None,
+    ts_map_path: str | None = "./",
+    entities: bool | None = False,
+    speedup: float = REALTIME_SPEEDUP,
+) -> dict[str, Any]:
+  """Replays logtypes of a usecase as one live timeline.
+
+  Timestamps are updated as by usecase_replay_logtype, but instead of
+  posting each logtype as fast as possible, a CadenceScheduler releases
+  every line when its shifted base_time comes due, `speedup` times faster
+  than the original pace, with the logtypes interleaved by time.
+
+  Args:
+    use_case: value from yaml (ex. AWS, AZURE_AD, ...)
+    log_types: logtypes of the usecase to replay together
+    logstory_exe_time: common to all logtypes and all usecases
+    poster: BatchPoster the batches are posted through
+    timestamp_delta: [Nd][Nh][Nm] string, see usecase_replay_logtype
+    ts_map_path: disk location of the yaml files
+    entities: bool for Entities (True) vs Events (False)
+    speedup: how many times faster than the original pace to replay
+
+  Returns:
+    The scheduler's counts of released and late entries.
+  """
+  ts_delta_dict = _get_timestamp_delta_dict(timestamp_delta or "1d")
+  timestamp_plan = load_timestamp_plan(_get_timestamp_map_path(ts_map_path, entities))
+  scheduler = CadenceScheduler(poster, speedup)
+  for log_type in log_types:
+    plan = timestamp_plan.get(log_type)
+    if plan.api not in {"unstructuredlogentries", "udmevents", "entities"}:
+      raise ValueError("Only unstructuredlogentries and udmevents are supported")
+    LOGGER.info(
+        "Processing file: %s", _get_log_object_name(use_case, log_type, entities)
+    )
+    old_base_time = _find_base_time(
+        _iter_log_lines(use_case, log_type, entities), plan.base_rule
+    )
+    shifter = TimestampShifter(old_base_time, ts_delta_dict)
+    raw_json = RAW_JSON and plan.api in getattr(poster.backend, "raw_json_apis", ())
+    scheduler.add_stream(
+        plan.api,
+        log_type,
+        _get_ingestion_labels(use_case, logstory_exe_time, plan.api),
+        _iter_timed_replay_entries(
+            _iter_log_lines(use_case, log_type, entities), plan, shifter, raw_json
+        ),
+    )
+  return scheduler.run()
+
+
+@dataclasses.dataclass(frozen=True)
+class ReplayJob:
+  """One logtype of one usecase to replay, and how to post its batches.
+
+  Attributes:
+    use_case: Usecase name.
+    log_type: Logtype name.
+    logstory_exe_time: Start time shared by every job of the run.
+    timestamp_delta: [Nd][Nh][Nm] shift, see usecase_replay_logtype.
+    entities: Replay entities instead of events.
+    local_file_output: Write to local files instead of the API.
+    max_in_flight: Batches posted at once by the job's BatchPoster.
+    ordered: Post the job's batches in file order.
+    adaptive: Tune batch size and concurrency with an AdaptiveController.
+    save_tuning: Resume and save the adaptive tuning.
+    chunk_workers: Processes transforming a large log file in chunks.
+    eps: Target events per second of the whole run, or 0 for no limit.
+    bytes_per_sec: Target bytes per second of the whole run, or 0.
+  """
+
+  use_case: str
+  log_type: str
+  logstory_exe_time: datetime.datetime
+  timestamp_delta: str | None = None
+  entities: bool | None = False
+  local_file_output: bool = False
+  max_in_flight: int = 1
+  ordered: bool = False
+  adaptive: bool = False
+  save_tuning: bool = False
+  chunk_workers: int = 1
+  eps: float = 0
+  bytes_per_sec: float = 0
+
+
+# schedule shared by the rate limiters of replay_jobs() workers
+_worker_rate_state = None
+
+
+def _init_replay_worker(rate_state) -> None:
+  """Keeps the run's shared rate limiter schedule in a worker process."""
+  global _worker_rate_state  # noqa: PLW0603
+  _worker_rate_state = rate_state
+
+
+@dataclasses.dataclass(frozen=True)
+class ReplayResult:
+  """Outcome of a ReplayJob.
+
+  Attributes:
+    job: The job.
+    old_base_time: Base time of the replayed log, if one was found.
+    error: "ExceptionType: message" if the job failed, else None.
+  """
+
+  job: ReplayJob
+  old_base_time: datetime.datetime | None = None
+  error: str | None = None
+
+
+def _run_replay_job(job: ReplayJob) -> ReplayResult:
+  """Replays one job with this process's ingestion backend.
+
+  Errors are returned rather than raised, as text, so that exceptions which
+  cannot be pickled still reach the parent process.
+  """
+  ingestion_backend = get_replay_context().ingestion_backend
+  controller = None
+  if job.adaptive and ingestion_backend is not None:
+    controller = AdaptiveController.for_backend(
+        ingestion_backend, job.max_in_flight, job.save_tuning
+    )
+  rate_limiter = RateLimiter.for_rates(
+      job.eps, job.bytes_per_sec, shared_state=_worker_rate_state
+  )
+  try:
+    with BatchPoster(
+        ingestion_backend,
+        job.max_in_flight,
+        job.ordered,
+        controller=controller,
+        rate_limiter=rate_limiter,
+    ) as poster:
+      old_base_time = usecase_replay_logtype(
+          job.use_case,
+          job.log_type,
+          job.logstory_exe_time,
+          timestamp_delta=job.timestamp_delta,
+          entities=job.entities,
+          local_file_output=job.local_file_output,
+          poster=poster,
+          chunk_workers=job.chunk_workers,
+      )
+  except Exception as e:
+    LOGGER.exception("Replay of %s/%s failed", job.use_case, job.log_type)
+    return ReplayResult(job, error=f"{type(e).__name__}: {e}")
+  return ReplayResult(job, old_base_time)
+
+
+def replay_jobs(jobs: list[ReplayJob], workers: int) -> Iterator[ReplayResult]:
+  """Replays jobs in parallel worker processes.
+
+  Workers are spawned, not forked, so none inherits the parent's threads or
+  HTTP connections: each imports this module afresh and builds its own
+  ingestion backend from the environment, which therefore has to hold the
+  run's configuration (as the CLI's does once it has parsed its options).
+  Jobs with a target rate share one schedule, so the rate holds for the
+  whole run rather than for each worker.
+
+  Args:
+    jobs: Jobs to replay.
+    workers: Maximum number of worker processes.
+
+  Yields:
+    The result of each job, in the order the jobs finish.
+  """
+  if not jobs:
+    return
+  context = multiprocessing.get_context("spawn")
+  rate_state = None
+  if any(job.eps or job.bytes_per_sec for job in jobs):
+    rate_state = RateLimiter.create_shared_state(context)
+  with concurrent.futures.ProcessPoolExecutor(
+      max_workers=min(workers, len(jobs)),
+      mp_context=context,
+      initializer=_init_replay_worker,
+      initargs=(rate_state,),
+  ) as executor:
+    futures = [executor.submit(_run_replay_job, job) for job in jobs]
+    for future in concurrent.futures.as_completed(futures):
+      yield future.result()
+
+
+def _replay_cloud_jobs_in_processes(
+    jobs: list[tuple[str, str]],
+    logstory_exe_time: datetime.datetime,
+    entities: str | None,
+) -> None:
+  """Replays the Cloud Function's (usecase, logtype) jobs in WORKERS processes.
+
+  Raises:
+    RuntimeError: If any job failed; the others still ran to completion.
+  """
+  replay_job_list = [
+      ReplayJob(
+          use_case,
+          log_type,
+          logstory_exe_time,
+          timestamp_delta="1d",
+          entities=bool(entities),
+          max_in_flight=MAX_IN_FLIGHT,
+          ordered=ORDERED_POSTING,
+          adaptive=ADAPTIVE_POSTING,
+          save_tuning=SAVE_TUNING,
+          eps=TARGET_EPS,
+          bytes_per_sec=TARGET_BYTES_PER_SEC,
+      )
+      for use_case, log_type in jobs
+  ]
+  failures = []
+  for result in replay_jobs(replay_job_list, WORKERS):
+    if result.error:
+      LOGGER.error(
+          "use_case: %s, log_type: %s failed: %s",
+          result.job.use_case,
+          result.job.log_type,
+          result.error,
+      )
+      failures.append(result)
+    else:
+      LOGGER.info(
+          "use_case: %s, log_type: %s replayed",
+          result.job.use_case,
+          result.job.log_type,
+      )
+  if failures:
+    raise RuntimeError(
+        f"{len(failures)} of {len(replay_job_list)} logtypes failed: "
+        + "; ".join(f"{r.job.use_case}/{r.job.log_type}: {r.error}" for r in failures)
+    )
+
+
 def main(request=None, enabled=False):  # pylint: disable=unused-argument
   """Read config and call usecase_replay_logtype for each [usecase, logtype].
 
@@ -830,32 +2768,44 @@ def main(request=None, enabled=False):  # pylint: disable=unused-argument
 
   with open(os.path.join(os.path.dirname(__file__), filename)) as fh:
     yaml_use_cases = yaml.safe_load(fh)
-    use_cases = list(yaml_use_cases.keys())
-    for use_case in use_cases:
-      if (yaml_use_cases[use_case]["enabled"]) > 0 or enabled:
-        LOGGER.info("use_case: %s", use_case)
-        old_base_time = None  # reset for each usecase
-        for log_type in yaml_use_cases[use_case]["log_type"]:
-          old_base_time = None  # reset for each log_type
-          LOGGER.info("log_type: %s", log_type)
-          old_base_time = usecase_replay_logtype(
-              use_case,
-              log_type,
-              logstory_exe_time,
-              old_base_time,
-              timestamp_delta="1d",
-              entities=entities,  # bool
-          )
-    LOGGER.info("use_case: %s completed.", use_case)
-    LOGGER.info(
-        "UDM Search for the loaded logs:\n"
-        "    metadata.ingested_timestamp.seconds >= %s\n"
-        "    metadata.log_type = %s\n"
-        '    metadata.ingestion_labels["replayed_from"] = "logstory"\n'
-        '    metadata.ingestion_labels["log_replay"] = "true"\n'
-        '    metadata.ingestion_labels["source_usecase"] = "%s"',
-        int(logstory_exe_time.timestamp()),
-        log_type,
-        use_case,
-    )
+  use_cases = list(yaml_use_cases.keys())
+  if WORKERS > 1:
+    jobs = [
+        (use_case, log_type)
+        for use_case in use_cases
+        if (yaml_use_cases[use_case]["enabled"]) > 0 or enabled
+        for log_type in yaml_use_cases[use_case]["log_type"]
+    ]
+    _replay_cloud_jobs_in_processes(jobs, logstory_exe_time, entities)
+    use_case, log_type = jobs[-1] if jobs else (use_cases[-1], None)
+  else:
+    with _create_batch_poster(get_replay_context().ingestion_backend) as poster:
+      for use_case in use_cases:
+        if (yaml_use_cases[use_case]["enabled"]) > 0 or enabled:
+          LOGGER.info("use_case: %s", use_case)
+          old_base_time = None  # reset for each usecase
+          for log_type in yaml_use_cases[use_case]["log_type"]:
+            old_base_time = None  # reset for each log_type
+            LOGGER.info("log_type: %s", log_type)
+            old_base_time = usecase_replay_logtype(
+                use_case,
+                log_type,
+                logstory_exe_time,
+                old_base_time,
+                timestamp_delta="1d",
+                entities=entities,  # bool
+                poster=poster,
+            )
+  LOGGER.info("use_case: %s completed.", use_case)
+  LOGGER.info(
+      "UDM Search for the loaded logs:\n"
+      "    metadata.ingested_timestamp.seconds >= %s\n"
+      "    metadata.log_type = %s\n"
+      '    metadata.ingestion_labels["replayed_from"] = "logstory"\n'
+      '    metadata.ingestion_labels["log_replay"] = "true"\n'
+      '    metadata.ingestion_labels["source_usecase"] = "%s"',
+      int(logstory_exe_time.timestamp()),
+      log_type,
+      use_case,
+  )
   return "Success Events!"
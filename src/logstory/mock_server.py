@@ -0,0 +1,440 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Local stand-in for the SecOps ingestion APIs, for load tests.
+
+Serves the routes LegacyIngestionBackend and RestIngestionBackend call and
+an OAuth token endpoint, and can add latency, errors, 429 throttling and a
+request size limit to batches. Replays reach it through
+LOGSTORY_API_BASE_URL:
+
+  python -m logstory.mock_server --port 8080 --latency-ms 200 \
+      --throttle-rate 0.05 --write-credentials /tmp/mock_credentials.json
+  LOGSTORY_API_BASE_URL=http://127.0.0.1:8080 logstory replay all \
+      --credentials-path /tmp/mock_credentials.json --customer-id <uuid4>
+
+GET /stats returns the requests, batches and entries received so far.
+"""
+
+import argparse
+import dataclasses
+import gzip
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import urlsplit
+
+try:
+  from .ingestion import MAX_REQUEST_BYTES
+except ImportError:
+  from ingestion import MAX_REQUEST_BYTES
+
+LOGGER = logging.getLogger(__name__)
+
+_PARENT = r"/v1alpha/(?P<parent>projects/[^/]+/locations/[^/]+/instances/[^/]+)"
+# route name, path and the keys of the entries in the request body
+BATCH_ROUTES = (
+    ("unstructuredlogentries", "/v2/unstructuredlogentries:batchCreate", ("entries",)),
+    ("udmevents", "/v2/udmevents:batchCreate", ("events",)),
+    ("entities", "/v2/entities:batchCreate", ("entities",)),
+    ("logs:import", _PARENT + "/logTypes/[^/]+/logs:import", ("inline_source", "logs")),
+    ("events:import", _PARENT + "/events:import", ("inline_source", "events")),
+    ("entities:import", _PARENT + "/entities:import", ("inline_source", "entities")),
+)
+_BATCH_PATTERNS = [(name, re.compile(path), keys) for name, path, keys in BATCH_ROUTES]
+_FORWARDERS_PATTERN = re.compile(_PARENT + "/forwarders")
+_STATUS_NAMES = {
+    400: "INVALID_ARGUMENT",
+    404: "NOT_FOUND",
+    413: "INVALID_ARGUMENT",
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    502: "UNAVAILABLE",
+    503: "UNAVAILABLE",
+    504: "DEADLINE_EXCEEDED",
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class MockServerConfig:
+  """Faults the mock server adds to batch requests.
+
+  Attributes:
+    latency: Seconds each batch request takes.
+    latency_jitter: Up to this many more seconds, at random.
+    error_rate: Share of batches answered with error_status.
+    error_status: Status of those errors; the backends retry 502 and 503
+      but not 500 or 504.
+    throttle_rate: Share of batches answered with 429.
+    retry_after: Retry-After, in seconds, sent with 429s; None sends none.
+    max_request_bytes: Batches whose decompressed body is larger get 413.
+    seed: Seed of the random faults, for repeatable runs.
+  """
+
+  latency: float = 0.0
+  latency_jitter: float = 0.0
+  error_rate: float = 0.0
+  error_status: int = 503
+  throttle_rate: float = 0.0
+  retry_after: float | None = None
+  max_request_bytes: int = MAX_REQUEST_BYTES
+  seed: int | None = None
+
+
+@dataclasses.dataclass
+class MockServerStats:
+  """Thread-safe counters of the requests a mock server answered."""
+
+  requests: int = 0
+  batches: int = 0
+  entries: int = 0
+  bytes: int = 0
+  batches_by_route: dict[str, int] = dataclasses.field(default_factory=dict)
+  responses_by_status: dict[str, int] = dataclasses.field(default_factory=dict)
+  _lock: threading.Lock = dataclasses.field(
+      default_factory=threading.Lock, repr=False, compare=False
+  )
+
+  def record(
+      self, status: int, route: str | None = None, entries: int = 0, size: int = 0
+  ):
+    """Count one response, and the batch it accepted, if any.
+
+    Args:
+      status: HTTP status of the response.
+      route: Name of the batch route, if the request was an accepted batch.
+      entries: Entries in the accepted batch.
+      size: Decompressed body bytes of the accepted batch.
+    """
+    with self._lock:
+      self.requests += 1
+      key = str(status)
+      self.responses_by_status[key] = self.responses_by_status.get(key, 0) + 1
+      if route:
+        self.batches += 1
+        self.entries += entries
+        self.bytes += size
+        self.batches_by_route[route] = self.batches_by_route.get(route, 0) + 1
+
+  def as_dict(self) -> dict[str, Any]:
+    """Get a consistent snapshot of the counters.
+
+    Returns:
+      Dictionary with requests, batches, entries, bytes, batches_by_route
+      and responses_by_status.
+    """
+    with self._lock:
+      return {
+          "requests": self.requests,
+          "batches": self.batches,
+          "entries": self.entries,
+          "bytes": self.bytes,
+          "batches_by_route": dict(self.batches_by_route),
+          "responses_by_status": dict(self.responses_by_status),
+      }
+
+
+def _error(status: int, message: str) -> dict[str, Any]:
+  """Get an error body in the format of Google APIs."""
+  return {
+      "error": {
+          "code": status,
+          "message": message,
+          "status": _STATUS_NAMES.get(status, "UNKNOWN"),
+      }
+  }
+
+
+class _Handler(BaseHTTPRequestHandler):
+  """Routes requests to the MockIngestionServer."""
+
+  server: "MockIngestionServer"
+  # keep connections open, as the real APIs do, without Nagle delaying the
+  # body written after the headers
+  protocol_version = "HTTP/1.1"
+  disable_nagle_algorithm = True
+
+  def do_GET(self):  # noqa: N802
+    path = urlsplit(self.path).path
+    if path == "/stats":
+      self._send(200, self.server.stats.as_dict(), count=False)
+    elif match := _FORWARDERS_PATTERN.fullmatch(path):
+      self._send(200, {"forwarders": self.server.list_forwarders(match["parent"])})
+    else:
+      self._send(404, _error(404, f"No route for GET {path}"))
+
+  def do_POST(self):  # noqa: N802
+    body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+    path = urlsplit(self.path).path
+    if path == "/token":
+      # any assertion is accepted; the token is never checked
+      self._send(
+          200,
+          {"access_token": "mock-token", "expires_in": 3600, "token_type": "Bearer"},
+      )
+      return
+    if match := _FORWARDERS_PATTERN.fullmatch(path):
+      try:
+        display_name = json.loads(body).get("displayName", "")
+      except ValueError:
+        self._send(400, _error(400, "Invalid JSON"))
+        return
+      self._send(200, self.server.create_forwarder(match["parent"], display_name))
+      return
+    for name, pattern, keys in _BATCH_PATTERNS:
+      if pattern.fullmatch(path):
+        encoding = self.headers.get("Content-Encoding")
+        status, response, headers = self.server.handle_batch(name, keys, body, encoding)
+        self._send(status, response, headers=headers, count=False)
+        return
+    self._send(404, _error(404, f"No route for POST {path}"))
+
+  def _send(
+      self,
+      status: int,
+      response: dict[str, Any],
+      headers: dict[str, str] | None = None,
+      count: bool = True,
+  ) -> None:
+    """Send a JSON response, counting it unless handle_batch already did."""
+    if count:
+      self.server.stats.record(status)
+    data = json.dumps(response).encode("utf-8")
+    self.send_response(status)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(data)))
+    for name, value in (headers or {}).items():
+      self.send_header(name, value)
+    self.end_headers()
+    self.wfile.write(data)
+
+  def log_message(self, format, *args):  # noqa: A002
+    if LOGGER.isEnabledFor(logging.DEBUG):
+      LOGGER.debug("%s %s", self.address_string(), format % args)
+
+
+class MockIngestionServer(ThreadingHTTPServer):
+  """HTTP server standing in for the legacy and REST ingestion APIs.
+
+  Used as a context manager, the server answers requests in a background
+  thread:
+
+    with MockIngestionServer(config=MockServerConfig(latency=0.1)) as server:
+      backend = LegacyIngestionBackend(auth, customer_id, base_url=server.base_url)
+  """
+
+  daemon_threads = True
+
+  def __init__(
+      self,
+      address: tuple[str, int] = ("127.0.0.1", 0),
+      config: MockServerConfig | None = None,
+  ):
+    """Bind the server.
+
+    Args:
+      address: Host and port to listen on; port 0 picks a free port.
+      config: Faults to add to batch requests (default none).
+    """
+    super().__init__(address, _Handler)
+    self.config = config or MockServerConfig()
+    self.stats = MockServerStats()
+    self._random = random.Random(self.config.seed)  # noqa: S311 - faults, not crypto
+    self._lock = threading.Lock()
+    self._forwarders: dict[str, list[dict[str, Any]]] = {}
+    self._thread: threading.Thread | None = None
+
+  @property
+  def base_url(self) -> str:
+    """URL to set as LOGSTORY_API_BASE_URL."""
+    host, port = self.server_address[:2]
+    return f"http://{host}:{port}"
+
+  def __enter__(self) -> "MockIngestionServer":
+    """Starts serving in a background thread."""
+    self._thread = threading.Thread(
+        target=self.serve_forever, name="logstory-mock-server", daemon=True
+    )
+    self._thread.start()
+    return self
+
+  def __exit__(self, *args) -> None:
+    """Stops serving and closes the socket."""
+    self.shutdown()
+    self.server_close()
+    self._thread.join()
+
+  def list_forwarders(self, parent: str) -> list[dict[str, Any]]:
+    """Get the forwarders created under an instance."""
+    with self._lock:
+      return list(self._forwarders.get(parent, []))
+
+  def create_forwarder(self, parent: str, display_name: str) -> dict[str, Any]:
+    """Create a forwarder under an instance."""
+    forwarder = {
+        "name": f"{parent}/forwarders/{uuid.uuid4()}",
+        "displayName": display_name,
+    }
+    with self._lock:
+      self._forwarders.setdefault(parent, []).append(forwarder)
+    return forwarder
+
+  def handle_batch(
+      self,
+      route: str,
+      keys: tuple[str, ...],
+      body: bytes,
+      content_encoding: str | None = None,
+  ) -> tuple[int, dict[str, Any], dict[str, str]]:
+    """Answer a batch request, after the configured latency and faults.
+
+    Args:
+      route: Name of the batch route.
+      keys: Keys of the list of entries in the request body.
+      body: Request body as received.
+      content_encoding: Content-Encoding of the body, if any.
+
+    Returns:
+      Status, response body and response headers.
+    """
+    config = self.config
+    with self._lock:
+      delay = config.latency + self._random.uniform(0, config.latency_jitter)
+      draw = self._random.random()
+    time.sleep(delay)
+
+    status, response, headers = 200, {}, {}
+    entries = []
+    if content_encoding == "gzip":
+      body = gzip.decompress(body)
+    if len(body) > config.max_request_bytes:
+      status = 413
+      response = _error(
+          status,
+          f"Request of {len(body)} bytes exceeds {config.max_request_bytes} bytes",
+      )
+    elif draw < config.throttle_rate:
+      status, response = 429, _error(429, "Quota exceeded")
+      if config.retry_after is not None:
+        headers["Retry-After"] = f"{config.retry_after:g}"
+    elif draw < config.throttle_rate + config.error_rate:
+      status = config.error_status
+      response = _error(status, "Injected error")
+    else:
+      try:
+        entries = json.loads(body)
+        for key in keys:
+          entries = entries[key]
+      except (ValueError, KeyError, TypeError):
+        entries = None
+      if not isinstance(entries, list):
+        status = 400
+        response = _error(status, f"Request body has no {'.'.join(keys)} list")
+
+    if status == HTTPStatus.OK:
+      self.stats.record(status, route, len(entries), len(body))
+    else:
+      self.stats.record(status)
+    return status, response, headers
+
+
+def write_credentials(path: str, base_url: str) -> None:
+  """Write a service account key whose tokens come from a mock server.
+
+  The key is generated for this file only; requires the cryptography
+  package, which google-auth uses to sign token requests.
+
+  Args:
+    path: File to write.
+    base_url: URL of the mock server.
+  """
+  # imported on use: only needed to write credentials
+  from cryptography.hazmat.primitives import serialization  # noqa: PLC0415
+  from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: PLC0415
+
+  key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+  info = {
+      "type": "service_account",
+      "project_id": "logstory-mock",
+      "private_key_id": uuid.uuid4().hex,
+      "private_key": (
+          key.private_bytes(
+              serialization.Encoding.PEM,
+              serialization.PrivateFormat.PKCS8,
+              serialization.NoEncryption(),
+          ).decode("ascii")
+      ),
+      "client_email": "logstory-mock@logstory-mock.iam.gserviceaccount.com",
+      "client_id": "0",
+      "token_uri": f"{base_url}/token",
+  }
+  fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+  with os.fdopen(fd, "w") as fh:
+    json.dump(info, fh, indent=2)
+
+
+def main(argv: list[str] | None = None) -> None:
+  """Run a mock server until interrupted, then print its stats."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8080)
+  parser.add_argument("--latency-ms", type=float, default=0)
+  parser.add_argument("--jitter-ms", type=float, default=0)
+  parser.add_argument("--error-rate", type=float, default=0)
+  parser.add_argument("--error-status", type=int, default=503)
+  parser.add_argument("--throttle-rate", type=float, default=0)
+  parser.add_argument("--retry-after", type=float, help="seconds sent with 429s")
+  parser.add_argument("--max-request-bytes", type=int, default=MAX_REQUEST_BYTES)
+  parser.add_argument("--seed", type=int)
+  parser.add_argument(
+      "--write-credentials",
+      metavar="PATH",
+      help="write a service account key that gets tokens from this server",
+  )
+  parser.add_argument("--verbose", action="store_true", help="log every request")
+  args = parser.parse_args(argv)
+  logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+  config = MockServerConfig(
+      latency=args.latency_ms / 1000,
+      latency_jitter=args.jitter_ms / 1000,
+      error_rate=args.error_rate,
+      error_status=args.error_status,
+      throttle_rate=args.throttle_rate,
+      retry_after=args.retry_after,
+      max_request_bytes=args.max_request_bytes,
+      seed=args.seed,
+  )
+  with MockIngestionServer((args.host, args.port), config) as server:
+    if args.write_credentials:
+      write_credentials(args.write_credentials, server.base_url)
+      print(f"Wrote credentials to {args.write_credentials}")
+    print(f"Mock ingestion API listening; set LOGSTORY_API_BASE_URL={server.base_url}")
+    try:
+      while True:
+        time.sleep(3600)
+    except KeyboardInterrupt:
+      pass
+    print(json.dumps(server.stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+  main()
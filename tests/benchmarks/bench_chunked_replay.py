@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark replaying one very large log file with chunk worker processes.
+
+Builds a synthetic log of --size-mb by repeating a bundled log, then replays
+it to local files once per --chunk-workers value and checks that every run
+wrote exactly the same output.
+
+Usage:
+  python tests/benchmarks/bench_chunked_replay.py [--size-mb 5120]
+      [--log NETWORK_ANALYSIS/BRO_JSON] [--chunk-workers 1 2 4]
+"""
+
+import argparse
+import datetime
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from logstory import main as logstory_main  # noqa: E402
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src" / "logstory"
+
+
+def _write_synthetic_log(source: Path, path: Path, size: int) -> int:
+  """Writes copies of source to path until it holds at least size bytes."""
+  data = source.read_bytes()
+  if not data.endswith(b"\n"):
+    data += b"\n"
+  with path.open("wb") as fh:
+    written = 0
+    while written < size:
+      written += fh.write(data)
+  return written
+
+
+def _hash_output(log_dir: Path) -> str:
+  """Returns a hash of every file written under log_dir."""
+  digest = hashlib.sha256()
+  for path in sorted(log_dir.rglob("*")):
+    if path.is_file():
+      with path.open("rb") as fh:
+        while block := fh.read(1 << 20):
+          digest.update(block)
+  return digest.hexdigest()
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--size-mb", type=int, default=5120)
+  parser.add_argument("--log", default="NETWORK_ANALYSIS/BRO_JSON")
+  parser.add_argument("--chunk-workers", type=int, nargs="+", default=[1, 2, 4])
+  args = parser.parse_args()
+  logging.getLogger("logstory").setLevel(logging.WARNING)
+
+  use_case, log_type = args.log.split("/")
+  source = SRC_DIR / "usecases" / use_case / "EVENTS" / f"{log_type}.log"
+  now = datetime.datetime.now(datetime.UTC)
+  with tempfile.TemporaryDirectory() as tmp:
+    log_path = Path(tmp) / f"{log_type}.log"
+    size = _write_synthetic_log(source, log_path, args.size_mb * 1024 * 1024)
+    print(f"{args.log}: {size / 1024 / 1024:,.0f} MB synthetic log")
+
+    hashes = {}
+    for chunk_workers in args.chunk_workers:
+      out_dir = Path(tmp) / f"out-{chunk_workers}"
+      with (
+          patch.dict(os.environ, {"LOGSTORY_LOCAL_LOG_DIR": str(out_dir)}),
+          patch.object(
+              logstory_main, "_get_local_log_path", return_value=str(log_path)
+          ),
+          patch.object(logstory_main, "_get_current_time", return_value=now),
+      ):
+        start = time.perf_counter()
+        logstory_main.usecase_replay_logtype(
+            use_case,
+            log_type,
+            now,
+            local_file_output=True,
+            chunk_workers=chunk_workers,
+        )
+        elapsed = time.perf_counter() - start
+      hashes[chunk_workers] = _hash_output(out_dir)
+      print(
+          f"  chunk workers {chunk_workers:>2}: {elapsed:8.2f} s,"
+          f" {size / 1024 / 1024 / elapsed:,.1f} MB/s"
+      )
+
+  if len(set(hashes.values())) != 1:
+    sys.exit(f"Output differs between runs: {hashes}")
+  print(f"  identical output ({os.cpu_count()} CPUs)")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark batch posting with different numbers of requests in flight.
+
+Posts batches through LegacyIngestionBackend to a local MockIngestionServer
+with a fixed latency per request, and optionally 429 throttling, once per
+--max-in-flight value.
+
+Usage:
+  python tests/benchmarks/bench_concurrent_posting.py [--batches N]
+      [--latency-ms MS] [--throttle-rate 0.1] [--max-in-flight 1 4 8]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from logstory.auth import AuthHandler  # noqa: E402
+from logstory.ingestion import LegacyIngestionBackend, RetryPolicy  # noqa: E402
+from logstory.main import BatchPoster  # noqa: E402
+from logstory.mock_server import MockIngestionServer, MockServerConfig  # noqa: E402
+
+
+class _SessionAuthHandler(AuthHandler):
+  """Auth handler returning an unauthenticated session."""
+
+  def get_credentials(self):
+    """Return no credentials."""
+
+  def get_http_client(self):
+    """Return a plain requests session."""
+    return requests.Session()
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--batches", type=int, default=40)
+  parser.add_argument("--entries", type=int, default=200)
+  parser.add_argument("--latency-ms", type=float, default=50.0)
+  parser.add_argument("--throttle-rate", type=float, default=0.0)
+  parser.add_argument("--max-in-flight", type=int, nargs="+", default=[1, 4, 8])
+  args = parser.parse_args()
+  logging.getLogger("logstory").setLevel(logging.ERROR)
+
+  config = MockServerConfig(
+      latency=args.latency_ms / 1000, throttle_rate=args.throttle_rate, retry_after=0
+  )
+  entries = [{"logText": f"line {i} " + "x" * 200} for i in range(args.entries)]
+  print(
+      f"{args.batches} batches x {args.entries} entries, "
+      f"{args.latency_ms:.0f} ms server latency, "
+      f"{args.throttle_rate:.0%} throttled"
+  )
+  with MockIngestionServer(config=config) as server:
+    for max_in_flight in args.max_in_flight:
+      backend = LegacyIngestionBackend(
+          _SessionAuthHandler(),
+          "bench-customer",
+          retry_policy=RetryPolicy(max_retries=20),
+          base_url=server.base_url,
+      )
+      start = time.perf_counter()
+      with BatchPoster(backend, max_in_flight) as poster:
+        for _ in range(args.batches):
+          poster.submit("unstructuredlogentries", "BENCH_LOG", entries, [])
+      elapsed = time.perf_counter() - start
+      print(
+          f"  max_in_flight={max_in_flight:<3d} {elapsed:7.2f} s "
+          f"{args.batches / elapsed:8.1f} batches/s, "
+          f"{backend.retry_stats.retries} retries"
+      )
+
+
+if __name__ == "__main__":
+  main()
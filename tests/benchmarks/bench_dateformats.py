@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the fixed-width dateformat fast path against strptime/strftime.
+
+Usage:
+  python tests/benchmarks/bench_dateformats.py [--number N]
+"""
+
+import argparse
+import datetime
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from logstory.main import _get_fast_dateformat  # noqa: E402
+
+DATEFORMATS = [
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%b %d %H:%M:%S",
+]
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--number", type=int, default=100000)
+  args = parser.parse_args()
+
+  value = datetime.datetime(2024, 3, 14, 13, 37, 42)
+  print(f"{'dateformat':<22}  parse us: strptime / fast   format us: strftime / fast")
+  for dateformat in DATEFORMATS:
+    fast_dateformat = _get_fast_dateformat(dateformat)
+    text = value.strftime(dateformat)
+    timings = [
+        timeit.timeit(func, number=args.number) / args.number * 1e6
+        for func in (
+            lambda: datetime.datetime.strptime(text, dateformat),  # noqa: B023
+            lambda: fast_dateformat.parse(text),  # noqa: B023
+            lambda: value.strftime(dateformat),  # noqa: B023
+            lambda: fast_dateformat.format(value),  # noqa: B023
+        )
+    ]
+    print(
+        f"{dateformat:<22}  {timings[0]:>8.2f} / {timings[1]:<6.2f}"
+        f"       {timings[2]:>8.2f} / {timings[3]:.2f}"
+    )
+
+
+if __name__ == "__main__":
+  main()
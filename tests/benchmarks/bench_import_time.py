@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark importing Logstory modules and starting the CLI.
+
+Imports each module --repeat times in a new process with -X importtime and
+reports the median cumulative import time. Then it runs CLI commands that
+need no credentials, such as --help, and reports their wall time and which
+heavy SDKs they loaded. It exits with an error if the median import of
+logstory.logstory exceeds --budget-ms. Credential environment variables
+can be set to check that importing does not load them.
+
+Usage:
+  python tests/benchmarks/bench_import_time.py [--repeat N]
+      [--modules logstory.main logstory.logstory] [--cloud-function]
+      [--budget-ms 150]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess  # nosec B404
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src"
+CLI_MODULE = "logstory.logstory"
+CLI_COMMANDS = [["--help"], ["--version"], ["usecases", "list-installed"]]
+# modules a command that neither replays nor downloads should not load
+HEAVY_MODULES = [
+    "logstory.main",
+    "google.cloud.storage",
+    "google.cloud.secretmanager",
+    "google.auth.transport.requests",
+    "importlib.metadata",
+]
+RUN_CLI = f"""
+import sys, {CLI_MODULE}
+sys.argv = ["logstory", *sys.argv[1:]]
+try:
+  {CLI_MODULE}.app()
+finally:
+  # modules imported lazily are registered before they are loaded
+  loaded = [
+      m for m in {HEAVY_MODULES!r}
+      if m in sys.modules and type(sys.modules[m]).__name__ != "_LazyModule"
+  ]
+  print("loaded:", " ".join(loaded) or "-", file=sys.stderr)
+"""
+
+
+def _import_time_us(module: str, env: dict[str, str]) -> int:
+  """Imports module in a new interpreter; returns its cumulative import time."""
+  result = subprocess.run(  # nosec B603 # noqa: S603
+      [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+      env=env,
+      capture_output=True,
+      text=True,
+      check=True,
+  )
+  for line in result.stderr.splitlines():
+    # import time: self [us] | cumulative | imported package
+    _, cumulative, name = line.split("|")
+    if name.strip() == module:
+      return int(cumulative)
+  raise RuntimeError(f"{module} was not imported")
+
+
+def _run_cli(command: list[str], env: dict[str, str]) -> tuple[float, str]:
+  """Runs a CLI command in a new interpreter; returns its wall time and loads."""
+  start = time.perf_counter()
+  result = subprocess.run(  # nosec B603 # noqa: S603
+      [sys.executable, "-c", RUN_CLI, *command],
+      env=env,
+      capture_output=True,
+      text=True,
+      check=False,
+  )
+  elapsed = time.perf_counter() - start
+  loaded = result.stderr.rpartition("loaded: ")[2].strip()
+  return elapsed, loaded
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--repeat", type=int, default=10)
+  parser.add_argument(
+      "--modules", nargs="+", default=["logstory.main", "logstory.logstory"]
+  )
+  parser.add_argument(
+      "--cloud-function",
+      action="store_true",
+      help="set SECRET_MANAGER_CREDENTIALS as a Cloud Function would",
+  )
+  parser.add_argument(
+      "--budget-ms",
+      type=float,
+      default=150,
+      help=f"maximum median import time of {CLI_MODULE}",
+  )
+  args = parser.parse_args()
+
+  env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+  if args.cloud_function:
+    env["SECRET_MANAGER_CREDENTIALS"] = "projects/bench/secrets/bench"  # noqa: S105
+
+  medians = {}
+  for module in args.modules:
+    times = [_import_time_us(module, env) for _ in range(args.repeat)]
+    medians[module] = statistics.median(times) / 1e3
+    print(
+        f"{module}: median {medians[module]:.1f} ms,"
+        f" min {min(times) / 1e3:.1f} ms over {args.repeat} imports"
+    )
+
+  for command in CLI_COMMANDS:
+    runs = [_run_cli(command, env) for _ in range(args.repeat)]
+    wall_ms = statistics.median(elapsed for elapsed, _ in runs) * 1e3
+    print(
+        f"logstory {' '.join(command)}: median {wall_ms:.0f} ms wall,"
+        f" loaded {runs[0][1]}"
+    )
+
+  cli_ms = medians.get(CLI_MODULE)
+  if cli_ms is not None and cli_ms > args.budget_ms:
+    sys.exit(
+        f"{CLI_MODULE} imports in {cli_ms:.1f} ms, over the"
+        f" {args.budget_ms:.0f} ms budget"
+    )
+
+
+if __name__ == "__main__":
+  main()
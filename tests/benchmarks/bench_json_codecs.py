@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the installed JSON codecs on bundled JSON usecases.
+
+Times the three places the replay uses JSON: decoding each line of a UDM
+or entity log, encoding whole request bodies (legacy and REST layouts), and
+encoding one entry at a time for batch sizing and local file output. The
+legacy udmevents path is also timed end to end, parsing lines into dicts
+and encoding them versus splicing the lines in as RawJson. Every
+installed usecase whose logtype is replayed through the udmevents or
+entities API is included, as are JSON-lines logs such as WINDOWS_AD and
+the JSON payloads of logs like BRO_JSON ("conn - {...}").
+
+Usage:
+  python tests/benchmarks/bench_json_codecs.py [--repeat N]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from logstory import codec  # noqa: E402
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src" / "logstory"
+BATCH_SIZE = 1000
+
+
+def find_json_logs():
+  """Yield (name, JSON lines) for the installed UDM, entity and JSON logs."""
+  apis = {}
+  for kind in ("events", "entities"):
+    with open(SRC_DIR / f"logtypes_{kind}_timestamps.yaml") as fh:
+      for log_type, entry in yaml.safe_load(fh).items():
+        apis[(kind.upper(), log_type)] = entry.get("api")
+  for path in sorted((SRC_DIR / "usecases").glob("*/*/*.log")):
+    lines = path.read_text(encoding="utf-8").splitlines()
+    name = f"{path.parent.parent.name}/{path.stem}"
+    json_api = apis.get((path.parent.name, path.stem)) in ("udmevents", "entities")
+    if json_api or (lines and lines[0].startswith("{")):
+      yield name, lines
+    elif lines and " {" in lines[0]:
+      yield f"{name} payloads", [line[line.index("{") :] for line in lines]
+
+
+def best_of(repeat, func, *args):
+  """Return the best wall time of `repeat` runs."""
+  timings = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func(*args)
+    timings.append(time.perf_counter() - start)
+  return min(timings)
+
+
+def decode_lines(json_codec, lines):
+  for line in lines:
+    json_codec.loads(line)
+
+
+def encode_bodies(json_codec, events):
+  for i in range(0, len(events), BATCH_SIZE):
+    batch = events[i : i + BATCH_SIZE]
+    json_codec.dumps({"customer_id": "c", "events": batch})
+    json_codec.dumps({"inline_source": {"events": [{"udm": e} for e in batch]}})
+
+
+def encode_entries(json_codec, events):
+  for event in events:
+    json_codec.dumps(event)
+
+
+def parse_and_encode(lines):
+  for i in range(0, len(lines), BATCH_SIZE):
+    batch = [codec.loads(line) for line in lines[i : i + BATCH_SIZE]]
+    codec.dumps({"customer_id": "c", "events": batch})
+
+
+def splice_raw(lines):
+  for i in range(0, len(lines), BATCH_SIZE):
+    batch = [codec.raw_json(line) for line in lines[i : i + BATCH_SIZE]]
+    codec.dumps_with_array({"customer_id": "c"}, "events", batch)
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+
+  codecs = {name: codec.get_codec(name) for name in codec.CODECS}
+  print(f"codecs: {', '.join(codecs)}; times in ms, speedup vs json")
+  for name, lines in find_json_logs():
+    events = [json.loads(line) for line in lines]
+    print(f"{name} ({len(lines)} lines)")
+    for label, func, data in (
+        ("loads lines", decode_lines, lines),
+        ("dumps bodies", encode_bodies, events),
+        ("dumps entries", encode_entries, events),
+    ):
+      timings = {n: best_of(args.repeat, func, c, data) for n, c in codecs.items()}
+      cells = "  ".join(
+          f"{n} {t * 1e3:7.2f} ({timings['json'] / t:4.1f}x)"
+          for n, t in timings.items()
+      )
+      print(f"  {label:<14}{cells}")
+    parsed = best_of(args.repeat, parse_and_encode, lines)
+    raw = best_of(args.repeat, splice_raw, lines)
+    print(
+        f"  {'raw splice':<14}{codec.codec.name} {raw * 1e3:7.2f}"
+        f" ({parsed / raw:4.1f}x vs parse and encode)"
+    )
+
+
+if __name__ == "__main__":
+  main()
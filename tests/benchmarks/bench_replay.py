@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark replaying synthetic logs of each logtype to local files.
+
+For each logtype and line count, writes a synthetic log (see
+synthetic_logs.py) and, in a new process, replays it with
+usecase_replay_logtype to local files, then transforms it again without
+writing. Reports the transform throughput, the end-to-end events per second
+into the local file sink and how much the peak RSS grew during the replay.
+
+Results can be saved as JSON and compared with a baseline saved at another
+commit; the run fails if a throughput dropped by more than
+--max-regression.
+
+Usage:
+  python tests/benchmarks/bench_replay.py [--lines 10000 100000 1000000]
+      [--log-types AUDITD UDM | all] [--line-bytes 400] [--repeat N]
+      [--save .benchmarks/replay-$(git rev-parse --short HEAD).json]
+      [--compare .benchmarks/replay-BASELINE.json] [--max-regression 0.1]
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from synthetic_logs import TIMESTAMP_FILES, get_log_types, write_log  # noqa: E402
+
+from logstory import main as logstory_main  # noqa: E402
+
+DEFAULT_LOG_TYPES = ["AUDITD", "AWS_CLOUDTRAIL", "WINDOWS_SYSMON", "WINDOWS_AD", "UDM"]
+# higher is better; compared with --compare
+THROUGHPUT_METRICS = ["transform_lines_per_s", "replay_eps"]
+USE_CASE = "SYNTHETIC"
+
+
+def _max_rss_mb() -> float:
+  """Returns the peak resident set size of this process so far."""
+  max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # kilobytes on Linux, bytes on macOS
+  return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _write_timestamp_maps(directory: Path) -> str:
+  """Copies the timestamp YAML files without log_dir, so output goes to tmp."""
+  for path in TIMESTAMP_FILES.values():
+    with path.open() as fh:
+      timestamp_map = yaml.safe_load(fh)
+    for entry in timestamp_map.values():
+      entry.pop("log_dir", None)
+    with (directory / path.name).open("w") as fh:
+      yaml.safe_dump(timestamp_map, fh)
+  return str(directory)
+
+
+def _run_case(
+    log_path: str, log_type: str, entities: bool, ts_map_path: str, out_dir: str
+) -> dict[str, float]:
+  """Replays and transforms one synthetic log; runs in a new process."""
+  logging.getLogger("logstory").setLevel(logging.WARNING)
+  now = datetime.datetime.now(datetime.UTC)
+  with (
+      patch.dict(os.environ, {"LOGSTORY_LOCAL_LOG_DIR": out_dir}),
+      patch.object(logstory_main, "_get_local_log_path", return_value=log_path),
+  ):
+    rss_before = _max_rss_mb()
+    start = time.perf_counter()
+    logstory_main.usecase_replay_logtype(
+        USE_CASE,
+        log_type,
+        now,
+        ts_map_path=ts_map_path,
+        entities=entities,
+        local_file_output=True,
+        chunk_workers=1,
+    )
+    replay_s = time.perf_counter() - start
+    rss_after = _max_rss_mb()
+
+    # the same two passes without the local file sink
+    plan = logstory_main.load_timestamp_plan(
+        logstory_main._get_timestamp_map_path(ts_map_path, entities)
+    ).get(log_type)
+    start = time.perf_counter()
+    old_base_time = logstory_main._find_base_time(
+        logstory_main._iter_log_lines(USE_CASE, log_type, entities), plan.base_rule
+    )
+    shifter = logstory_main.TimestampShifter(
+        old_base_time, logstory_main._get_timestamp_delta_dict("1d")
+    )
+    entries = logstory_main._iter_replay_entries(
+        logstory_main._iter_log_lines(USE_CASE, log_type, entities),
+        plan.api,
+        plan.rules,
+        shifter,
+        logstory_main.RAW_JSON,
+    )
+    collections.deque(entries, maxlen=0)
+    transform_s = time.perf_counter() - start
+  return {
+      "replay_s": replay_s,
+      "transform_s": transform_s,
+      "peak_rss_mb": rss_after,
+      "peak_rss_growth_mb": rss_after - rss_before,
+  }
+
+
+def _git_commit() -> str | None:
+  """Returns the checked out commit, if this is a git checkout."""
+  result = subprocess.run(  # nosec B603 B607
+      ["git", "rev-parse", "HEAD"],  # noqa: S607
+      cwd=Path(__file__).parent,
+      capture_output=True,
+      text=True,
+      check=False,
+  )
+  return result.stdout.strip() or None
+
+
+def _compare(
+    baseline: dict, results: dict[str, dict], max_regression: float
+) -> list[str]:
+  """Prints each throughput relative to the baseline; returns regressions."""
+  print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+  regressions = []
+  for case, result in results.items():
+    base = baseline["results"].get(case)
+    if not base:
+      continue
+    ratios = {metric: result[metric] / base[metric] for metric in THROUGHPUT_METRICS}
+    print(
+        f"  {case}: "
+        + ", ".join(f"{metric} x{ratio:.2f}" for metric, ratio in ratios.items())
+    )
+    regressions.extend(
+        f"{case} {metric} x{ratio:.2f}"
+        for metric, ratio in ratios.items()
+        if ratio < 1 - max_regression
+    )
+  return regressions
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument(
+      "--lines", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+  )
+  parser.add_argument(
+      "--log-types",
+      nargs="+",
+      default=DEFAULT_LOG_TYPES,
+      help="logtypes to replay, or all",
+  )
+  parser.add_argument("--line-bytes", type=int, default=400)
+  parser.add_argument(
+      "--repeat", type=int, default=1, help="runs per case; the fastest is kept"
+  )
+  parser.add_argument("--save", type=Path, help="write the results to this JSON file")
+  parser.add_argument("--compare", type=Path, help="JSON results of a baseline run")
+  parser.add_argument(
+      "--max-regression",
+      type=float,
+      default=0.1,
+      help="largest fraction a throughput may drop below the baseline",
+  )
+  args = parser.parse_args()
+
+  log_types = get_log_types()
+  selected = list(log_types) if args.log_types == ["all"] else args.log_types
+  results = {}
+  with (
+      tempfile.TemporaryDirectory() as tmp,
+      concurrent.futures.ProcessPoolExecutor(
+          max_workers=1,
+          mp_context=multiprocessing.get_context("spawn"),
+          max_tasks_per_child=1,
+      ) as executor,
+  ):
+    ts_map_path = _write_timestamp_maps(Path(tmp))
+    for log_type in selected:
+      entities = log_types[log_type][0]
+      for lines in args.lines:
+        log_path = Path(tmp) / f"{log_type}.log"
+        out_dir = Path(tmp) / f"out-{log_type}-{lines}"
+        size = write_log(log_path, log_type, lines, args.line_bytes)
+        runs = [
+            executor.submit(
+                _run_case, str(log_path), log_type, entities, ts_map_path, str(out_dir)
+            ).result()
+            for _ in range(args.repeat)
+        ]
+        # the fastest of the runs, with the largest peak RSS
+        result = {key: min(run[key] for run in runs) for key in runs[0]}
+        result["peak_rss_mb"] = max(run["peak_rss_mb"] for run in runs)
+        result["peak_rss_growth_mb"] = max(run["peak_rss_growth_mb"] for run in runs)
+        with (out_dir / f"{log_type}.log").open("rb") as fh:
+          written = sum(1 for _ in fh)
+        if written != lines:
+          sys.exit(f"{log_type}: replayed {written} of {lines} lines")
+        log_path.unlink()
+        (out_dir / f"{log_type}.log").unlink()
+
+        result.update(
+            lines=lines,
+            bytes=size,
+            transform_lines_per_s=lines / result["transform_s"],
+            transform_mb_per_s=size / 1024 / 1024 / result["transform_s"],
+            replay_eps=lines / result["replay_s"],
+        )
+        results[f"{log_type}/{lines}"] = result
+        print(
+            f"{log_type:>20} {lines:>9,} lines:"
+            f" transform {result['transform_lines_per_s']:>9,.0f} lines/s"
+            f" ({result['transform_mb_per_s']:.1f} MB/s),"
+            f" replay {result['replay_eps']:>9,.0f} EPS,"
+            f" peak RSS +{result['peak_rss_growth_mb']:.1f} MB"
+        )
+
+  report = {
+      "commit": _git_commit(),
+      "date": datetime.datetime.now(datetime.UTC).isoformat(),
+      "python": platform.python_version(),
+      "cpus": os.cpu_count(),
+      "line_bytes": args.line_bytes,
+      "results": results,
+  }
+  if args.save:
+    args.save.parent.mkdir(parents=True, exist_ok=True)
+    args.save.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Saved results to {args.save}")
+  if args.compare:
+    baseline = json.loads(args.compare.read_text())
+    regressions = _compare(baseline, results, args.max_regression)
+    if regressions:
+      sys.exit("Throughput regressions: " + "; ".join(regressions))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark encoding unstructured logs into REST logs:import bodies.
+
+Runs RestIngestionBackend.post_unstructured_logs over a bundled log, in
+batches, against a mocked HTTP client, so only building the request bodies
+is timed.
+
+Usage:
+  python tests/benchmarks/bench_rest_encoding.py [--log NETWORK_ANALYSIS/BRO_JSON]
+      [--copies N] [--repeat N]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from logstory import codec, ingestion  # noqa: E402
+from logstory.ingestion import RestIngestionBackend  # noqa: E402
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src" / "logstory"
+BATCH_SIZE = 1000
+LABELS = [
+    {"key": "ingestion_source", "value": "logstory"},
+    {"key": "usecase", "value": "NETWORK_ANALYSIS"},
+]
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--log", default="NETWORK_ANALYSIS/BRO_JSON")
+  parser.add_argument("--copies", type=int, default=4)
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+  logging.getLogger("logstory").setLevel(logging.WARNING)
+
+  use_case, log_type = args.log.split("/")
+  path = SRC_DIR / "usecases" / use_case / "EVENTS" / f"{log_type}.log"
+  entries = [
+      {"logText": line} for line in path.read_text(encoding="utf-8").splitlines()
+  ] * args.copies
+
+  auth_handler = MagicMock()
+  auth_handler.get_http_client.return_value.post.return_value = MagicMock(
+      status_code=200
+  )
+  backend = RestIngestionBackend(auth_handler, "customer", "project")
+  backend._forwarder_id = "forwarder"  # noqa: SLF001
+
+  best = float("inf")
+  for _ in range(args.repeat):
+    start = time.perf_counter()
+    for i in range(0, len(entries), BATCH_SIZE):
+      backend.post_unstructured_logs(log_type, entries[i : i + BATCH_SIZE], LABELS)
+    best = min(best, time.perf_counter() - start)
+
+  print(
+      f"{args.log}: {len(entries)} lines in {best * 1e3:.1f} ms,"
+      f" {len(entries) / best:,.0f} lines/s"
+      f" (codec {codec.codec.name}, base64 {ingestion.b64encode.__module__})"
+  )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark per-line timestamp scanning on the bundled usecases.
+
+Compares the previous per-rule loop (YAML dicts, one matcher object per
+match), the single-loop scanner used by the replay, and a combined
+lookahead alternation run with finditer.
+
+Usage:
+  python tests/benchmarks/bench_timestamp_scan.py [--repeat N]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from logstory.main import (  # noqa: E402
+    LogTypePlan,
+    TimestampShifter,
+    _calculate_timestamp_replacement,
+    _parse_event_time,
+    _scan_timestamp_changes,
+)
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src" / "logstory"
+CASES = [
+    ("events", "BRO_JSON", "NETWORK_ANALYSIS/EVENTS/BRO_JSON.log"),
+    (
+        "events",
+        "WINDOWS_DEFENDER_AV",
+        "RULES_SEARCH_WORKSHOP/EVENTS/WINDOWS_DEFENDER_AV.log",
+    ),
+    ("entities", "WINDOWS_AD", "RULES_SEARCH_WORKSHOP/ENTITIES/WINDOWS_AD.log"),
+]
+
+
+def per_rule(lines, entry, old_base_time, ts_delta_dict):
+  """The per-rule loop the replay used before the scanner."""
+  for log_text in lines:
+    change_map = {}
+    for timestamp in entry["timestamps"]:
+      result = _calculate_timestamp_replacement(
+          log_text, timestamp, old_base_time, ts_delta_dict
+      )
+      if result:
+        match, replacement = result
+        change_map.setdefault((match.start(), match.end(), match.group(0)), replacement)
+
+
+def scanner(lines, plan, old_base_time, ts_delta_dict):
+  """The single-loop scanner over precompiled rules, with the shift cache."""
+  shifter = TimestampShifter(old_base_time, ts_delta_dict)
+  for log_text in lines:
+    _scan_timestamp_changes(log_text, plan.rules, shifter)
+
+
+def alternation(lines, plan):
+  """Locate slots with one combined lookahead alternation (spans only)."""
+  combined = re.compile(
+      "|".join(f"(?=({rule.pattern.pattern}))" for rule in plan.rules)
+  )
+  for log_text in lines:
+    for hit in combined.finditer(log_text):
+      hit.span()
+
+
+def best_of(repeat, func, *args):
+  """Return the best wall time of `repeat` runs."""
+  timings = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func(*args)
+    timings.append(time.perf_counter() - start)
+  return min(timings)
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--repeat", type=int, default=3)
+  args = parser.parse_args()
+
+  ts_delta_dict = {"d": 1}
+  print(f"{'logtype':<22}{'lines':>7}{'rules':>6}  per-line us: old / scan / alt")
+  for kind, log_type, rel_path in CASES:
+    with open(SRC_DIR / f"logtypes_{kind}_timestamps.yaml") as fh:
+      entry = yaml.safe_load(fh)[log_type]
+    plan = LogTypePlan.from_config(log_type, entry)
+    lines = (SRC_DIR / "usecases" / rel_path).read_text().splitlines()
+    base_match = plan.base_rule.pattern.search(lines[0])
+    old_base_time = _parse_event_time(
+        base_match.group(plan.base_rule.group), plan.base_rule
+    )
+    old_base_time = old_base_time.replace(tzinfo=None)
+
+    old = best_of(args.repeat, per_rule, lines, entry, old_base_time, ts_delta_dict)
+    new = best_of(args.repeat, scanner, lines, plan, old_base_time, ts_delta_dict)
+    alt = best_of(args.repeat, alternation, lines, plan)
+    per_line = [t / len(lines) * 1e6 for t in (old, new, alt)]
+    print(
+        f"{log_type:<22}{len(lines):>7}{len(plan.rules):>6}  "
+        f"{per_line[0]:.1f} / {per_line[1]:.1f} / {per_line[2]:.1f}"
+        f"  ({old / new:.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,248 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Synthetic log files for any logtype of the timestamp YAML files.
+
+Each line holds one sample of every timestamp rule of the logtype: text the
+rule's pattern matches, with the timestamp group set to a timestamp in the
+rule's dateformat. Lines of the JSON APIs are JSON objects with one field
+per rule instead. Lines are one second apart, so every line has different
+timestamps, and are padded to a typical line length.
+"""
+
+import datetime
+import functools
+import json
+import re
+import string
+from collections.abc import Iterator
+from pathlib import Path
+from re import _parser as sre_parse
+
+import yaml
+
+from logstory.main import datetime_to_filetime
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src" / "logstory"
+TIMESTAMP_FILES = {
+    False: SRC_DIR / "logtypes_events_timestamps.yaml",
+    True: SRC_DIR / "logtypes_entities_timestamps.yaml",
+}
+START_TIME = datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC)
+# APIs whose lines are sent as JSON objects
+JSON_APIS = ("udmevents", "entities")
+# characters tried, in order, for a character class
+_CANDIDATES = string.ascii_letters + string.digits + ' _-:./,"'
+_CATEGORIES = {
+    sre_parse.CATEGORY_DIGIT: str.isdigit,
+    sre_parse.CATEGORY_NOT_DIGIT: lambda ch: not ch.isdigit(),
+    sre_parse.CATEGORY_SPACE: str.isspace,
+    sre_parse.CATEGORY_NOT_SPACE: lambda ch: not ch.isspace(),
+    sre_parse.CATEGORY_WORD: lambda ch: ch.isalnum() or ch == "_",
+    sre_parse.CATEGORY_NOT_WORD: lambda ch: not (ch.isalnum() or ch == "_"),
+}
+
+
+@functools.cache
+def get_log_types() -> dict[str, tuple[bool, dict]]:
+  """Returns (entities, YAML entry) of every logtype, keyed by name."""
+  log_types = {}
+  for entities, path in TIMESTAMP_FILES.items():
+    with path.open() as fh:
+      for log_type, entry in yaml.safe_load(fh).items():
+        log_types[log_type] = (entities, entry)
+  return log_types
+
+
+def _in_class(items: list, ch: str) -> bool:
+  """Checks whether ch matches a parsed character class."""
+  negate = False
+  for op, av in items:
+    if op is sre_parse.NEGATE:
+      negate = True
+    elif (
+        (op is sre_parse.LITERAL and ch == chr(av))
+        or (op is sre_parse.RANGE and av[0] <= ord(ch) <= av[1])
+        or (op is sre_parse.CATEGORY and _CATEGORIES[av](ch))
+    ):
+      return not negate
+  return negate
+
+
+def _sample(parsed, group: int, value: str, groups: dict[int, str]) -> str:
+  """Returns the shortest text matching a parsed pattern, with group = value."""
+  out = []
+  for op, av in parsed:
+    if op is sre_parse.LITERAL:
+      out.append(chr(av))
+    elif op is sre_parse.NOT_LITERAL:
+      out.append(next(ch for ch in _CANDIDATES if ch != chr(av)))
+    elif op is sre_parse.ANY:
+      out.append("a")
+    elif op is sre_parse.IN:
+      out.append(next(ch for ch in _CANDIDATES if _in_class(av, ch)))
+    elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+      low, _, sub = av
+      out.extend(_sample(sub, group, value, groups) for _ in range(low))
+    elif op is sre_parse.SUBPATTERN:
+      gid, _, _, sub = av
+      text = value if gid == group else _sample(sub, group, value, groups)
+      groups[gid] = text
+      out.append(text)
+    elif op is sre_parse.BRANCH:
+      out.append(_sample(av[1][0], group, value, groups))
+    elif op is sre_parse.GROUPREF:
+      out.append(groups[av])
+    elif op not in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+      raise ValueError(f"Unsupported regular expression element {op}")
+  return "".join(out)
+
+
+def format_timestamp(dt: datetime.datetime, dateformat: str) -> str:
+  """Formats dt the way a log with the YAML dateformat would hold it."""
+  if dateformat == "epoch":
+    return str(int(dt.timestamp()))
+  if dateformat in ("windowsfiletime", "filetime"):
+    return str(datetime_to_filetime(dt))
+  return dt.strftime(dateformat)
+
+
+def _get_timestamps(entry: dict) -> list[dict]:
+  """Returns a logtype's timestamp rules, its base_time rule first."""
+  return sorted(entry["timestamps"], key=lambda ts: not ts.get("base_time"))
+
+
+def get_line_template(entry: dict) -> list[str]:
+  """Returns the text between each rule's timestamp in a synthetic line.
+
+  The base_time rule comes first, so the first timestamp the replay finds
+  is the base time. Each sample is checked to capture its timestamp.
+
+  Args:
+    entry: The logtype's YAML mapping.
+
+  Returns:
+    One more literal than there are rules; a line is the literals joined
+    with one formatted timestamp per rule.
+
+  Raises:
+    ValueError: If a rule's pattern cannot be sampled.
+  """
+  literals = [""]
+  for timestamp in _get_timestamps(entry):
+    value = format_timestamp(START_TIME, timestamp["dateformat"])
+    sample = _sample(
+        sre_parse.parse(timestamp["pattern"]), timestamp["group"], value, {}
+    )
+    match = re.search(timestamp["pattern"], sample)
+    if not match or match.group(timestamp["group"]) != value:
+      raise ValueError(
+          f"Rule {timestamp.get('name')} does not capture {value!r} from {sample!r}"
+      )
+    literals[-1] += sample[: match.start(timestamp["group"])]
+    literals.append(sample[match.end(timestamp["group"]) :] + " ")
+  return literals
+
+
+def get_json_fields(entry: dict) -> list[tuple[str, bool, str]]:
+  """Returns the JSON field that holds each rule's timestamp.
+
+  A rule's field is the first key its pattern names, with a string or an
+  integer value, whose JSON text the rule captures the timestamp from.
+
+  Args:
+    entry: The logtype's YAML mapping.
+
+  Returns:
+    (key, whether the value is a string, dateformat) of each rule, the
+    base_time rule first.
+
+  Raises:
+    ValueError: If no field of a rule's pattern captures its timestamp.
+  """
+  fields = []
+  for timestamp in _get_timestamps(entry):
+    value = format_timestamp(START_TIME, timestamp["dateformat"])
+    candidates = [
+        (key, quoted)
+        for key in re.findall(r'"(\w+)":', timestamp["pattern"])
+        for quoted in (True, False)
+        if quoted or value.isdigit()
+    ]
+    for key, quoted in candidates:
+      text = json.dumps({key: value if quoted else int(value)})
+      match = re.search(timestamp["pattern"], text)
+      if match and match.group(timestamp["group"]) == value:
+        fields.append((key, quoted, timestamp["dateformat"]))
+        break
+    else:
+      raise ValueError(f"Rule {timestamp.get('name')} has no JSON field for {value!r}")
+  return fields
+
+
+def _iter_json_lines(entry: dict, lines: int, line_bytes: int) -> Iterator[str]:
+  """Yields synthetic JSON objects of a logtype of the JSON APIs."""
+  fields = get_json_fields(entry)
+  second = datetime.timedelta(seconds=1)
+
+  def to_object(dt: datetime.datetime, padding: str) -> dict:
+    obj = {}
+    for key, quoted, dateformat in fields:
+      value = format_timestamp(dt, dateformat)
+      obj[key] = value if quoted else int(value)
+    obj["padding"] = padding
+    return obj
+
+  padding = "x" * max(0, line_bytes - len(json.dumps(to_object(START_TIME, ""))))
+  for i in range(lines):
+    yield json.dumps(to_object(START_TIME + i * second, padding))
+
+
+def iter_lines(log_type: str, lines: int, line_bytes: int = 400) -> Iterator[str]:
+  """Yields synthetic lines of a logtype.
+
+  Args:
+    log_type: A logtype of either timestamp YAML file.
+    lines: Number of lines.
+    line_bytes: Length lines are padded to.
+
+  Yields:
+    Lines without a trailing newline.
+  """
+  _, entry = get_log_types()[log_type]
+  if entry["api"] in JSON_APIS:
+    yield from _iter_json_lines(entry, lines, line_bytes)
+    return
+  literals = get_line_template(entry)
+  dateformats = [ts["dateformat"] for ts in _get_timestamps(entry)]
+  padding = "x" * max(0, line_bytes - sum(map(len, literals)) - 20 * len(dateformats))
+  second = datetime.timedelta(seconds=1)
+  for i in range(lines):
+    dt = START_TIME + i * second
+    parts = [literals[0]]
+    for dateformat, literal in zip(dateformats, literals[1:], strict=True):
+      parts.append(format_timestamp(dt, dateformat))
+      parts.append(literal)
+    parts.append(padding)
+    line = "".join(parts)
+    yield line
+
+
+def write_log(path: Path, log_type: str, lines: int, line_bytes: int = 400) -> int:
+  """Writes a synthetic log file; returns its size in bytes."""
+  with path.open("w", encoding="utf-8") as fh:
+    for line in iter_lines(log_type, lines, line_bytes):
+      fh.write(line)
+      fh.write("\n")
+  return path.stat().st_size
@@ -17,23 +17,44 @@
 import json
 import os
 import tempfile
+import threading
 import warnings
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from google.auth.credentials import Scoped
 from google.auth.exceptions import DefaultCredentialsError
 
 from logstory.auth import (
+    _GCP_RUNTIME_VARS,
     LegacyAuthHandler,
     RestAuthHandler,
+    _get_adc_file,
+    _may_run_on_google_cloud,
     create_auth_handler,
     detect_auth_type,
+    find_application_default_credentials,
     has_application_default_credentials,
     validate_credentials_match_api_type,
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_adc_cache():
+  """ADC are detected once per process, so each test starts undetected."""
+  find_application_default_credentials.cache_clear()
+  yield
+  find_application_default_credentials.cache_clear()
+
+
+@pytest.fixture
+def adc_file():
+  """Make ADC detection find a key file, as after gcloud login."""
+  with patch("logstory.auth._get_adc_file", return_value="/tmp/adc.json"):
+    yield
+
+
 class TestCredentialValidation:
   """Test credential validation for API type matching."""
 
@@ -283,17 +304,44 @@ class TestRestAuthHandler:
         "/path/to/creds.json", scopes=RestAuthHandler.SCOPES
     )
 
+  @pytest.mark.usefixtures("adc_file")
   @patch("google.auth.default")
   def test_get_credentials_from_adc(self, mock_default):
     """Test REST credentials from ADC fallback."""
-    mock_creds = MagicMock()
+    mock_creds = MagicMock(spec=Scoped)
     mock_default.return_value = (mock_creds, "test-project")
 
     handler = RestAuthHandler()
     creds = handler.get_credentials()
-    assert creds == mock_creds
-    mock_default.assert_called_once_with(scopes=RestAuthHandler.SCOPES)
+    assert creds == mock_creds.with_scopes.return_value
+    mock_default.assert_called_once_with()
+    mock_creds.with_scopes.assert_called_once_with(
+        RestAuthHandler.SCOPES, default_scopes=None
+    )
+
+  @pytest.mark.usefixtures("adc_file")
+  @patch("google.auth.default")
+  def test_get_credentials_reuses_detected_adc(self, mock_default):
+    """Test REST credentials reuse the ADC found by has_application_default_credentials."""
+    mock_default.return_value = (MagicMock(), "test-project")
+
+    assert has_application_default_credentials() is True
+    RestAuthHandler().get_credentials()
+    RestAuthHandler().get_credentials()
+    mock_default.assert_called_once_with()
+
+  @patch("google.auth.default")
+  def test_get_credentials_without_adc_raises(self, mock_default):
+    """Test REST credentials raise when no ADC source exists."""
+    with (
+        patch("logstory.auth._get_adc_file", return_value=None),
+        patch("logstory.auth._may_run_on_google_cloud", return_value=False),
+        pytest.raises(DefaultCredentialsError, match="LOGSTORY_ADC_TIMEOUT"),
+    ):
+      RestAuthHandler().get_credentials()
+    mock_default.assert_not_called()
 
+  @pytest.mark.usefixtures("adc_file")
   @patch("google.auth.default")
   @patch("google.auth.impersonated_credentials.Credentials")
   def test_get_credentials_with_impersonation(self, mock_impersonate, mock_default):
@@ -336,24 +384,106 @@ class TestRestAuthHandler:
 class TestHelperFunctions:
   """Test helper and factory functions in auth module."""
 
+  @pytest.mark.usefixtures("adc_file")
   @patch("google.auth.default")
   def test_has_adc_true(self, mock_default):
     """Test has_application_default_credentials when credentials exist."""
     mock_default.return_value = (MagicMock(), "proj")
     assert has_application_default_credentials() is True
 
+  @pytest.mark.usefixtures("adc_file")
   @patch("google.auth.default")
   def test_has_adc_default_credentials_error(self, mock_default):
     """Test has_application_default_credentials when DefaultCredentialsError is raised."""
     mock_default.side_effect = DefaultCredentialsError("No ADC")
     assert has_application_default_credentials() is False
 
+  @pytest.mark.usefixtures("adc_file")
   @patch("google.auth.default")
   def test_has_adc_generic_exception(self, mock_default):
     """Test has_application_default_credentials when generic exception occurs."""
     mock_default.side_effect = RuntimeError("Generic error")
     assert has_application_default_credentials() is False
 
+  @pytest.mark.usefixtures("adc_file")
+  @patch("google.auth.default")
+  def test_has_adc_is_memoized(self, mock_default):
+    """Test ADC are looked up once however often they are checked."""
+    mock_default.return_value = (MagicMock(), "proj")
+    assert has_application_default_credentials() is True
+    assert has_application_default_credentials() is True
+    mock_default.assert_called_once_with()
+
+  @patch("google.auth.default")
+  def test_has_adc_off_google_cloud_skips_metadata_server(self, mock_default):
+    """Test ADC detection without a key file off Google Cloud does no I/O."""
+    with (
+        patch("logstory.auth._get_adc_file", return_value=None),
+        patch("logstory.auth._may_run_on_google_cloud", return_value=False),
+    ):
+      assert has_application_default_credentials() is False
+    mock_default.assert_not_called()
+
+  @patch("google.auth.default")
+  def test_has_adc_metadata_server_timeout(self, mock_default):
+    """Test ADC detection gives up on a metadata server after its budget."""
+    released = threading.Event()
+    mock_default.side_effect = lambda: released.wait(5) and (MagicMock(), "proj")
+    with (
+        patch("logstory.auth._get_adc_file", return_value=None),
+        patch("logstory.auth._may_run_on_google_cloud", return_value=True),
+    ):
+      assert find_application_default_credentials(timeout=0.05) == (None, None)
+    released.set()
+
+  @patch("google.auth.default")
+  def test_has_adc_metadata_server_reply(self, mock_default):
+    """Test ADC from the metadata server within the budget are used."""
+    mock_creds = MagicMock()
+    mock_default.return_value = (mock_creds, "proj")
+    with (
+        patch("logstory.auth._get_adc_file", return_value=None),
+        patch("logstory.auth._may_run_on_google_cloud", return_value=True),
+        patch.dict(os.environ, {"LOGSTORY_ADC_TIMEOUT": "5"}),
+    ):
+      assert find_application_default_credentials() == (mock_creds, "proj")
+
+  def test_get_adc_file(self, tmp_path):
+    """Test the ADC key file is found from the environment or gcloud config."""
+    key_file = tmp_path / "key.json"
+    key_file.write_text("{}")
+    gcloud_file = tmp_path / "application_default_credentials.json"
+    with patch.dict(os.environ, {"GOOGLE_APPLICATION_CREDENTIALS": str(key_file)}):
+      assert _get_adc_file() == str(key_file)
+    with patch.dict(
+        os.environ,
+        {"GOOGLE_APPLICATION_CREDENTIALS": "", "CLOUDSDK_CONFIG": str(tmp_path)},
+    ):
+      assert _get_adc_file() is None
+      gcloud_file.write_text("{}")
+      assert _get_adc_file() == str(gcloud_file)
+    with patch.dict(
+        os.environ, {"GOOGLE_APPLICATION_CREDENTIALS": str(tmp_path / "missing")}
+    ):
+      assert _get_adc_file() is None
+
+  def test_may_run_on_google_cloud(self, tmp_path):
+    """Test Google Cloud is recognised from runtime variables or the BIOS."""
+    product_name = tmp_path / "product_name"
+    product_name.write_text("Google Compute Engine\n")
+    cleared = dict.fromkeys(("NO_GCE_CHECK", *_GCP_RUNTIME_VARS), "")
+    with (
+        patch.dict(os.environ, cleared),
+        patch("logstory.auth._GCE_PRODUCT_NAME_FILE", str(tmp_path / "missing")),
+    ):
+      assert _may_run_on_google_cloud() is False
+      with patch.dict(os.environ, {"K_SERVICE": "logstory"}):
+        assert _may_run_on_google_cloud() is True
+        with patch.dict(os.environ, {"NO_GCE_CHECK": "True"}):
+          assert _may_run_on_google_cloud() is False
+      with patch("logstory.auth._GCE_PRODUCT_NAME_FILE", str(product_name)):
+        assert _may_run_on_google_cloud() is True
+
   def test_detect_auth_type_valid(self):
     """Test detect_auth_type with valid environment variables."""
     with patch.dict(os.environ, {"LOGSTORY_API_TYPE": "REST"}):
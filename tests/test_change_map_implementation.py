@@ -28,10 +28,18 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from logstory.main import _calculate_timestamp_replacement
+from logstory.main import (
+    TimestampRule,
+    TimestampShifter,
+    _apply_timestamp_changes,
+    _calculate_timestamp_replacement,
+    _scan_timestamp_changes,
+)
 
 
 class TestChangeMapImplementation(unittest.TestCase):
@@ -250,6 +258,105 @@ class TestChangeMapImplementation(unittest.TestCase):
     assert expected_date in result_line
     assert ".123Z" in result_line, "Milliseconds and timezone preserved"
 
+  def test_scan_matches_per_rule_change_map(self):
+    """Test that the single-loop scanner builds the same change map."""
+    log_line = (
+        '{"time":"2024-01-25T19:53:05.123Z","epoch":1706212385,'
+        '"date":"2024-01-25","again":"2024-01-25T19:53:05"}'
+    )
+    old_base_time = datetime.datetime(2024, 1, 25, 19, 53, 5)
+    ts_delta_dict = {"d": 1, "h": 2}
+    rules = tuple(
+        TimestampRule.from_config(config)
+        for config in [
+            {
+                "pattern": r'("time":")(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})',
+                "dateformat": "%Y-%m-%dT%H:%M:%S",
+                "group": 2,
+            },
+            {
+                "pattern": r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})",
+                "dateformat": "%Y-%m-%dT%H:%M:%S",
+                "group": 1,
+            },
+            {"pattern": r'("epoch":)(\d{10})', "dateformat": "epoch", "group": 2},
+            {"pattern": r"(\d{4}-\d{2}-\d{2})", "dateformat": "%Y-%m-%d", "group": 1},
+        ]
+    )
+
+    expected = {}
+    for rule in rules:
+      result = _calculate_timestamp_replacement(
+          log_line, rule, old_base_time, ts_delta_dict
+      )
+      if result:
+        match, replacement = result
+        expected.setdefault((match.start(), match.end(), match.group(0)), replacement)
+
+    shifter = TimestampShifter(old_base_time, ts_delta_dict)
+    change_map = _scan_timestamp_changes(log_line, rules, shifter)
+
+    assert change_map == expected
+    assert len(change_map) == 3, "Overlapping identical changes collapse"
+    result_line = _apply_timestamp_changes(log_line, change_map)
+    assert "1706212385" not in result_line
+    assert result_line.endswith('"again":"2024-01-25T19:53:05"}')
+
+  @patch("logstory.main.LOGGER")
+  def test_scan_keeps_first_rule_on_conflict(self, mock_logger):
+    """Test that conflicting replacements keep the first rule and warn."""
+    log_line = "ts=2024-01-02"
+    rules = (
+        TimestampRule.from_config(
+            {"pattern": r"(\d{4}-\d{2}-\d{2})", "dateformat": "%Y-%m-%d", "group": 1}
+        ),
+        TimestampRule.from_config(
+            {"pattern": r"(\d{4}-\d{2}-\d{2})", "dateformat": "%Y-%d-%m", "group": 1}
+        ),
+    )
+    old_base_time = datetime.datetime(2024, 1, 2)
+
+    shifter = TimestampShifter(
+        old_base_time, {}, now=datetime.datetime(2025, 3, 7, tzinfo=datetime.UTC)
+    )
+
+    change_map = _scan_timestamp_changes(log_line, rules, shifter)
+
+    assert change_map == {(3, 13, "2024-01-02"): "2025-03-07"}
+    mock_logger.warning.assert_called_once()
+    assert "conflict" in mock_logger.warning.call_args[0][0].lower()
+
+  def test_shifter_reuses_cached_replacements(self):
+    """Test that repeated timestamps are shifted once against one anchor."""
+    rule = TimestampRule.from_config(
+        {"pattern": r"(\d{4}-\d{2}-\d{2})", "dateformat": "%Y-%m-%d", "group": 1}
+    )
+    shifter = TimestampShifter(
+        datetime.datetime(2024, 1, 2),
+        {"d": 1},
+        now=datetime.datetime(2025, 3, 7, tzinfo=datetime.UTC),
+    )
+
+    with patch("logstory.main._get_current_time") as mock_now:
+      results = [shifter.shift(ts, rule) for ts in ["2024-01-02", "2024-01-01"] * 3]
+    mock_now.assert_not_called()
+
+    assert results == ["2025-03-06", "2025-03-05"] * 3
+    info = shifter.cache_info()
+    assert (info.hits, info.misses) == (4, 2)
+
+  def test_shifter_does_not_cache_parse_errors(self):
+    """Test that unparseable timestamps raise every time."""
+    rule = TimestampRule.from_config(
+        {"pattern": r"(\S+)", "dateformat": "%Y-%m-%d", "group": 1}
+    )
+    shifter = TimestampShifter(datetime.datetime(2024, 1, 2), {})
+
+    for _ in range(2):
+      with pytest.raises(ValueError, match="does not match format"):
+        shifter.shift("not-a-date", rule)
+    assert shifter.cache_info().currsize == 0
+
 
 if __name__ == "__main__":
   unittest.main(verbosity=2)
@@ -16,36 +16,57 @@
 
 import json
 import os
+import subprocess
+import sys
 import tempfile
+import threading
+import time
 import uuid
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 import typer
 from typer.testing import CliRunner
 
+from logstory import logstory as logstory_cli
+from logstory import main as logstory_main
+from logstory.auth import find_application_default_credentials
+from logstory.env import env_flag
 from logstory.logstory import (
     _download_all_usecases,
+    _download_blobs,
     _download_usecase,
     _FileBlob,
     _get_all_source_directories,
     _get_blobs,
+    _get_catalog,
     _get_file_blobs,
     _get_gcs_blobs,
     _get_logtypes,
     _get_source_directories,
     _load_and_validate_params,
+    _replay_usecases,
     _set_environment_vars,
     app,
     entry_point,
+    get_adaptive_default,
     get_auto_get_default,
+    get_bytes_per_sec_default,
+    get_chunk_workers_default,
     get_credentials_default,
     get_customer_id_default,
+    get_eps_default,
+    get_max_in_flight_default,
+    get_ordered_default,
+    get_realtime_default,
     get_region_default,
+    get_save_tuning_default,
+    get_speedup_default,
     get_timestamp_delta_default,
     get_usecases,
     get_usecases_buckets,
+    get_workers_default,
     list_bucket_directories,
     load_env_file,
     parse_usecase_source,
@@ -53,10 +74,29 @@ from logstory.logstory import (
     validate_uuid4,
     version_callback,
 )
+from logstory.main import ReplayResult
 
 runner = CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def _isolated_run(tmp_path):
+  """Run each test as a fresh CLI process would.
+
+  Commands export their options to os.environ and the replay context,
+  listings, GCS client and ADC are found once per process, so all are reset.
+  """
+  with patch.dict(os.environ, {"LOGSTORY_CACHE_DIR": str(tmp_path / "cache")}):
+    logstory_cli._catalog.clear()
+    logstory_cli._listed_sources.clear()
+    logstory_cli._storage_client = None
+    logstory_main.get_replay_context.cache_clear()
+    find_application_default_credentials.cache_clear()
+    yield
+  logstory_cli._storage_client = None
+  logstory_main.get_replay_context.cache_clear()
+
+
 class TestCliValidators:
   """Test parameter validation functions in CLI module."""
 
@@ -154,6 +194,71 @@ class TestCliDefaultsAndEnv:
     with patch.dict(os.environ, {"LOGSTORY_AUTO_GET": "0"}):
       assert get_auto_get_default() is False
 
+  def test_env_flag(self):
+    """Test boolean environment settings and their default when unset."""
+    with patch.dict(os.environ, {}, clear=True):
+      assert env_flag("LOGSTORY_FLAG") is False
+      assert env_flag("LOGSTORY_FLAG", default=True) is True
+    for value, expected in (("YES", True), ("on", True), ("0", False), ("", False)):
+      with patch.dict(os.environ, {"LOGSTORY_FLAG": value}):
+        assert env_flag("LOGSTORY_FLAG", default=True) is expected
+
+  def test_get_max_in_flight_and_ordered_defaults(self):
+    """Test concurrent posting default getters."""
+    with patch.dict(os.environ, {}, clear=True):
+      assert get_max_in_flight_default() == 1
+      assert get_ordered_default() is False
+    with patch.dict(
+        os.environ, {"LOGSTORY_MAX_IN_FLIGHT": "8", "LOGSTORY_ORDERED": "yes"}
+    ):
+      assert get_max_in_flight_default() == 8
+      assert get_ordered_default() is True
+
+  def test_get_rate_defaults(self):
+    """Test target rate default getters."""
+    with patch.dict(os.environ, {}, clear=True):
+      assert get_eps_default() == 0
+      assert get_bytes_per_sec_default() == 0
+    with patch.dict(
+        os.environ, {"LOGSTORY_EPS": "250", "LOGSTORY_BYTES_PER_SEC": "1e6"}
+    ):
+      assert get_eps_default() == 250
+      assert get_bytes_per_sec_default() == 1_000_000
+
+  def test_get_realtime_defaults(self):
+    """Test real-time replay default getters."""
+    with patch.dict(os.environ, {}, clear=True):
+      assert get_realtime_default() is False
+      assert get_speedup_default() == 1
+    with patch.dict(os.environ, {"LOGSTORY_REALTIME": "on", "LOGSTORY_SPEEDUP": "60"}):
+      assert get_realtime_default() is True
+      assert get_speedup_default() == 60
+
+  def test_get_workers_default(self):
+    """Test replay worker processes default getter."""
+    with patch.dict(os.environ, {}, clear=True):
+      assert get_workers_default() == 1
+    with patch.dict(os.environ, {"LOGSTORY_WORKERS": "16"}):
+      assert get_workers_default() == 16
+
+  def test_get_chunk_workers_default(self):
+    """Test chunk transformation processes default getter."""
+    with patch.dict(os.environ, {}, clear=True):
+      assert get_chunk_workers_default() == 1
+    with patch.dict(os.environ, {"LOGSTORY_CHUNK_WORKERS": "4"}):
+      assert get_chunk_workers_default() == 4
+
+  def test_get_adaptive_and_save_tuning_defaults(self):
+    """Test adaptive posting default getters."""
+    with patch.dict(os.environ, {}, clear=True):
+      assert get_adaptive_default() is False
+      assert get_save_tuning_default() is False
+    with patch.dict(
+        os.environ, {"LOGSTORY_ADAPTIVE": "on", "LOGSTORY_SAVE_TUNING": "1"}
+    ):
+      assert get_adaptive_default() is True
+      assert get_save_tuning_default() is True
+
   def test_load_env_file(self):
     """Test load_env_file behavior."""
     with tempfile.NamedTemporaryFile(mode="w", suffix=".env", delete=False) as f:
@@ -209,7 +314,7 @@ class TestSourceParsingAndBlobMocking:
       fb.download_to_filename(str(dest))
       assert dest.read_text(encoding="utf-8") == "sample content"
 
-  @patch("logstory.logstory.storage.Client")
+  @patch("google.cloud.storage.Client")
   def test_get_gcs_blobs(self, mock_storage_client):
     """Test _get_gcs_blobs with GCS client."""
     mock_client = MagicMock()
@@ -267,15 +372,167 @@ class TestDiscoveryAndDownloads:
         assert "UC1" in dirs
         assert "UC2" in dirs
 
-  def test_download_usecase(self):
+  def test_source_listings_are_cached_with_ttl(self, monkeypatch):
+    """Test that a bucket is listed once per run and once per TTL on disk."""
+    mock_blobs = MagicMock()
+    mock_blobs.pages = [MagicMock(prefixes=["UC1/", "docs/"])]
+    with patch("logstory.logstory._get_blobs", return_value=mock_blobs) as mock_get:
+      assert _get_source_directories("gs://b1") == ["UC1"]
+      assert _get_source_directories("gs://b1") == ["UC1"]
+      assert mock_get.call_count == 1
+
+      logstory_cli._catalog.clear()  # a new run reads the disk cache
+      assert _get_source_directories("gs://b1") == ["UC1"]
+      assert mock_get.call_count == 1
+
+      logstory_cli._catalog.clear()
+      monkeypatch.setenv("LOGSTORY_CATALOG_TTL", "0")
+      assert _get_source_directories("gs://b1") == ["UC1"]
+      assert _get_source_directories("gs://b1", refresh=True) == ["UC1"]
+      assert mock_get.call_count == 3
+
+  def test_catalog_lists_sources_concurrently_and_keeps_errors(self):
+    """Test that each source is listed in its own thread, in order."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def list_source(source_uri, _refresh):
+      barrier.wait()  # both sources are listed at the same time
+      if source_uri == "gs://down":
+        raise ConnectionError("unreachable")
+      return ["UC1"]
+
+    with patch("logstory.logstory._get_source_directories", side_effect=list_source):
+      catalog = _get_catalog(["gs://down", "gs://up"])
+
+    assert list(catalog) == ["gs://down", "gs://up"]
+    assert isinstance(catalog["gs://down"], ConnectionError)
+    assert catalog["gs://up"] == ["UC1"]
+
+  def test_download_usecase_refreshes_stale_listing(self):
+    """Test that a usecase missing from a cached listing is looked up again."""
+    listings = {False: ["OLD_UC"], True: ["OLD_UC", "NEW_UC"]}
+    with (
+        patch(
+            "logstory.logstory._get_source_directories",
+            side_effect=lambda _source_uri, refresh: listings[refresh],
+        ),
+        patch("logstory.logstory._get_blobs", return_value=[]),
+    ):
+      assert _download_usecase("NEW_UC", bucket="gs://bucket") is True
+
+  def test_download_usecase_refreshes_only_cached_listings(self):
+    """Test that an unknown usecase re-lists only sources read from the cache."""
+    with (
+        patch(
+            "logstory.logstory.get_usecases_buckets",
+            return_value=["gs://listed", "gs://cached"],
+        ),
+        patch(
+            "logstory.logstory._list_source_directories", return_value=["OLD_UC"]
+        ) as mock_list,
+    ):
+      _get_source_directories("gs://listed")
+      logstory_cli._catalog["gs://cached"] = ["OLD_UC"]  # as if read from disk
+
+      assert _download_usecase("UNKNOWN_UC") is False
+
+    assert [c.args for c in mock_list.call_args_list] == [
+        ("gs://listed",),
+        ("gs://cached",),
+    ]
+
+  def test_gcs_client_is_shared(self):
+    """Test that every GCS listing of a run reuses one client."""
+    with patch("google.cloud.storage.Client") as mock_client:
+      _get_gcs_blobs("bucket-a")
+      _get_gcs_blobs("bucket-b", usecase="UC1")
+    mock_client.assert_called_once_with()
+
+  def test_gcs_client_is_created_once_for_concurrent_listings(self):
+    """Test that sources listed at the same time share one new client."""
+
+    def slow_client():
+      time.sleep(0.05)  # every listing thread asks before the first is built
+      return MagicMock()
+
+    sources = [f"gs://bucket-{i}" for i in range(4)]
+    with patch("google.cloud.storage.Client", side_effect=slow_client) as mock_client:
+      catalog = _get_catalog(sources)
+
+    assert not any(isinstance(d, Exception) for d in catalog.values()), catalog
+    mock_client.assert_called_once_with()
+
+  def test_download_usecase(self, tmp_path):
     """Test _download_usecase downloading blob files."""
-    mock_blob = MagicMock()
+    mock_blob = MagicMock(md5_hash="bWQ1", crc32c="Y3Jj", size=4)
     mock_blob.name = "UC_TEST/EVENTS/sysmon.log"
+    mock_blob.download_to_filename.side_effect = lambda path: Path(path).write_text(
+        "logs"
+    )
+
+    with (
+        patch("logstory.logstory._get_usecases_dir", return_value=str(tmp_path)),
+        patch("logstory.logstory._get_source_directories", return_value=["UC_TEST"]),
+        patch("logstory.logstory._get_blobs", return_value=[mock_blob]),
+        patch("google.cloud.storage.Client"),
+    ):
+      assert _download_usecase("UC_TEST", bucket="gs://bucket") is True
+    assert (tmp_path / "UC_TEST/EVENTS/sysmon.log").read_text() == "logs"
+    assert json.loads((tmp_path / "UC_TEST/.manifest.json").read_text()) == {
+        "UC_TEST/EVENTS/sysmon.log": {"md5_hash": "bWQ1", "crc32c": "Y3Jj", "size": 4}
+    }
+
+  def test_download_usecase_skips_unchanged_files(self, tmp_path):
+    """Test that only files changed at the source are downloaded again."""
+    source = tmp_path / "source"
+    (source / "UC/EVENTS").mkdir(parents=True)
+    (source / "UC/EVENTS/A.log").write_text("a1")
+    (source / "UC/EVENTS/B.log").write_text("b1")
+    installed = tmp_path / "installed"
+
+    with patch("logstory.logstory._get_usecases_dir", return_value=str(installed)):
+      stats = _download_blobs("UC", _get_file_blobs(str(source), "UC"), threads=2)
+      assert (stats.downloaded, stats.skipped, stats.bytes) == (2, 0, 4)
+
+      stats = _download_blobs("UC", _get_file_blobs(str(source), "UC"))
+      assert (stats.downloaded, stats.skipped) == (0, 2)
+
+      (source / "UC/EVENTS/B.log").write_text("b2 changed")
+      (installed / "UC/EVENTS/A.log").unlink()
+      stats = _download_blobs("UC", _get_file_blobs(str(source), "UC"))
+      assert (stats.downloaded, stats.skipped) == (2, 0)
+    assert (installed / "UC/EVENTS/A.log").read_text() == "a1"
+    assert (installed / "UC/EVENTS/B.log").read_text() == "b2 changed"
+
+  def test_failed_download_keeps_installed_file(self, tmp_path):
+    """Test that a failed download leaves the old file and no partial one."""
+    good_blob = MagicMock(md5_hash="Z29vZA==", crc32c=None, size=4)
+    good_blob.name = "UC/EVENTS/GOOD.log"
+    good_blob.download_to_filename.side_effect = lambda path: Path(path).write_text(
+        "good"
+    )
+    bad_blob = MagicMock(md5_hash="YmFk", crc32c=None, size=7)
+    bad_blob.name = "UC/EVENTS/BAD.log"
 
-    with patch("logstory.logstory._get_source_directories", return_value=["UC_TEST"]):
-      with patch("logstory.logstory._get_blobs", return_value=[mock_blob]):
-        with patch("logstory.logstory.storage.Client"):
-          assert _download_usecase("UC_TEST", bucket="gs://bucket") is True
+    def fail(path):
+      Path(path).write_text("partial")
+      raise ConnectionError("connection reset")
+
+    bad_blob.download_to_filename.side_effect = fail
+    (tmp_path / "UC/EVENTS").mkdir(parents=True)
+    (tmp_path / "UC/EVENTS/BAD.log").write_text("old")
+
+    with (
+        patch("logstory.logstory._get_usecases_dir", return_value=str(tmp_path)),
+        pytest.raises(ConnectionError),
+    ):
+      _download_blobs("UC", [good_blob, bad_blob])
+
+    assert sorted(os.listdir(tmp_path / "UC/EVENTS")) == ["BAD.log", "GOOD.log"]
+    assert (tmp_path / "UC/EVENTS/BAD.log").read_text() == "old"
+    assert list(json.loads((tmp_path / "UC/.manifest.json").read_text())) == [
+        "UC/EVENTS/GOOD.log"
+    ]
 
   def test_download_all_usecases(self):
     """Test _download_all_usecases."""
@@ -381,9 +638,7 @@ class TestCliCommandsExecution:
 
   def test_replay_all_usecases_command(self):
     """Test logstory replay all command with local file output."""
-    with patch(
-        "logstory.logstory.imported_main.usecase_replay_logtype", return_value=None
-    ):
+    with patch("logstory.main.usecase_replay_logtype", return_value=None):
       result = runner.invoke(
           app,
           [
@@ -399,7 +654,7 @@ class TestCliCommandsExecution:
     """Test logstory replay usecase command."""
     with patch("logstory.logstory.get_usecases", return_value=["NETWORK_ANALYSIS"]):
       with patch(
-          "logstory.logstory.imported_main.usecase_replay_logtype",
+          "logstory.main.usecase_replay_logtype",
           return_value=None,
       ):
         result = runner.invoke(
@@ -418,7 +673,7 @@ class TestCliCommandsExecution:
     """Test logstory replay logtype command."""
     with patch("logstory.logstory.get_usecases", return_value=["NETWORK_ANALYSIS"]):
       with patch(
-          "logstory.logstory.imported_main.usecase_replay_logtype",
+          "logstory.main.usecase_replay_logtype",
           return_value=None,
       ):
         result = runner.invoke(
@@ -433,6 +688,196 @@ class TestCliCommandsExecution:
         )
         assert result.exit_code == 0
 
+  def test_replay_logtype_passes_posting_options(self):
+    """Test that --max-in-flight and --ordered configure the shared poster."""
+    with (
+        patch("logstory.main.BatchPoster") as mock_poster,
+        patch(
+            "logstory.main.usecase_replay_logtype",
+            return_value=None,
+        ) as mock_replay,
+    ):
+      result = runner.invoke(
+          app,
+          [
+              "replay",
+              "logtype",
+              "NETWORK_ANALYSIS",
+              "BRO_JSON",
+              "--local-file-output",
+              "--max-in-flight",
+              "4",
+              "--ordered",
+          ],
+      )
+    assert result.exit_code == 0
+    assert mock_poster.call_args.args[1:] == (4, True)
+    poster = mock_poster.return_value.__enter__.return_value
+    assert mock_replay.call_args.kwargs["poster"] is poster
+
+  def test_replay_logtype_adaptive_creates_controller(self):
+    """Test that --adaptive gives the poster a controller for the backend."""
+    mock_backend = MagicMock()
+    with (
+        patch(
+            "logstory.main.get_replay_context",
+            return_value=MagicMock(ingestion_backend=mock_backend),
+        ),
+        patch("logstory.main.AdaptiveController") as mock_controller,
+        patch("logstory.main.BatchPoster") as mock_poster,
+        patch(
+            "logstory.main.usecase_replay_logtype",
+            return_value=None,
+        ),
+    ):
+      result = runner.invoke(
+          app,
+          [
+              "replay",
+              "logtype",
+              "NETWORK_ANALYSIS",
+              "BRO_JSON",
+              "--local-file-output",
+              "--max-in-flight",
+              "8",
+              "--adaptive",
+              "--save-tuning",
+          ],
+      )
+    assert result.exit_code == 0
+    mock_controller.for_backend.assert_called_once_with(mock_backend, 8, True)
+    controller = mock_controller.for_backend.return_value
+    assert mock_poster.call_args.kwargs["controller"] is controller
+
+  def test_replay_logtype_rate_options_create_rate_limiter(self):
+    """Test that --eps and --bytes-per-sec give the poster a rate limiter."""
+    with (
+        patch("logstory.main.BatchPoster") as mock_poster,
+        patch(
+            "logstory.main.usecase_replay_logtype",
+            return_value=None,
+        ),
+    ):
+      result = runner.invoke(
+          app,
+          [
+              "replay",
+              "logtype",
+              "NETWORK_ANALYSIS",
+              "BRO_JSON",
+              "--local-file-output",
+              "--eps",
+              "500",
+              "--bytes-per-sec",
+              "100000",
+          ],
+      )
+    assert result.exit_code == 0
+    rate_limiter = mock_poster.call_args.kwargs["rate_limiter"]
+    assert (rate_limiter.eps, rate_limiter.bytes_per_sec) == (500, 100_000)
+
+  def test_realtime_replays_each_usecase_as_one_timeline(self, capsys):
+    """Test that --realtime hands all logtypes of a usecase to one replay."""
+    with (
+        patch(
+            "logstory.main.get_replay_context",
+            return_value=MagicMock(ingestion_backend=MagicMock()),
+        ),
+        patch("logstory.main.BatchPoster") as mock_poster,
+        patch("logstory.main.usecase_replay_realtime") as mock_realtime,
+        patch("logstory.main.replay_jobs") as mock_replay_jobs,
+    ):
+      _replay_usecases(
+          ["UC"], ["LOG_A", " LOG_B"], False, "1d", workers=4, realtime=True, speedup=60
+      )
+
+    poster = mock_poster.return_value.__enter__.return_value
+    mock_realtime.assert_called_once_with(
+        "UC",
+        ["LOG_A", "LOG_B"],
+        ANY,
+        poster,
+        timestamp_delta="1d",
+        entities=False,
+        speedup=60,
+    )
+    mock_replay_jobs.assert_not_called()
+    output = capsys.readouterr().out
+    assert "ignoring --workers" in output
+    assert "in real time at 60x" in output
+
+  def test_realtime_rejects_local_file_output(self):
+    """Test that --realtime needs the ingestion API."""
+    result = runner.invoke(
+        app, ["replay", "logtype", "UC", "LOG", "--local-file-output", "--realtime"]
+    )
+    assert result.exit_code == 1
+    assert "cannot be used with --local-file-output" in result.output
+
+  def test_realtime_rejects_non_positive_speedup(self, capsys):
+    """Test that --speedup must be positive."""
+    with pytest.raises(typer.Exit):
+      _replay_usecases(["UC"], "*", False, None, realtime=True, speedup=0)
+    assert "--speedup must be positive" in capsys.readouterr().err
+
+  def test_replay_usecase_with_workers_replays_jobs(self):
+    """Test that --workers replays each logtype as a job in the process pool."""
+
+    def replay_jobs(jobs, workers):
+      assert workers == 2
+      yield ReplayResult(jobs[1])
+      yield ReplayResult(jobs[0], error="ValueError: bad log")
+
+    with (
+        patch("logstory.logstory.get_usecases", return_value=["UC"]),
+        patch("logstory.logstory._get_logtypes", return_value=["LOG_A", "LOG_B"]),
+        patch("logstory.main.replay_jobs", side_effect=replay_jobs) as mock_replay_jobs,
+    ):
+      result = runner.invoke(
+          app,
+          [
+              "replay",
+              "usecase",
+              "UC",
+              "--local-file-output",
+              "--no-get",
+              "--workers",
+              "2",
+              "--max-in-flight",
+              "4",
+              "--chunk-workers",
+              "3",
+              "--eps",
+              "200",
+          ],
+      )
+
+    assert result.exit_code == 1
+    jobs = mock_replay_jobs.call_args.args[0]
+    assert [job.log_type for job in jobs] == ["LOG_A", "LOG_B"]
+    assert all(job.local_file_output and job.max_in_flight == 4 for job in jobs)
+    assert all(job.chunk_workers == 3 and job.eps == 200 for job in jobs)
+    assert "Replayed usecase: UC, logtype: LOG_B" in result.output
+    assert "Failed usecase: UC, logtype: LOG_A: ValueError: bad log" in result.output
+    assert 'ingestion_labels["source_usecase"]="UC"' in result.output
+    assert "1 of 2 logtypes failed" in result.output
+
+  def test_replay_rejects_zero_max_in_flight(self):
+    """Test that --max-in-flight must be at least 1."""
+    result = runner.invoke(
+        app,
+        [
+            "replay",
+            "logtype",
+            "UC",
+            "LOG",
+            "--local-file-output",
+            "--max-in-flight",
+            "0",
+        ],
+    )
+    assert result.exit_code != 0
+
   def test_entry_point(self):
     """Test entry_point function calls app()."""
     with patch("logstory.logstory.app") as mock_app:
@@ -493,9 +938,12 @@ class TestCliAdvancedBranches:
       cred_path = f.name
 
     try:
-      with patch(
-          "logstory.logstory.imported_main.usecase_replay_logtype",
-          return_value=None,
+      with (
+          patch("logstory.main.ReplayContext"),
+          patch(
+              "logstory.main.usecase_replay_logtype",
+              return_value=None,
+          ),
       ):
         result = runner.invoke(
             app,
@@ -522,25 +970,28 @@ class TestCliAdvancedBranches:
       cred_path = f.name
 
     try:
-      with patch("logstory.logstory.get_usecases", return_value=["NETWORK_ANALYSIS"]):
-        with patch(
-            "logstory.logstory.imported_main.usecase_replay_logtype",
-            return_value=None,
-        ):
-          result = runner.invoke(
-              app,
-              [
-                  "replay",
-                  "usecase",
-                  "NETWORK_ANALYSIS",
-                  "--credentials-path",
-                  cred_path,
-                  "--customer-id",
-                  valid_uuid,
-                  "--no-get",
-              ],
-          )
-          assert result.exit_code == 0
+      with (
+          patch("logstory.logstory.get_usecases", return_value=["NETWORK_ANALYSIS"]),
+          patch("logstory.main.ReplayContext"),
+          patch(
+              "logstory.main.usecase_replay_logtype",
+              return_value=None,
+          ),
+      ):
+        result = runner.invoke(
+            app,
+            [
+                "replay",
+                "usecase",
+                "NETWORK_ANALYSIS",
+                "--credentials-path",
+                cred_path,
+                "--customer-id",
+                valid_uuid,
+                "--no-get",
+            ],
+        )
+        assert result.exit_code == 0
     finally:
       Path(cred_path).unlink()
 
@@ -552,10 +1003,23 @@ class TestCliAdvancedBranches:
     with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
       cred_path = f.name
 
+    # the replay context must see the options the command exported
+    context_credentials = []
+
+    def create_context():
+      context_credentials.append(os.environ.get("CREDENTIALS_PATH"))
+      return MagicMock()
+
     try:
-      with patch(
-          "logstory.logstory.imported_main.usecase_replay_logtype",
-          return_value=None,
+      with (
+          patch(
+              "logstory.main.ReplayContext",
+              side_effect=create_context,
+          ),
+          patch(
+              "logstory.main.usecase_replay_logtype",
+              return_value=None,
+          ),
       ):
         result = runner.invoke(
             app,
@@ -571,10 +1035,83 @@ class TestCliAdvancedBranches:
             ],
         )
         assert result.exit_code == 0
+      assert context_credentials == [cred_path]
     finally:
       Path(cred_path).unlink()
 
 
+class TestStartup:
+  """Test that the CLI starts without loading what a command does not use."""
+
+  def test_list_installed_loads_no_replay_engine_or_sdks(self):
+    """Test that listing installed usecases imports no Google Cloud SDK."""
+    code = """
+import sys
+from logstory import logstory
+sys.argv = ["logstory", "usecases", "list-installed"]
+try:
+  logstory.app()
+except SystemExit:
+  pass
+for name in ("logstory.main", "google.cloud.storage", "google.auth", "dotenv"):
+  assert name not in sys.modules, name
+"""
+    env = {**os.environ, "PYTHONPATH": str(Path(logstory_cli.__file__).parent.parent)}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "NETWORK_ANALYSIS" in result.stdout
+
+  def test_fresh_import_lists_sources_concurrently(self, tmp_path):
+    """Test that the first listings of a run all load the GCS SDK safely."""
+    code = """
+import json, os, sys, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class Handler(BaseHTTPRequestHandler):
+  def do_GET(self):
+    body = json.dumps({"kind": "storage#objects", "prefixes": ["UC1/"]}).encode()
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, *args):
+    pass
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["STORAGE_EMULATOR_HOST"] = f"http://127.0.0.1:{server.server_port}"
+from logstory import logstory
+assert "google.cloud.storage" not in sys.modules
+sources = [f"gs://bucket-{i}" for i in range(4)]
+catalog = logstory._get_catalog(sources)
+assert catalog == dict.fromkeys(sources, ["UC1"]), catalog
+"""
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(Path(logstory_cli.__file__).parent.parent),
+        "LOGSTORY_CACHE_DIR": str(tmp_path),
+    }
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
 class TestPackageInit:
   """Test package __init__.py version resolution."""
 
@@ -0,0 +1,127 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the pluggable JSON codec."""
+
+import json
+import math
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from logstory import codec
+
+CODECS = [codec.get_codec(name) for name in codec.CODECS]
+
+JSON_VALUES = st.recursive(
+    st.none()
+    | st.booleans()
+    | st.integers()
+    | st.floats(allow_nan=False, allow_infinity=False)
+    | st.text(),
+    lambda children: st.lists(children) | st.dictionaries(st.text(), children),
+    max_leaves=20,
+)
+
+
+@pytest.mark.parametrize("json_codec", CODECS, ids=lambda c: c.name)
+class TestJsonCodec:
+  """Test that every codec speaks the same JSON."""
+
+  @given(value=JSON_VALUES)
+  def test_dumps_is_ascii_json(self, json_codec, value):
+    """Property: Output is ASCII-only and decodes to the input everywhere."""
+    data = json_codec.dumps(value)
+    assert data.isascii()
+    assert json.loads(data) == value
+    assert json_codec.loads(data) == value
+    assert json_codec.loads(data.decode("ascii")) == value
+
+  def test_values_the_fast_libraries_reject(self, json_codec):
+    """Test the standard library fallback for big ints, int keys and NaN."""
+    value = {"big": 2**70, 1: "int key", "text": "café \U0001f600"}
+    expected = {"big": 2**70, "1": "int key", "text": "café \U0001f600"}
+
+    assert json.loads(json_codec.dumps(value)) == expected
+    assert json_codec.loads('{"big": 1180591620717411303424}')["big"] == 2**70
+    assert math.isnan(json_codec.loads('{"n": NaN}')["n"])
+
+  def test_non_finite_floats_match_stdlib(self, json_codec):
+    """Test that NaN and infinities are not turned into null."""
+    value = {"n": float("nan"), "i": [float("inf"), -float("inf")], "z": None}
+
+    assert json_codec.dumps(value) == b'{"n":NaN,"i":[Infinity,-Infinity],"z":null}'
+    assert json_codec.dumps({"z": None, "f": 1.5}) == b'{"z":null,"f":1.5}'
+
+  def test_invalid_json_raises_stdlib_error(self, json_codec):
+    """Test that invalid input raises json.JSONDecodeError."""
+    with pytest.raises(json.JSONDecodeError):
+      json_codec.loads('{"unterminated": ')
+
+
+def test_get_codec_rejects_unknown_codec():
+  """Test that an unavailable codec name is rejected."""
+  with pytest.raises(ValueError, match="JSON codec 'simplejson' is not available"):
+    codec.get_codec("simplejson")
+
+
+def test_get_codec_prefers_env_then_fastest(monkeypatch):
+  """Test codec selection by LOGSTORY_JSON_CODEC and by availability."""
+  monkeypatch.setenv("LOGSTORY_JSON_CODEC", "json")
+  assert codec.get_codec().name == "json"
+  monkeypatch.delenv("LOGSTORY_JSON_CODEC")
+  assert codec.get_codec().name == next(
+      name for name in ("orjson", "msgspec", "json") if name in codec.CODECS
+  )
+
+
+def test_raw_json_keeps_ascii_objects_as_is():
+  """Test that ASCII objects are wrapped without being re-encoded."""
+  line = ' {"a": [1, 2],  "b": "x"} '
+
+  assert codec.raw_json(line) == line.strip().encode("ascii")
+  assert isinstance(codec.raw_json(line), codec.RawJson)
+
+
+def test_raw_json_reencodes_other_text():
+  """Test that non-ASCII text is escaped and invalid JSON still raises."""
+  assert codec.raw_json('{"x": "café"}') == b'{"x":"caf\\u00e9"}'
+  assert codec.raw_json("[1]") == b"[1]"
+  with pytest.raises(json.JSONDecodeError):
+    codec.raw_json("not json")
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        '{"a":1} {"b":2}',
+        '{"event_timestamp":2026-01-01T00:00:00 xxx}',
+        '{"a": 1,}',
+    ],
+)
+def test_raw_json_rejects_invalid_objects(line):
+  """Test that text shaped like an object must still be valid JSON."""
+  with pytest.raises(json.JSONDecodeError):
+    codec.raw_json(line)
+
+
+@given(
+    value=st.dictionaries(st.text(), JSON_VALUES, max_size=3),
+    items=st.lists(JSON_VALUES, max_size=3),
+)
+def test_dumps_with_array_matches_dumps(value, items):
+  """Property: Splicing encoded items equals encoding the whole object."""
+  data = codec.dumps_with_array(value, "items", [codec.dumps(i) for i in items])
+  assert json.loads(data) == {**value, "items": items}
@@ -18,12 +18,14 @@ import datetime
 import uuid
 from datetime import UTC
 
+import pytest
 from hypothesis import given
 from hypothesis import strategies as st
 
 from logstory.ingestion import sanitize_log_text
 from logstory.logstory import validate_uuid4
 from logstory.main import (
+    _get_fast_dateformat,
     _get_timestamp_delta_dict,
     datetime_to_filetime,
     filetime_to_datetime,
@@ -72,6 +74,76 @@ def test_hypothesis_filetime_datetime_roundtrip(dt: datetime.datetime):
   assert abs((dt - reconstructed).total_seconds()) < 1e-4
 
 
+# Bundled dateformats that have a fast fixed-width parser and formatter
+FAST_DATEFORMATS = [
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%b %d %H:%M:%S",
+    "%Y-%m-%d",
+]
+
+
+@given(
+    dt=st.datetimes(min_value=datetime.datetime(1000, 1, 1)),
+    dateformat=st.sampled_from(FAST_DATEFORMATS),
+)
+def test_hypothesis_fast_dateformat_matches_strftime(
+    dt: datetime.datetime, dateformat: str
+):
+  """Property: The fast path formats and parses exactly like strftime/strptime."""
+  fast_dateformat = _get_fast_dateformat(dateformat)
+  text = dt.strftime(dateformat)
+  assert fast_dateformat.format(dt) == text
+  try:
+    expected = datetime.datetime.strptime(text, dateformat)
+  except ValueError:  # Feb 29 without a year
+    with pytest.raises(ValueError, match="day is out of range"):
+      fast_dateformat.parse(text)
+  else:
+    assert fast_dateformat.parse(text) == expected
+
+
+@given(
+    fields=st.tuples(*[st.integers(min_value=0, max_value=99)] * 5),
+    year=st.integers(min_value=0, max_value=9999),
+    month_name=st.sampled_from(["Jan", "Feb", "Dec", "jan", "JAN", "Foo", "１２3"]),
+    separator=st.sampled_from(["-", "/", "T", " ", "  "]),
+    dateformat=st.sampled_from(FAST_DATEFORMATS),
+)
+def test_hypothesis_fast_dateformat_parse_agrees_with_strptime(
+    fields: tuple[int, ...],
+    year: int,
+    month_name: str,
+    separator: str,
+    dateformat: str,
+):
+  """Property: The fast parser returns strptime's result, raises when it does, or defers."""
+  month, day, hour, minute, second = fields
+  text = (
+      dateformat.replace("%Y", f"{year:04d}")
+      .replace("%m", f"{month:02d}")
+      .replace("%d", f"{day:02d}")
+      .replace("%H", f"{hour:02d}")
+      .replace("%M", f"{minute:02d}")
+      .replace("%S", f"{second:02d}")
+      .replace("%b", month_name)
+      .replace("-", separator, 1)
+  )
+  try:
+    expected = datetime.datetime.strptime(text, dateformat)
+  except ValueError:
+    expected = None
+
+  fast_dateformat = _get_fast_dateformat(dateformat)
+  try:
+    parsed = fast_dateformat.parse(text)
+  except ValueError:
+    assert expected is None
+  else:
+    assert parsed is None or parsed == expected
+
+
 @given(text=st.text())
 def test_hypothesis_sanitize_log_text_invariants(text: str):
   """Property: sanitize_log_text removes all registered problematic symbols for any input text."""
@@ -14,16 +14,24 @@
 
 """Comprehensive tests for ingestion backends in logstory."""
 
+import base64
+import gzip
 import json
-from unittest.mock import MagicMock
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
+import urllib3
 
+from logstory import codec, ingestion
 from logstory.auth import LegacyAuthHandler, RestAuthHandler
 from logstory.ingestion import (
     LegacyIngestionBackend,
     RestIngestionBackend,
+    RetryPolicy,
+    _parse_retry_after,
     create_ingestion_backend,
 )
 
@@ -128,6 +136,30 @@ class TestLegacyIngestionBackend:
     assert payload["log_type"] == "ASSET"
     assert payload["entities"] == entities
 
+  @pytest.mark.parametrize("api", ["udmevents", "entities"])
+  def test_raw_json_entries_are_spliced_into_body(self, api):
+    """Test that RawJson entries are sent verbatim and sized exactly."""
+    mock_auth = MagicMock(spec=LegacyAuthHandler)
+    mock_session = MagicMock()
+    mock_session.post.return_value = MagicMock(status_code=200)
+    mock_auth.get_http_client.return_value = mock_session
+    backend = LegacyIngestionBackend(mock_auth, "cust-123")
+    lines = ['{"metadata": {"id": 1}}', '{"x":"caf\\u00e9"}']
+    entries = [codec.raw_json(line) for line in lines]
+
+    assert api in backend.raw_json_apis
+    sizer = backend.get_batch_sizer(api, "LOG", LABELS)
+    POST_METHODS[api](backend, entries)
+
+    body = mock_session.post.call_args.kwargs["data"]
+    assert lines[0].encode() in body
+    payload = json.loads(body)
+    key = "events" if api == "udmevents" else "entities"
+    assert payload[key] == [json.loads(line) for line in lines]
+    budget = int(backend.max_request_bytes * (1 - ingestion.REQUEST_BYTES_HEADROOM))
+    estimate = budget - sizer.max_bytes + sum(map(sizer.entry_bytes, entries))
+    assert estimate - len(body) == len(",")
+
   def test_check_response_error_handling(self):
     """Test check_response error handling for JSON and non-JSON error responses."""
     mock_auth = MagicMock(spec=LegacyAuthHandler)
@@ -215,6 +247,47 @@ class TestRestIngestionBackend:
     fallback_id = backend_fail._get_or_create_forwarder()
     assert fallback_id == "default"
 
+  def test_forwarder_config_ignores_request_compression(self):
+    """Test that gzipped request bodies do not change the forwarder created."""
+    mock_auth = MagicMock(spec=RestAuthHandler)
+    mock_session = MagicMock()
+    mock_session.get.return_value = MagicMock(status_code=404)
+    mock_session.post.return_value = MagicMock(status_code=200)
+    mock_session.post.return_value.json.return_value = {"name": "forwarders/fwd-1"}
+    mock_auth.get_http_client.return_value = mock_session
+
+    backend = RestIngestionBackend(mock_auth, "c1", "p1", compression="gzip")
+
+    assert backend._get_or_create_forwarder() == "fwd-1"
+    payload = mock_session.post.call_args.kwargs["json"]
+    assert payload["config"]["uploadCompression"] is False
+
+  @pytest.mark.parametrize("labels", [[], [{"key": "env", "value": "tést"}]])
+  def test_log_encoder_matches_generic_encoding(self, labels):
+    """Test that RestLogEncoder builds the body the API expects."""
+    texts = ["plain", 'café "quoted" ®™', ""]
+    encoder = ingestion.RestLogEncoder("fwd", labels, "2026-01-01T00:00:00+00:00")
+
+    body = encoder.encode([{"logText": text} for text in texts] + [{}])
+
+    assert body.isascii()
+    payload = json.loads(body)
+    assert payload["inline_source"]["forwarder"] == "fwd"
+    logs = payload["inline_source"]["logs"]
+    assert [base64.b64decode(log.pop("data")).decode() for log in logs] == [
+        "plain",
+        'café "quoted" ',
+        "",
+        "",
+    ]
+    expected = {
+        "log_entry_time": "2026-01-01T00:00:00+00:00",
+        "collection_time": "2026-01-01T00:00:00+00:00",
+    }
+    if labels:
+      expected["labels"] = {"env": {"value": "tést"}}
+    assert logs == [expected] * 4
+
   def test_post_udm_events_rest(self):
     """Test post_udm_events with metadata generation and labels."""
     mock_auth = MagicMock(spec=RestAuthHandler)
@@ -231,7 +304,7 @@ class TestRestIngestionBackend:
     backend.post_udm_events(entries, labels)
 
     mock_session.post.assert_called_once()
-    payload = mock_session.post.call_args.kwargs["json"]
+    payload = json.loads(mock_session.post.call_args.kwargs["data"])
     udm_event = payload["inline_source"]["events"][0]["udm"]
     assert "metadata" in udm_event
     assert "event_timestamp" in udm_event["metadata"]
@@ -252,7 +325,7 @@ class TestRestIngestionBackend:
     backend.post_entities("ASSET", entries, labels)
 
     mock_session.post.assert_called_once()
-    payload = mock_session.post.call_args.kwargs["json"]
+    payload = json.loads(mock_session.post.call_args.kwargs["data"])
     entity_entry = payload["inline_source"]["entities"][0]
     assert entity_entry["log_type"] == "ASSET"
     assert entity_entry["labels"] == {"dept": "eng"}
@@ -274,6 +347,281 @@ class TestRestIngestionBackend:
       backend._check_response(resp_text_err)
 
 
+def _response(status_code, retry_after=None):
+  response = MagicMock(spec=requests.Response, status_code=status_code)
+  response.headers = {"Retry-After": retry_after} if retry_after else {}
+  response.json.return_value = {"error": status_code}
+  return response
+
+
+def _connect_error():
+  """A refused connection, wrapped the way requests raises it."""
+  refused = urllib3.exceptions.NewConnectionError(None, "Connection refused")
+  return requests.ConnectionError(
+      urllib3.exceptions.MaxRetryError(None, "/v2/entities:batchCreate", refused)
+  )
+
+
+def _backend_with_responses(*responses, max_retries=3):
+  mock_auth = MagicMock(spec=LegacyAuthHandler)
+  mock_session = MagicMock()
+  mock_session.post.side_effect = responses
+  mock_auth.get_http_client.return_value = mock_session
+  backend = LegacyIngestionBackend(
+      mock_auth, "c1", retry_policy=RetryPolicy(max_retries=max_retries)
+  )
+  return backend, mock_session
+
+
+class TestRetries:
+  """Test retrying of throttled and unavailable requests."""
+
+  @patch("logstory.ingestion.time.sleep")
+  def test_retries_throttling_then_succeeds(self, mock_sleep):
+    """Test that 429 and 503 are retried and Retry-After is honoured."""
+    backend, mock_session = _backend_with_responses(
+        _response(429, retry_after="7"), _response(503), _response(200)
+    )
+
+    backend.post_udm_events([{"metadata": {}}], labels=[])
+
+    assert mock_session.post.call_count == 3
+    assert mock_sleep.call_args_list[0].args == (7.0,)
+    assert 0 <= mock_sleep.call_args_list[1].args[0] <= 2.0  # jittered 2nd backoff
+    stats = backend.retry_stats.as_dict()
+    assert stats["requests"] == 3
+    assert stats["retries"] == 2
+    assert stats["retries_by_reason"] == {"429": 1, "503": 1}
+
+  @patch("logstory.ingestion.time.sleep")
+  def test_gives_up_after_max_retries(self, mock_sleep):
+    """Test that the last error is raised once retries run out."""
+    backend, mock_session = _backend_with_responses(
+        *[_response(503)] * 3, max_retries=2
+    )
+
+    with pytest.raises(RuntimeError, match="status 503"):
+      backend.post_entities("ASSET", [{}], labels=[])
+    assert mock_session.post.call_count == 3
+    assert mock_sleep.call_count == 2
+
+  @pytest.mark.parametrize("status_code", [400, 403, 500, 504])
+  @patch("logstory.ingestion.time.sleep")
+  def test_non_transient_errors_are_not_retried(self, mock_sleep, status_code):
+    """Test that client errors, 500s and 504s fail on the first attempt."""
+    backend, mock_session = _backend_with_responses(_response(status_code))
+
+    with pytest.raises(RuntimeError, match=f"status {status_code}"):
+      backend.post_entities("ASSET", [{}], labels=[])
+    mock_session.post.assert_called_once()
+    mock_sleep.assert_not_called()
+
+  @patch("logstory.ingestion.time.sleep")
+  def test_connect_errors_are_retried(self, mock_sleep):
+    """Test that failures to connect are retried, then re-raised."""
+    backend, mock_session = _backend_with_responses(
+        _connect_error(), requests.ConnectTimeout("timed out"), _response(200)
+    )
+    backend.post_entities("ASSET", [{}], labels=[])
+    assert mock_session.post.call_count == 3
+    assert backend.retry_stats.retries_by_reason == {
+        "ConnectionError": 1,
+        "ConnectTimeout": 1,
+    }
+
+    backend, _ = _backend_with_responses(*[_connect_error()] * 2, max_retries=1)
+    with pytest.raises(requests.ConnectionError):
+      backend.post_entities("ASSET", [{}], labels=[])
+    assert mock_sleep.call_count == 3
+
+  @patch("logstory.ingestion.time.sleep")
+  def test_errors_after_sending_are_not_retried(self, mock_sleep):
+    """Test that a connection lost after sending is not sent twice."""
+    reset = requests.ConnectionError(
+        urllib3.exceptions.ProtocolError("Connection aborted.", ConnectionResetError())
+    )
+    backend, mock_session = _backend_with_responses(reset, _response(200))
+
+    with pytest.raises(requests.ConnectionError):
+      backend.post_entities("ASSET", [{}], labels=[])
+    mock_session.post.assert_called_once()
+    mock_sleep.assert_not_called()
+
+  def test_backoff_is_bounded(self):
+    """Test the jittered backoff caps and the Retry-After cap."""
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=10.0, max_retry_after=30.0)
+    for retry in range(8):
+      assert 0 <= policy.get_backoff(retry) <= min(10.0, 2**retry)
+    assert policy.get_backoff(0, retry_after=5.0) == 5.0
+    assert policy.get_backoff(0, retry_after=3600.0) == 30.0
+
+  def test_parse_retry_after(self):
+    """Test Retry-After given in seconds, as an HTTP date, or malformed."""
+    assert _parse_retry_after("12") == 12.0
+    assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert _parse_retry_after("soon") is None
+    assert _parse_retry_after(None) is None
+
+
+LABELS = [{"key": "env", "value": "t\u00e9st"}]
+SIZING_ENTRIES = {
+    "unstructuredlogentries": [
+        {"logText": 'plain line "quoted" \\ back\tslash'},
+        {"logText": "caf\u00e9 \u2603 \u00ae\u00a9\u2122 \U0001f600"},
+        {"logText": ""},
+    ],
+    "udmevents": [
+        {"metadata": {"event_type": "PROCESS_LAUNCH", "description": '\u00e9"x'}},
+        {"principal": {"hostname": "host-1"}},
+    ],
+    "entities": [
+        {"entity": {"hostname": "h\u00f6st"}},
+        {"asset": {"ip": ["10.0.0.1"]}},
+    ],
+}
+POST_METHODS = {
+    "unstructuredlogentries": lambda b, entries: b.post_unstructured_logs(
+        "LOG", entries, LABELS
+    ),
+    "udmevents": lambda b, entries: b.post_udm_events(entries, LABELS),
+    "entities": lambda b, entries: b.post_entities("LOG", entries, LABELS),
+}
+
+
+class TestBatchSizing:
+  """Test that batch sizers measure the request bodies actually sent."""
+
+  @pytest.mark.parametrize("api", list(SIZING_ENTRIES))
+  @pytest.mark.parametrize(
+      "backend_class", [LegacyIngestionBackend, RestIngestionBackend]
+  )
+  def test_estimate_covers_request_body(self, backend_class, api):
+    """Test that the estimated body size is an upper bound, and a tight one."""
+    mock_auth = MagicMock()
+    mock_session = MagicMock()
+    mock_session.post.return_value = MagicMock(status_code=200)
+    mock_auth.get_http_client.return_value = mock_session
+    args = ("c1", "p1") if backend_class is RestIngestionBackend else ("c1",)
+    backend = backend_class(mock_auth, *args)
+    backend._forwarder_id = "forwarder-1"
+    entries = SIZING_ENTRIES[api]
+
+    sizer = backend.get_batch_sizer(api, "LOG", LABELS)
+    POST_METHODS[api](backend, json.loads(json.dumps(entries)))
+
+    kwargs = mock_session.post.call_args.kwargs
+    body = kwargs["data"]
+    budget = int(backend.max_request_bytes * (1 - ingestion.REQUEST_BYTES_HEADROOM))
+    estimate = budget - sizer.max_bytes + sum(map(sizer.entry_bytes, entries))
+    assert len(body) <= estimate
+    assert estimate - len(body) < 200
+
+  def test_budget_leaves_room_for_envelope_and_headroom(self):
+    """Test that the entry budget is below the backend's request limit."""
+    backend = LegacyIngestionBackend(MagicMock(), "c1")
+    sizer = backend.get_batch_sizer("unstructuredlogentries", "LOG", LABELS)
+    assert 0.9 * backend.max_request_bytes < sizer.max_bytes
+    assert sizer.max_bytes < 0.95 * backend.max_request_bytes
+
+
+class _DecompressingHandler(BaseHTTPRequestHandler):
+  """Stand-in ingestion endpoint that decodes gzip bodies like the API."""
+
+  def do_POST(self):  # noqa: N802
+    body = self.rfile.read(int(self.headers["Content-Length"]))
+    if self.headers.get("Content-Encoding") == "gzip":
+      body = gzip.decompress(body)
+    self.server.received.append((self.path, dict(self.headers), json.loads(body)))
+    self.send_response(200)
+    self.send_header("Content-Length", "2")
+    self.end_headers()
+    self.wfile.write(b"{}")
+
+  def log_message(self, *_args):
+    pass
+
+
+@pytest.fixture(name="ingestion_server")
+def fixture_ingestion_server():
+  """Run a local ingestion endpoint and yield it."""
+  server = ThreadingHTTPServer(("127.0.0.1", 0), _DecompressingHandler)
+  server.received = []
+  thread = threading.Thread(
+      target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+  )
+  thread.start()
+  yield server
+  server.shutdown()
+  server.server_close()
+
+
+def _local_backend(backend_class, server, compression=None):
+  mock_auth = MagicMock()
+  mock_auth.get_http_client.return_value = requests.Session()
+  args = ("c1", "p1") if backend_class is RestIngestionBackend else ("c1",)
+  backend = backend_class(mock_auth, *args, compression=compression)
+  backend._forwarder_id = "forwarder-1"
+  backend.get_base_url = lambda: f"http://127.0.0.1:{server.server_port}"
+  return backend
+
+
+class TestCompression:
+  """Test gzip-compressed request bodies against a decompressing server."""
+
+  @pytest.mark.parametrize("api", list(SIZING_ENTRIES))
+  @pytest.mark.parametrize(
+      "backend_class", [LegacyIngestionBackend, RestIngestionBackend]
+  )
+  def test_gzip_body_decodes_to_plain_body(self, ingestion_server, backend_class, api):
+    """Test that the server decodes the same request with and without gzip."""
+    entries = SIZING_ENTRIES[api] * 50
+    for compression in (None, "gzip"):
+      backend = _local_backend(backend_class, ingestion_server, compression)
+      with patch("logstory.ingestion.uuid.uuid4", return_value="id"):
+        POST_METHODS[api](backend, json.loads(json.dumps(entries)))
+
+    (path, headers, plain), (gzip_path, gzip_headers, decoded) = (
+        ingestion_server.received
+    )
+    assert gzip_path == path
+    assert "Content-Encoding" not in headers
+    assert gzip_headers["Content-Encoding"] == "gzip"
+    assert gzip_headers["Content-Type"] == "application/json"
+    if backend_class is RestIngestionBackend and api == "unstructuredlogentries":
+      for log in plain["inline_source"]["logs"] + decoded["inline_source"]["logs"]:
+        del log["log_entry_time"], log["collection_time"]
+    if backend_class is RestIngestionBackend and api == "udmevents":
+      for event in (
+          plain["inline_source"]["events"] + decoded["inline_source"]["events"]
+      ):
+        del event["udm"]["metadata"]["event_timestamp"]
+    assert decoded == plain
+    stats = backend.compression_stats.as_dict()
+    assert stats["requests"] == 1
+    assert stats["sent_bytes"] < stats["raw_bytes"]
+
+  def test_repetitive_logs_compress_well(self, ingestion_server):
+    """Test the compression ratio on repetitive syslog-like lines."""
+    backend = _local_backend(LegacyIngestionBackend, ingestion_server, "gzip")
+    entries = [
+        {
+            "logText": (
+                f"<13>Jan 12 10:{i % 60:02d}:00 host sshd[{1000 + i}]: session opened"
+            )
+        }
+        for i in range(1000)
+    ]
+    backend.post_unstructured_logs("LINUX_SYSLOG", entries, [])
+
+    assert backend.compression_stats.as_dict()["ratio"] > 5
+    assert ingestion_server.received[0][2]["entries"] == entries
+
+  def test_unsupported_compression_raises(self):
+    """Test that only supported encodings are accepted."""
+    with pytest.raises(ValueError, match="Unsupported compression: br"):
+      LegacyIngestionBackend(MagicMock(), "c1", compression="br")
+
+
 class TestCreateIngestionBackend:
   """Test create_ingestion_backend factory function."""
 
@@ -306,6 +654,19 @@ class TestCreateIngestionBackend:
     )
     assert isinstance(backend, LegacyIngestionBackend)
 
+  @pytest.mark.parametrize("api_type", ["legacy", "rest"])
+  def test_create_backend_with_base_url(self, api_type):
+    """Test a base URL replaces the regional endpoint of either API."""
+    backend = create_ingestion_backend(
+        auth_handler=MagicMock(),
+        customer_id="cust1",
+        api_type=api_type,
+        project_id="proj1",
+        region="europe",
+        base_url="http://127.0.0.1:8080/",
+    )
+    assert backend.get_base_url() == "http://127.0.0.1:8080"
+
   def test_create_unknown_api_type_raises(self):
     """Test creating backend with invalid API type raises ValueError."""
     mock_auth = MagicMock(spec=LegacyAuthHandler)
@@ -356,7 +717,7 @@ class TestCreateIngestionBackend:
     backend.post_unstructured_logs("SYSLOG", entries, labels=labels)
 
     post_call = mock_session.post.call_args_list[-1]
-    logs = post_call.kwargs["json"]["inline_source"]["logs"]
+    logs = json.loads(post_call.kwargs["data"])["inline_source"]["logs"]
     assert logs[0]["labels"] == {"env": {"value": "staging"}}
 
   def test_rest_post_udm_events_with_existing_metadata(self):
@@ -377,7 +738,9 @@ class TestCreateIngestionBackend:
     backend.post_udm_events([existing_event], labels=[{"key": "extra", "value": "val"}])
 
     post_call = mock_session.post.call_args
-    event_out = post_call.kwargs["json"]["inline_source"]["events"][0]["udm"]
+    event_out = json.loads(post_call.kwargs["data"])["inline_source"]["events"][0][
+        "udm"
+    ]
     assert event_out["metadata"]["id"] == "existing-uuid-123"
     assert len(event_out["metadata"]["ingestion_labels"]) == 2
 
@@ -392,5 +755,5 @@ class TestCreateIngestionBackend:
     backend.post_entities("ASSET", [{"hostname": "host1"}], labels=[])
 
     post_call = mock_session.post.call_args
-    entity_out = post_call.kwargs["json"]["inline_source"]["entities"][0]
+    entity_out = json.loads(post_call.kwargs["data"])["inline_source"]["entities"][0]
     assert "labels" not in entity_out
@@ -15,8 +15,14 @@
 """Comprehensive unit tests for src/logstory/main.py."""
 
 import datetime
+import io
+import json
 import os
+import subprocess
+import sys
 import tempfile
+import threading
+import time
 from datetime import UTC
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
@@ -24,14 +30,24 @@ from unittest.mock import MagicMock, mock_open, patch
 import pytest
 import yaml
 
+from logstory import codec
 from logstory import main as logstory_main
-from logstory.ingestion import LegacyIngestionBackend
+from logstory.ingestion import LegacyIngestionBackend, RetryStats
 from logstory.main import (
+    AdaptiveController,
+    BatchPoster,
+    CadenceScheduler,
+    RateLimiter,
+    ReplayContext,
+    ReplayJob,
+    ReplayResult,
     _calculate_timestamp_replacement,
     _get_current_time,
     _get_ingestion_labels,
     _get_log_content,
     _get_timestamp_delta_dict,
+    _iter_log_lines,
+    _iter_timed_replay_entries,
     _post_entries_in_batches,
     _update_timestamp,
     _validate_timestamp_config,
@@ -40,13 +56,44 @@ from logstory.main import (
     datetime_to_filetime,
     filetime_to_datetime,
     post_entries,
+    replay_jobs,
     usecase_replay_logtype,
+    usecase_replay_realtime,
 )
 from logstory.main import (
     main as cloud_function_main,
 )
 
 
+def _replay_context(**clients):
+  """Patch the process's replay context with the given clients."""
+  context = ReplayContext({})
+  for name, client in clients.items():
+    setattr(context, name, client)
+  return patch.object(logstory_main, "get_replay_context", return_value=context)
+
+
+class _FakeClock:
+  """Stands in for the time module; sleeping advances the clock."""
+
+  def __init__(self):
+    self.now = 1000.0
+
+  def monotonic(self):
+    return self.now
+
+  def sleep(self, seconds):
+    self.now += seconds
+
+
+def _mock_legacy_backend():
+  """Mock a legacy backend that sizes batches like the real one."""
+  mock_backend = MagicMock(spec=LegacyIngestionBackend)
+  sizing_backend = LegacyIngestionBackend(MagicMock(), "customer")
+  mock_backend.get_batch_sizer.side_effect = sizing_backend.get_batch_sizer
+  return mock_backend
+
+
 class TestWindowsFileTimeConversions:
   """Test conversion between Windows FileTime and datetime."""
 
@@ -98,6 +145,86 @@ class TestApplicationDefaultCredentialsCheck:
     assert can_use_application_default_credentials() is False
 
 
+class TestReplayContext:
+  """Test the lazily created credentials, clients and backend."""
+
+  def test_import_creates_no_clients(self, tmp_path):
+    """Test that importing main reads no credentials and creates no clients."""
+    env = {
+        **os.environ,
+        "SECRET_MANAGER_CREDENTIALS": "projects/p/secrets/s",
+        "CREDENTIALS_PATH": str(tmp_path / "missing.json"),
+        "PYTHONPATH": str(Path(logstory_main.__file__).parent.parent),
+    }
+    code = (
+        "import sys, logstory.main; "
+        "assert 'google.cloud.secretmanager' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)  # noqa: S603
+
+  def test_backend_is_created_once_from_context_settings(self, tmp_path):
+    """Test that credentials are loaded and the backend built on first use."""
+    credentials_path = tmp_path / "key.json"
+    credentials_path.write_text('{"type": "service_account"}')
+    context = ReplayContext({
+        "CREDENTIALS_PATH": str(credentials_path),
+        "CUSTOMER_ID": "customer",
+        "REGION": "europe",
+        "LOGSTORY_API_BASE_URL": "http://127.0.0.1:8080",
+        "LOGSTORY_MAX_RETRIES": "2",
+        "LOGSTORY_COMPRESSION": "GZIP",
+    })
+    with (
+        patch.dict(os.environ, {"LOGSTORY_API_TYPE": "legacy"}),
+        patch.object(logstory_main, "create_auth_handler") as mock_auth,
+        patch.object(logstory_main, "create_ingestion_backend") as mock_create,
+    ):
+      assert context.ingestion_backend is mock_create.return_value
+      assert context.ingestion_backend is mock_create.return_value
+
+    mock_auth.assert_called_once()
+    assert mock_auth.call_args.kwargs["service_account_info"] == {
+        "type": "service_account"
+    }
+    mock_create.assert_called_once()
+    assert mock_create.call_args.kwargs["customer_id"] == "customer"
+    assert mock_create.call_args.kwargs["region"] == "europe"
+    assert mock_create.call_args.kwargs["base_url"] == "http://127.0.0.1:8080"
+    assert mock_create.call_args.kwargs["retry_policy"].max_retries == 2
+    assert mock_create.call_args.kwargs["compression"] == "gzip"
+    assert context.storage_client is None
+
+  def test_api_base_url_accepts_ingestion_api_base_url(self):
+    """Test that INGESTION_API_BASE_URL is read when the logstory one is unset."""
+    url = "http://127.0.0.1:8080"
+    assert ReplayContext({"INGESTION_API_BASE_URL": url}).api_base_url == url
+    assert (
+        ReplayContext({
+            "INGESTION_API_BASE_URL": "http://ignored",
+            "LOGSTORY_API_BASE_URL": url,
+        }).api_base_url
+        == url
+    )
+    assert ReplayContext({}).api_base_url is None
+
+  def test_no_backend_without_credentials(self):
+    """Test that a context without credentials or ADC has no backend."""
+    with patch.dict(os.environ, {}, clear=True):
+      context = ReplayContext()
+      assert context.ingestion_backend is None
+      assert context.http_client is None
+
+  def test_context_is_shared_by_the_process(self):
+    """Test that get_replay_context returns one context until cleared."""
+    logstory_main.get_replay_context.cache_clear()
+    try:
+      context = logstory_main.get_replay_context()
+      assert logstory_main.get_replay_context() is context
+      assert logstory_main.ingestion_backend is context.ingestion_backend
+    finally:
+      logstory_main.get_replay_context.cache_clear()
+
+
 class TestTimestampDeltaParsing:
   """Test parsing timestamp delta string."""
 
@@ -300,7 +427,7 @@ class TestLogContentAndLabels:
     mock_storage.bucket.return_value = mock_bucket
 
     with (
-        patch.object(logstory_main, "storage_client", mock_storage),
+        _replay_context(storage_client=mock_storage),
         patch.object(logstory_main, "BUCKET_NAME", "my-test-bucket"),
     ):
       res = _get_log_content("MY_USECASE", "TEST_LOG", entities=True)
@@ -308,6 +435,37 @@ class TestLogContentAndLabels:
       mock_storage.bucket.assert_called_once_with("my-test-bucket")
       mock_bucket.get_blob.assert_called_once_with("MY_USECASE/ENTITIES/TEST_LOG.log")
 
+  def test_iter_log_lines_matches_splitlines(self, tmp_path):
+    """Test that streamed lines equal splitlines() of the whole file."""
+    content = "first\r\nsecond\rthird\x0cfourth\n\nlast\u2028line\n"
+    log_file = tmp_path / "usecases" / "TEST_UC" / "EVENTS" / "TEST_LOG.log"
+    log_file.parent.mkdir(parents=True)
+    log_file.write_bytes(content.encode("utf-8"))
+
+    with patch.object(logstory_main, "__file__", str(tmp_path / "main.py")):
+      lines = list(_iter_log_lines("TEST_UC", "TEST_LOG"))
+      assert lines == _get_log_content("TEST_UC", "TEST_LOG").splitlines()
+    assert lines == ["first", "second", "third", "fourth", "", "last", "line"]
+
+  def test_iter_log_lines_streams_gcs_blob(self):
+    """Test that GCS logs are read through a streaming blob reader."""
+    mock_storage = MagicMock()
+    mock_blob = mock_storage.bucket.return_value.get_blob.return_value
+    mock_blob.open.return_value = io.StringIO("line 1\nline 2\n")
+
+    with (
+        _replay_context(storage_client=mock_storage),
+        patch.object(logstory_main, "BUCKET_NAME", "my-test-bucket"),
+    ):
+      lines = list(_iter_log_lines("MY_USECASE", "TEST_LOG", entities=True))
+
+    assert lines == ["line 1", "line 2"]
+    mock_storage.bucket.return_value.get_blob.assert_called_once_with(
+        "MY_USECASE/ENTITIES/TEST_LOG.log"
+    )
+    mock_blob.open.assert_called_once_with("r", encoding="utf-8")
+    mock_blob.download_as_text.assert_not_called()
+
   def test_get_ingestion_labels(self):
     """Test generation of ingestion labels list."""
     dt = datetime.datetime(2026, 8, 13, 10, 30, 0)
@@ -364,6 +522,51 @@ class TestTimestampCalculations:
     match_obj, replacement = result
     assert int(replacement) > 133629802620000000
 
+  def test_calculate_replacement_windowsfiletime_is_exact(self):
+    """Test that FileTime values move by whole days, keeping every 100ns tick."""
+    log_text = "EventTime=133629802620304717 info"
+    ts_config = {
+        "pattern": r"EventTime=(\d{18})",
+        "group": 1,
+        "dateformat": "windowsfiletime",
+    }
+    old_base_time = datetime.datetime(2024, 6, 16, 13, 37, 42, tzinfo=UTC)
+    now = datetime.datetime(2024, 6, 20, 8, 0, 0, tzinfo=UTC)
+
+    with patch("logstory.main._get_current_time", return_value=now):
+      _, replacement = _calculate_timestamp_replacement(
+          log_text, ts_config, old_base_time, {"d": 1, "h": 1}
+      )
+
+    # 3 days forward, 1 hour back, in 100ns intervals
+    expected = 133629802620304717 + (3 * 86400 - 3600) * 10_000_000
+    assert int(replacement) == expected
+
+  def test_calculate_replacement_epoch_ignores_local_timezone(self, monkeypatch):
+    """Test that epoch values are shifted in UTC whatever the local zone is."""
+    log_text = '{"timestamp": 1700000000}'
+    ts_config = {
+        "pattern": r'"timestamp":\s*(\d{10})',
+        "group": 1,
+        "dateformat": "epoch",
+    }
+    old_base_time = datetime.datetime(2023, 11, 14, tzinfo=UTC)
+    now = datetime.datetime(2023, 11, 20, 1, 0, 0, tzinfo=UTC)
+
+    replacements = set()
+    for tz in ["UTC", "America/New_York", "Asia/Tokyo"]:
+      monkeypatch.setenv("TZ", tz)
+      time.tzset()
+      with patch("logstory.main._get_current_time", return_value=now):
+        _, replacement = _calculate_timestamp_replacement(
+            log_text, ts_config, old_base_time, {"d": 1}
+        )
+      replacements.add(replacement)
+    monkeypatch.undo()
+    time.tzset()
+
+    assert replacements == {str(1700000000 + 5 * 86400)}
+
   def test_calculate_replacement_no_match(self):
     """Test calculation when regex pattern does not match returns None."""
     log_text = "no timestamp here"
@@ -443,7 +646,7 @@ class TestLocalFileOutputAndBatching:
 
   def test_post_entries_in_batches_count_threshold(self):
     """Test batch posting when number of entries exceeds threshold."""
-    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    mock_backend = _mock_legacy_backend()
     entries = [{"logText": f"line {i}"} for i in range(1005)]
     _post_entries_in_batches(
         api="unstructuredlogentries",
@@ -456,6 +659,31 @@ class TestLocalFileOutputAndBatching:
     # 1005 entries should be posted in 2 batches (1000 + 5)
     assert mock_backend.post_unstructured_logs.call_count == 2
 
+  def test_post_entries_in_batches_fills_requests_by_encoded_size(self):
+    """Test that batches fill up to, but never over, the request size limit."""
+    mock_auth = MagicMock()
+    mock_session = MagicMock()
+    mock_session.post.return_value = MagicMock(status_code=200)
+    mock_auth.get_http_client.return_value = mock_session
+    backend = LegacyIngestionBackend(mock_auth, "customer")
+    backend.max_request_bytes = 20_000
+    # JSON escaping makes each of these 3x longer on the wire
+    escaped = '"\\' * 50 + "\u00e9\u00e9"
+    entries = [{"logText": f"{i} {escaped}"} for i in range(500)]
+
+    _post_entries_in_batches(
+        api="unstructuredlogentries",
+        log_type="TEST_LOG",
+        all_entries=entries,
+        ingestion_labels=[],
+        backend=backend,
+    )
+
+    bodies = [call.kwargs["data"] for call in mock_session.post.call_args_list]
+    assert sum(len(json.loads(body)["entries"]) for body in bodies) == 500
+    assert all(len(body) <= 20_000 for body in bodies)
+    assert all(len(body) > 18_000 for body in bodies[:-1])
+
   def test_post_entries_routing_and_validation(self):
     """Test post_entries routing to backend methods and error validation."""
     mock_backend = MagicMock(spec=LegacyIngestionBackend)
@@ -480,6 +708,377 @@ class TestLocalFileOutputAndBatching:
       post_entries("invalid_api", "TYPE", [], [], backend=mock_backend)
 
 
+class TestBatchPoster:
+  """Test concurrent batch posting through BatchPoster."""
+
+  def test_single_slot_posts_synchronously(self):
+    """Test that max_in_flight=1 posts in the caller's thread."""
+    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    threads = []
+    mock_backend.post_udm_events.side_effect = lambda *_args: threads.append(
+        threading.current_thread()
+    )
+
+    with BatchPoster(mock_backend) as poster:
+      poster.submit("udmevents", "UDM", [{"udm": "a"}], [])
+      assert threads == [threading.current_thread()]
+
+  def test_in_flight_batches_are_bounded(self):
+    """Test that no more than max_in_flight batches are posted at once."""
+    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def post(*_args):
+      with lock:
+        in_flight.append(1)
+        peak.append(len(in_flight))
+      time.sleep(0.01)
+      with lock:
+        in_flight.pop()
+
+    mock_backend.post_unstructured_logs.side_effect = post
+    with BatchPoster(mock_backend, max_in_flight=3) as poster:
+      for i in range(12):
+        poster.submit("unstructuredlogentries", "LOG", [{"logText": str(i)}], [])
+
+    assert mock_backend.post_unstructured_logs.call_count == 12
+    assert max(peak) == 3
+
+  def test_first_error_fails_fast(self):
+    """Test that a failed batch stops later submits and is re-raised."""
+    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    mock_backend.post_unstructured_logs.side_effect = RuntimeError("HTTP 500")
+    poster = BatchPoster(mock_backend, max_in_flight=2)
+
+    def submit_all():
+      for i in range(100):
+        poster.submit("unstructuredlogentries", "LOG", [{"logText": str(i)}], [])
+
+    with pytest.raises(RuntimeError, match="HTTP 500"):
+      submit_all()
+    with pytest.raises(RuntimeError, match="HTTP 500"):
+      poster.close()
+    assert mock_backend.post_unstructured_logs.call_count < 100
+
+  def test_failed_submit_frees_its_slot(self):
+    """Test that a batch refused after taking a slot gives the slot back."""
+    poster = BatchPoster(MagicMock(spec=LegacyIngestionBackend), max_in_flight=2)
+    with patch.object(
+        poster, "_raise_error", side_effect=[None, RuntimeError("HTTP 500")]
+    ):
+      with pytest.raises(RuntimeError, match="HTTP 500"):
+        poster.submit("unstructuredlogentries", "LOG", [{"logText": "a"}], [])
+
+    assert poster._in_flight == 0
+    poster.close()
+
+  def test_ordered_posts_each_logtype_in_order(self):
+    """Test that ordered=True keeps a logtype's batches in submission order."""
+    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    posted = []
+
+    def post(log_type, entries, _labels):
+      # the earliest batches are the slowest
+      time.sleep(0.02 / (1 + int(entries[0]["logText"])))
+      posted.append((log_type, entries[0]["logText"]))
+
+    mock_backend.post_unstructured_logs.side_effect = post
+    with BatchPoster(mock_backend, max_in_flight=4, ordered=True) as poster:
+      for i in range(6):
+        for log_type in ("A", "B"):
+          poster.submit("unstructuredlogentries", log_type, [{"logText": str(i)}], [])
+
+    for log_type in ("A", "B"):
+      assert [n for lt, n in posted if lt == log_type] == [str(i) for i in range(6)]
+
+  def test_invalid_max_in_flight_raises(self):
+    """Test that fewer than one slot is rejected."""
+    with pytest.raises(ValueError, match="at least 1"):
+      BatchPoster(None, max_in_flight=0)
+
+
+class TestRateLimiter:
+  """Test holding posting to a target rate with RateLimiter."""
+
+  def test_batches_wait_for_earlier_batches_to_be_paid_for(self):
+    """Test that each batch is released once the ones before it are paid."""
+    limiter = RateLimiter(eps=100)
+    with patch.object(logstory_main, "time", _FakeClock()):
+      waits = [limiter.acquire(events) for events in (50, 50, 10, 10)]
+      stats = limiter.get_stats()
+
+    assert waits == pytest.approx([0, 0.5, 0.5, 0.1])
+    assert stats["achieved_eps"] == 100
+    assert stats["seconds"] == 1.2
+    assert stats["lost_seconds"] == 0
+
+  def test_slower_rate_sets_the_pace(self):
+    """Test that with both rates the slower one decides when batches go."""
+    limiter = RateLimiter(eps=1000, bytes_per_sec=1000)
+    with patch.object(logstory_main, "time", _FakeClock()):
+      assert limiter.acquire(10, 2000) == 0
+      assert limiter.acquire(10, 10) == 2
+      assert limiter.acquire(1000, 10) == pytest.approx(0.01)
+      assert limiter.acquire(1, 1) == pytest.approx(1)
+
+  def test_falling_behind_is_lost_and_warned_about(self, caplog):
+    """Test that time the batches arrive late counts as lost and drift."""
+    clock = _FakeClock()
+    limiter = RateLimiter(eps=10, check_interval=10)
+    with patch.object(logstory_main, "time", clock):
+      limiter.acquire(10)
+      clock.now += 20
+      limiter.acquire(10)
+      stats = limiter.get_stats()
+      limiter.finish()
+
+    assert stats["lost_seconds"] == 19
+    assert stats["achieved_eps"] == pytest.approx(20 / 21, abs=0.1)
+    assert limiter.drift_warnings == 1
+    assert "95% behind the target rate" in caplog.text
+    assert "achieved 10% of the target rate" in caplog.text
+
+  def test_shared_state_holds_the_rate_for_every_limiter(self):
+    """Test that limiters sharing a state follow one schedule."""
+    state = RateLimiter.create_shared_state()
+    first = RateLimiter(eps=10, shared_state=state)
+    second = RateLimiter(eps=10, shared_state=state)
+    with patch.object(logstory_main, "time", _FakeClock()):
+      assert first.acquire(10) == 0
+      assert second.acquire(10) == 1
+      assert first.get_stats()["events"] == 20
+
+  def test_threads_share_the_rate(self):
+    """Test that concurrent posting threads hold the rate together."""
+    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    limiter = RateLimiter(eps=1000)
+    start = time.monotonic()
+    with BatchPoster(mock_backend, max_in_flight=4, rate_limiter=limiter) as poster:
+      for i in range(20):
+        poster.submit("unstructuredlogentries", "LOG", [{"logText": str(i)}] * 10, [])
+
+    # the last batch goes once the first 19 are paid for
+    assert time.monotonic() - start >= 0.19
+    assert mock_backend.post_unstructured_logs.call_count == 20
+    assert limiter.get_stats()["achieved_eps"] == pytest.approx(1000, rel=0.2)
+
+  def test_poster_charges_batches_and_reports(self):
+    """Test that the poster charges each batch's size and reports at close."""
+    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    mock_limiter = MagicMock(spec=RateLimiter)
+    with BatchPoster(mock_backend, rate_limiter=mock_limiter) as poster:
+      poster.submit("unstructuredlogentries", "LOG", [{"logText": "a"}] * 3, [], 120)
+    mock_limiter.acquire.assert_called_once_with(3, 120)
+    mock_limiter.finish.assert_called_once_with()
+
+  def test_invalid_rates_raise(self):
+    """Test that negative rates, or none at all, are rejected."""
+    with pytest.raises(ValueError, match="must not be negative"):
+      RateLimiter(eps=-1)
+    with pytest.raises(ValueError, match="must be set"):
+      RateLimiter()
+    assert RateLimiter.for_rates(0, 0) is None
+    assert RateLimiter.for_rates(0, 500).bytes_per_sec == 500
+
+
+def _recording_poster(clock, batch_entries=1000):
+  """Mock a BatchPoster that records when each batch was submitted."""
+  poster = MagicMock(spec=BatchPoster, backend=None, batch_entries=batch_entries)
+  submitted = []
+  poster.submit.side_effect = lambda _api, log_type, entries, *_args: (
+      submitted.append((clock.now, log_type, list(entries)))
+  )
+  return poster, submitted
+
+
+class TestCadenceScheduler:
+  """Test releasing entries at their time with CadenceScheduler."""
+
+  def test_streams_merge_into_one_timeline(self):
+    """Test that entries go at their time, sped up, across logtypes."""
+    clock = _FakeClock()
+    poster, submitted = _recording_poster(clock)
+    scheduler = CadenceScheduler(poster, speedup=10, max_delay=0.1)
+    scheduler.add_stream("udmevents", "A", [], [(100, "a0"), (110, "a1")])
+    scheduler.add_stream("udmevents", "B", [], [(105, "b0")])
+    with patch.object(logstory_main, "time", clock):
+      stats = scheduler.run()
+
+    assert submitted == [
+        (pytest.approx(1000.1), "A", ["a0"]),
+        (pytest.approx(1000.6), "B", ["b0"]),
+        (pytest.approx(1001.0), "A", ["a1"]),
+    ]
+    assert stats["events"] == 3
+    assert stats["late"] == 0
+
+  def test_full_batches_are_submitted_at_once(self):
+    """Test that a batch goes as soon as it holds batch_entries entries."""
+    clock = _FakeClock()
+    poster, submitted = _recording_poster(clock, batch_entries=2)
+    scheduler = CadenceScheduler(poster, max_delay=5)
+    scheduler.add_stream("udmevents", "A", [], [(0, "a0"), (1, "a1"), (2, "a2")])
+    with patch.object(logstory_main, "time", clock):
+      scheduler.run()
+    assert submitted == [(1001, "A", ["a0", "a1"]), (1002, "A", ["a2"])]
+
+  def test_entries_behind_the_timeline_are_late(self):
+    """Test that an entry earlier than its predecessor goes at once, late."""
+    clock = _FakeClock()
+    poster, submitted = _recording_poster(clock)
+    scheduler = CadenceScheduler(poster, max_delay=1)
+    untimed = float("-inf")
+    scheduler.add_stream(
+        "udmevents", "A", [], [(untimed, "header"), (50, "a0"), (40, "a1")]
+    )
+    with patch.object(logstory_main, "time", clock):
+      stats = scheduler.run()
+    assert submitted == [(1000, "A", ["header", "a0", "a1"])]
+    assert (stats["late"], stats["max_late_seconds"]) == (1, 10)
+
+  def test_invalid_speedup_raises(self):
+    """Test that the speedup must be positive."""
+    with pytest.raises(ValueError, match="speedup must be positive"):
+      CadenceScheduler(MagicMock(spec=BatchPoster), speedup=0)
+
+  def test_timed_entries_carry_shifted_times(self):
+    """Test that each line's time is its shifted base_time, in epoch seconds."""
+    plan = logstory_main.load_timestamp_plan(
+        logstory_main._get_timestamp_map_path("./", False)
+    ).get("ZSCALER_WEBPROXY")
+    now = datetime.datetime(2026, 10, 17, 12, tzinfo=UTC)
+    shifter = logstory_main.TimestampShifter(
+        datetime.datetime(2024, 6, 16, 13, 37), {"d": 1, "h": 1}, now
+    )
+    lines = ["no timestamp", "2024-06-16 13:37:40 a", "b", "2024-06-17 01:02:03 c"]
+
+    timed = list(_iter_timed_replay_entries(lines, plan, shifter))
+
+    assert [time for time, _ in timed] == [
+        float("-inf"),
+        datetime.datetime(2026, 10, 16, 12, 37, 40, tzinfo=UTC).timestamp(),
+        datetime.datetime(2026, 10, 16, 12, 37, 40, tzinfo=UTC).timestamp(),
+        datetime.datetime(2026, 10, 17, 0, 2, 3, tzinfo=UTC).timestamp(),
+    ]
+    assert timed[1][1] == {"logText": "2026-10-16 12:37:40 a"}
+
+  def test_usecase_replay_realtime_interleaves_logtypes(self):
+    """Test that a usecase's logtypes are posted in shifted time order."""
+    logs = {
+        "AUDITD": [f"audit({1718545020 + 20 * i}.000:1): a{i}" for i in range(3)],
+        "ZSCALER_WEBPROXY": ["2024-06-16 13:37:10 z0", "2024-06-16 13:37:30 z1"],
+    }
+    clock = _FakeClock()
+    poster, submitted = _recording_poster(clock)
+    with (
+        patch.object(logstory_main, "time", clock),
+        patch.object(
+            logstory_main,
+            "_iter_log_lines",
+            side_effect=lambda _use_case, log_type, _entities: iter(logs[log_type]),
+        ),
+    ):
+      stats = usecase_replay_realtime(
+          "UC",
+          ["AUDITD", "ZSCALER_WEBPROXY"],
+          datetime.datetime.now(UTC),
+          poster,
+          speedup=10,
+      )
+
+    assert [entries[0]["logText"][-2:] for _, _, entries in submitted] == [
+        "a0",
+        "z0",
+        "a1",
+        "z1",
+        "a2",
+    ]
+    assert submitted[-1][0] == 1004
+    assert stats["events"] == 5
+
+
+class TestAdaptiveController:
+  """Test AIMD tuning of batch size and batches in flight."""
+
+  def test_healthy_rounds_grow_additively(self):
+    """Test that a round of healthy batches adds one slot and one step."""
+    controller = AdaptiveController(max_in_flight=3, target_latency=1.0)
+
+    for expected_in_flight in (2, 3, 3):
+      for _ in range(controller.in_flight):
+        controller.record_batch(controller.start_batch(), 0.1, throttled=False)
+      assert controller.in_flight == expected_in_flight
+
+    assert controller.batch_entries == logstory_main.BATCH_SIZE_THRESHOLD + 300
+
+  def test_throttling_halves_in_flight_once_per_round(self):
+    """Test that batches started before a back-off do not back off again."""
+    controller = AdaptiveController(max_in_flight=16, in_flight=8)
+    tokens = [controller.start_batch() for _ in range(8)]
+
+    for token in tokens:
+      controller.record_batch(token, 0.1, throttled=True)
+    assert controller.in_flight == 4
+
+    controller.record_batch(controller.start_batch(), 0.1, throttled=True)
+    assert controller.in_flight == 2
+    assert controller.batch_entries == logstory_main.BATCH_SIZE_THRESHOLD
+
+  def test_slow_batches_halve_batch_size(self):
+    """Test that slow batches shrink batches down to the minimum."""
+    controller = AdaptiveController(max_in_flight=4, target_latency=1.0)
+
+    for _ in range(10):
+      controller.record_batch(controller.start_batch(), 2.0, throttled=False)
+
+    assert controller.batch_entries == logstory_main.MIN_BATCH_ENTRIES
+    assert controller.get_state()["slow"] == 10
+
+  def test_saved_tuning_is_resumed(self, tmp_path, monkeypatch):
+    """Test that the next run starts from the settings the last one saved."""
+    monkeypatch.setenv("LOGSTORY_CACHE_DIR", str(tmp_path))
+    backend = LegacyIngestionBackend(MagicMock(), "customer")
+    controller = AdaptiveController.for_backend(backend, 8, save_tuning=True)
+    controller.record_batch(controller.start_batch(), 0.1, throttled=False)
+    controller.finish()
+
+    resumed = AdaptiveController.for_backend(backend, 8, save_tuning=True)
+    other_tenant = LegacyIngestionBackend(MagicMock(), "other")
+
+    assert resumed.in_flight == 2
+    assert resumed.batch_entries == logstory_main.BATCH_SIZE_THRESHOLD + 100
+    assert AdaptiveController.for_backend(other_tenant, 8, True).in_flight == 1
+    assert AdaptiveController.for_backend(backend, 8).in_flight == 1
+
+  def test_poster_follows_controller(self):
+    """Test that the poster uses the controller's batch size and feedback."""
+    mock_backend = _mock_legacy_backend()
+    mock_backend.retry_stats = RetryStats()
+
+    def throttled_post(*_args):
+      mock_backend.retry_stats.record_retry("429", 0.0)
+
+    mock_backend.post_unstructured_logs.side_effect = throttled_post
+    controller = AdaptiveController(max_in_flight=4, in_flight=4, batch_entries=100)
+    with BatchPoster(mock_backend, 4, controller=controller) as poster:
+      _post_entries_in_batches(
+          "unstructuredlogentries",
+          "TEST_LOG",
+          ({"logText": str(i)} for i in range(250)),
+          [],
+          poster=poster,
+      )
+
+    sizes = [
+        len(call.args[1]) for call in mock_backend.post_unstructured_logs.call_args_list
+    ]
+    assert sorted(sizes) == [50, 100, 100]
+    assert controller.get_state()["throttled"] == 3
+    assert controller.in_flight < 4
+
+
 class TestUsecaseReplayLogtype:
   """Test usecase_replay_logtype end-to-end replay logic."""
 
@@ -489,7 +1088,10 @@ class TestUsecaseReplayLogtype:
         '{"ts": 1718545020.123, "msg": "test message"}\n{"ts": 1718545025.456, "msg":'
         ' "test 2"}'
     )
-    with patch("logstory.main._get_log_content", return_value=sample_log):
+    with patch(
+        "logstory.main._iter_log_lines",
+        side_effect=lambda *_args, **_kwargs: iter(sample_log.splitlines()),
+    ):
       with tempfile.TemporaryDirectory() as tmpdir:
         old_base = usecase_replay_logtype(
             use_case="NETWORK_ANALYSIS",
@@ -499,6 +1101,150 @@ class TestUsecaseReplayLogtype:
         )
         assert old_base is not None
 
+  def test_replay_posts_batches_while_streaming(self):
+    """Test that batches are posted before the whole log has been read."""
+    mock_backend = _mock_legacy_backend()
+    lines_read = []
+    posted_after = []
+
+    def iter_lines(*_args, **_kwargs):
+      for i in range(5):
+        lines_read.append(i)
+        yield f"2024-06-16 13:37:4{i} message {i}"
+
+    mock_backend.post_unstructured_logs.side_effect = (
+        lambda *_args: posted_after.append(len(lines_read))
+    )
+    with (
+        _replay_context(ingestion_backend=mock_backend),
+        patch.object(logstory_main, "BATCH_SIZE_THRESHOLD", 2),
+        patch("logstory.main._iter_log_lines", side_effect=iter_lines),
+    ):
+      usecase_replay_logtype(
+          use_case="NETWORK_ANALYSIS",
+          log_type="AUDITD",
+          logstory_exe_time=datetime.datetime.now(UTC),
+          old_base_time=datetime.datetime(2024, 6, 16),
+      )
+
+    # each batch went out as soon as it was full
+    assert posted_after == [2, 4, 5]
+
+  def test_replay_passes_udm_lines_through_as_raw_json(self):
+    """Test that UDM lines reach the backend unparsed unless disabled."""
+    mock_backend = _mock_legacy_backend()
+    mock_backend.raw_json_apis = LegacyIngestionBackend.raw_json_apis
+    line = '{"metadata": {"eventTimestamp": "2024-06-16T13:37:42", "id": 1}}'
+    posted = []
+    for raw_json in (True, False):
+      with (
+          _replay_context(ingestion_backend=mock_backend),
+          patch.object(logstory_main, "RAW_JSON", raw_json),
+          patch("logstory.main._iter_log_lines", side_effect=lambda *_: iter([line])),
+      ):
+        usecase_replay_logtype(
+            use_case="NETWORK_ANALYSIS",
+            log_type="UDM",
+            logstory_exe_time=datetime.datetime.now(UTC),
+            old_base_time=datetime.datetime(2024, 6, 16, 13, 37, 42),
+        )
+      posted.extend(mock_backend.post_udm_events.call_args.args[0])
+
+    raw_entry, parsed_entry = posted
+    assert isinstance(raw_entry, codec.RawJson)
+    assert isinstance(parsed_entry, dict)
+    assert json.loads(raw_entry) == parsed_entry
+    assert parsed_entry["metadata"]["eventTimestamp"] != "2024-06-16T13:37:42"
+
+  def test_replay_rejects_malformed_raw_json_before_posting(self):
+    """Test that a malformed UDM line raises before any batch is posted."""
+    mock_backend = _mock_legacy_backend()
+    mock_backend.raw_json_apis = LegacyIngestionBackend.raw_json_apis
+    lines = [
+        '{"metadata": {"eventTimestamp": "2024-06-16T13:37:42", "id": 1}}',
+        '{"metadata": {"eventTimestamp": 2024-06-16T13:37:42 xxx}}',
+    ]
+    with (
+        _replay_context(ingestion_backend=mock_backend),
+        patch.object(logstory_main, "RAW_JSON", True),
+        patch("logstory.main._iter_log_lines", side_effect=lambda *_: iter(lines)),
+        pytest.raises(json.JSONDecodeError),
+    ):
+      usecase_replay_logtype(
+          use_case="NETWORK_ANALYSIS",
+          log_type="UDM",
+          logstory_exe_time=datetime.datetime.now(UTC),
+          old_base_time=datetime.datetime(2024, 6, 16, 13, 37, 42),
+      )
+
+    mock_backend.post_udm_events.assert_not_called()
+
+
+class TestChunkedReplay:
+  """Test transforming a log file in chunks in worker processes."""
+
+  @staticmethod
+  def _write_log(tmp_path):
+    bro_log = Path(logstory_main.__file__).parent / (
+        "usecases/NETWORK_ANALYSIS/EVENTS/BRO_JSON.log"
+    )
+    lines = bro_log.read_text(encoding="utf-8").splitlines()[:300]
+    lines[10] += " caf\u00e9"
+    log_path = tmp_path / "BRO_JSON.log"
+    log_path.write_bytes(
+        ("\r\n".join(lines[:50]) + "\n" + "\n".join(lines[50:])).encode()
+    )
+    return log_path
+
+  def test_line_chunks_end_after_newlines(self, tmp_path):
+    """Test that chunks cover the file and split it only after newlines."""
+    log_path = self._write_log(tmp_path)
+    data = log_path.read_bytes()
+
+    chunks = logstory_main._get_line_chunks(str(log_path), "map.yaml", "BRO_JSON", 4096)
+
+    assert len(chunks) > 1
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(data)
+    for previous, chunk in zip(chunks, chunks[1:], strict=False):
+      assert previous.end == chunk.start
+      assert data[chunk.start - 1 : chunk.start] == b"\n"
+    assert [line for chunk in chunks for line in chunk.read_lines()] == (
+        data.decode().splitlines()
+    )
+
+  def test_chunked_replay_matches_serial_replay(self, tmp_path, monkeypatch):
+    """Test that chunk workers post the same entries, in order, as one process."""
+    for name in ("CREDENTIALS_PATH", "LOGSTORY_CREDENTIALS", "CUSTOMER_ID"):
+      monkeypatch.delenv(name, raising=False)
+    log_path = self._write_log(tmp_path)
+    now = datetime.datetime(2026, 8, 13, 12, 0, 0, tzinfo=UTC)
+    posted = {}
+    for chunk_workers in (1, 2):
+      mock_backend = _mock_legacy_backend()
+      with (
+          _replay_context(ingestion_backend=mock_backend),
+          patch.object(logstory_main, "CHUNK_BYTES", 8192),
+          patch.object(logstory_main, "_get_current_time", return_value=now),
+          patch.object(
+              logstory_main, "_get_local_log_path", return_value=str(log_path)
+          ),
+      ):
+        old_base_time = usecase_replay_logtype(
+            "NETWORK_ANALYSIS", "BRO_JSON", now, chunk_workers=chunk_workers
+        )
+      posted[chunk_workers] = (
+          old_base_time,
+          [
+              entry
+              for call in mock_backend.post_unstructured_logs.call_args_list
+              for entry in call.args[1]
+          ],
+      )
+
+    assert len(posted[1][1]) == 300
+    assert posted[2] == posted[1]
+
 
 class TestCloudFunctionMainHandler:
   """Test Google Cloud Function entrypoint main()."""
@@ -519,13 +1265,103 @@ class TestCloudFunctionMainHandler:
       cloud_function_main(request=None, enabled=True)
       mock_replay.assert_called_once()
 
+  def test_main_with_workers_reports_failed_jobs(self):
+    """Test that LOGSTORY_WORKERS fans enabled logtypes out as jobs."""
+    mock_yaml_data = {
+        "UC_A": {"enabled": 1, "log_type": ["LOG_1", "LOG_2"]},
+        "UC_B": {"enabled": 0, "log_type": ["LOG_3"]},
+    }
+
+    def replay_jobs(jobs, workers):
+      assert workers == 4
+      yield ReplayResult(jobs[0], error="ValueError: bad log")
+      yield from (ReplayResult(job) for job in jobs[1:])
+
+    with (
+        patch("builtins.open", mock_open(read_data=yaml.dump(mock_yaml_data))),
+        patch.object(logstory_main, "WORKERS", 4),
+        patch.object(logstory_main, "replay_jobs", side_effect=replay_jobs) as mock,
+    ):
+      with pytest.raises(RuntimeError, match="1 of 2 logtypes failed: UC_A/LOG_1"):
+        cloud_function_main(request=None)
+
+    jobs = mock.call_args.args[0]
+    assert [(job.use_case, job.log_type) for job in jobs] == [
+        ("UC_A", "LOG_1"),
+        ("UC_A", "LOG_2"),
+    ]
+    assert jobs[0].timestamp_delta == "1d"
+
+
+class TestReplayJobs:
+  """Test replaying (usecase, logtype) jobs in worker processes."""
+
+  def test_jobs_run_in_spawned_workers(self, tmp_path, monkeypatch):
+    """Test that each job is replayed in a worker and errors come back as text."""
+    monkeypatch.setenv("LOGSTORY_CACHE_DIR", str(tmp_path))
+    # workers build their backend from the environment when they import main
+    for name in ("CREDENTIALS_PATH", "LOGSTORY_CREDENTIALS", "CUSTOMER_ID"):
+      monkeypatch.delenv(name, raising=False)
+    now = datetime.datetime.now(UTC)
+    jobs = [
+        ReplayJob(
+            "RULES_SEARCH_WORKSHOP", "WINDOWS_DEFENDER_AV", now, local_file_output=True
+        ),
+        ReplayJob("RULES_SEARCH_WORKSHOP", "NO_SUCH_LOG", now, local_file_output=True),
+    ]
+
+    results = {result.job.log_type: result for result in replay_jobs(jobs, 2)}
+
+    assert results["WINDOWS_DEFENDER_AV"].error is None
+    assert results["WINDOWS_DEFENDER_AV"].old_base_time is not None
+    assert results["NO_SUCH_LOG"].error == (
+        "ValueError: Log type 'NO_SUCH_LOG' not found in timestamp configuration"
+    )
+
+  def test_run_replay_job_uses_job_posting_options(self):
+    """Test that a job posts through its own BatchPoster and backend."""
+    mock_backend = _mock_legacy_backend()
+    job = ReplayJob(
+        "UC", "AUDITD", datetime.datetime.now(UTC), max_in_flight=3, ordered=True
+    )
+    with (
+        _replay_context(ingestion_backend=mock_backend),
+        patch.object(logstory_main, "BatchPoster") as mock_poster,
+        patch.object(logstory_main, "usecase_replay_logtype") as mock_replay,
+    ):
+      result = logstory_main._run_replay_job(job)
+
+    assert result == ReplayResult(job, mock_replay.return_value)
+    assert mock_poster.call_args.args == (mock_backend, 3, True)
+    poster = mock_poster.return_value.__enter__.return_value
+    assert mock_replay.call_args.kwargs["poster"] is poster
+
+  def test_run_replay_job_rate_limits_with_the_shared_schedule(self):
+    """Test that a job with a target rate uses the workers' shared schedule."""
+    job = ReplayJob("UC", "AUDITD", datetime.datetime.now(UTC), eps=50)
+    state = RateLimiter.create_shared_state()
+    logstory_main._init_replay_worker(state)
+    try:
+      with (
+          _replay_context(ingestion_backend=_mock_legacy_backend()),
+          patch.object(logstory_main, "BatchPoster") as mock_poster,
+          patch.object(logstory_main, "usecase_replay_logtype"),
+      ):
+        logstory_main._run_replay_job(job)
+    finally:
+      logstory_main._init_replay_worker(None)
+
+    rate_limiter = mock_poster.call_args.kwargs["rate_limiter"]
+    assert rate_limiter.eps == 50
+    assert rate_limiter._state is state
+
 
 class TestMainModuleBranches:
   """Test additional branches and edge cases in main.py."""
 
   def test_post_entries_in_batches_udm_event_bytes(self):
     """Test post_entries_in_batches calculating bytes for udmevents."""
-    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    mock_backend = _mock_legacy_backend()
     entries = [{"udm": "event 1"}, {"udm": "event 2"}]
     _post_entries_in_batches(
         api="udmevents",
@@ -559,11 +1395,14 @@ class TestMainModuleBranches:
 
   def test_usecase_replay_logtype_api_posting_and_entities(self):
     """Test usecase_replay_logtype with API posting and entities=True."""
-    mock_backend = MagicMock(spec=LegacyIngestionBackend)
+    mock_backend = _mock_legacy_backend()
     sample_log = "2024-06-16 13:37:42 test message"
 
-    with patch.object(logstory_main, "ingestion_backend", mock_backend):
-      with patch("logstory.main._get_log_content", return_value=sample_log):
+    with _replay_context(ingestion_backend=mock_backend):
+      with patch(
+          "logstory.main._iter_log_lines",
+          side_effect=lambda *_args, **_kwargs: iter(sample_log.splitlines()),
+      ):
         # Events replay
         usecase_replay_logtype(
             use_case="NETWORK_ANALYSIS",
@@ -578,7 +1417,10 @@ class TestMainModuleBranches:
     sample_log = "unparseable lines without any timestamps"
     with tempfile.TemporaryDirectory() as tmpdir:
       with patch.dict(os.environ, {"LOGSTORY_LOCAL_LOG_DIR": tmpdir}):
-        with patch("logstory.main._get_log_content", return_value=sample_log):
+        with patch(
+            "logstory.main._iter_log_lines",
+            side_effect=lambda *_args, **_kwargs: iter(sample_log.splitlines()),
+        ):
           old_base = usecase_replay_logtype(
               use_case="NETWORK_ANALYSIS",
               log_type="BRO_JSON",
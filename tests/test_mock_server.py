@@ -0,0 +1,163 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the local mock ingestion server."""
+
+import contextlib
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from logstory.auth import LegacyAuthHandler, RestAuthHandler
+from logstory.ingestion import (
+    LegacyIngestionBackend,
+    RestIngestionBackend,
+    RetryPolicy,
+)
+from logstory.mock_server import (
+    MockIngestionServer,
+    MockServerConfig,
+    write_credentials,
+)
+
+LABELS = [{"key": "run", "value": "1"}]
+NO_BACKOFF = RetryPolicy(max_retries=2, backoff_base=0, backoff_max=0)
+
+
+def _backend(backend_class, server, **kwargs):
+  """Backend sending to the server with an unauthenticated session."""
+  mock_auth = MagicMock()
+  mock_auth.get_http_client.return_value = requests.Session()
+  args = ("c1", "p1") if backend_class is RestIngestionBackend else ("c1",)
+  return backend_class(mock_auth, *args, base_url=server.base_url + "/", **kwargs)
+
+
+class TestMockIngestionServer:
+  """Test the routes and faults of MockIngestionServer."""
+
+  @pytest.mark.parametrize(
+      "backend_class", [LegacyIngestionBackend, RestIngestionBackend]
+  )
+  @pytest.mark.parametrize("compression", [None, "gzip"])
+  def test_accepts_every_api(self, backend_class, compression):
+    """Test batches of every API are counted by route."""
+    with MockIngestionServer() as server:
+      backend = _backend(backend_class, server, compression=compression)
+      backend.post_unstructured_logs("WINEVTLOG", [{"logText": "a"}] * 3, LABELS)
+      backend.post_udm_events([{"metadata": {}}] * 2, LABELS)
+      backend.post_entities("WINDOWS_AD", [{"metadata": {}}], LABELS)
+
+    stats = server.stats.as_dict()
+    assert stats["batches"] == 3
+    assert stats["entries"] == 6
+    if backend_class is RestIngestionBackend:
+      assert stats["batches_by_route"] == {
+          "logs:import": 1,
+          "events:import": 1,
+          "entities:import": 1,
+      }
+      # the forwarder was listed and then created
+      assert stats["requests"] == 5
+    else:
+      assert set(stats["batches_by_route"]) == {
+          "unstructuredlogentries",
+          "udmevents",
+          "entities",
+      }
+
+  def test_forwarder_is_created_once(self):
+    """Test a second backend finds the forwarder the first one created."""
+    with MockIngestionServer() as server:
+      first = _backend(RestIngestionBackend, server)._get_or_create_forwarder()
+      second = _backend(RestIngestionBackend, server)._get_or_create_forwarder()
+    assert first == second != "default"
+
+  def test_throttling_is_retried(self):
+    """Test 429s carry Retry-After and are retried by the backend."""
+    config = MockServerConfig(throttle_rate=1.0, retry_after=0)
+    with MockIngestionServer(config=config) as server:
+      backend = _backend(LegacyIngestionBackend, server, retry_policy=NO_BACKOFF)
+      with pytest.raises(RuntimeError, match="status 429"):
+        backend.post_unstructured_logs("WINEVTLOG", [{"logText": "a"}], [])
+    assert server.stats.as_dict()["responses_by_status"] == {"429": 3}
+    assert backend.retry_stats.as_dict()["retries_by_reason"] == {"429": 2}
+
+  def test_error_status(self):
+    """Test injected errors use the configured status."""
+    config = MockServerConfig(error_rate=1.0, error_status=500)
+    with MockIngestionServer(config=config) as server:
+      backend = _backend(LegacyIngestionBackend, server, retry_policy=NO_BACKOFF)
+      with pytest.raises(RuntimeError, match="status 500"):
+        backend.post_udm_events([{"metadata": {}}], [])
+    assert server.stats.as_dict()["requests"] == 1
+
+  def test_error_rate_is_repeatable(self):
+    """Test the same seed injects the same errors."""
+    config = MockServerConfig(error_rate=0.5, seed=7)
+    outcomes = []
+    for _ in range(2):
+      with MockIngestionServer(config=config) as server:
+        backend = _backend(
+            LegacyIngestionBackend, server, retry_policy=RetryPolicy(max_retries=0)
+        )
+        for _ in range(10):
+          with contextlib.suppress(RuntimeError):
+            backend.post_udm_events([{"metadata": {}}], [])
+      outcomes.append(server.stats.as_dict()["responses_by_status"])
+    assert outcomes[0] == outcomes[1]
+    assert set(outcomes[0]) == {"200", "503"}
+
+  def test_max_request_bytes(self):
+    """Test bodies over the limit are rejected with 413."""
+    config = MockServerConfig(max_request_bytes=100)
+    with MockIngestionServer(config=config) as server:
+      backend = _backend(LegacyIngestionBackend, server)
+      with pytest.raises(RuntimeError, match="status 413"):
+        backend.post_unstructured_logs("WINEVTLOG", [{"logText": "a" * 200}], [])
+
+  def test_invalid_body_and_route(self):
+    """Test bodies without entries and unknown routes are rejected."""
+    with MockIngestionServer() as server:
+      response = requests.post(
+          f"{server.base_url}/v2/udmevents:batchCreate",
+          json={"customer_id": "c1"},
+          timeout=5,
+      )
+      assert response.status_code == 400
+      assert response.json()["error"]["status"] == "INVALID_ARGUMENT"
+      assert (
+          requests.post(f"{server.base_url}/v2/other", data="", timeout=5).status_code
+          == 404
+      )
+      stats = requests.get(f"{server.base_url}/stats", timeout=5).json()
+    assert stats["responses_by_status"] == {"400": 1, "404": 1}
+
+  @pytest.mark.parametrize(
+      "auth_class", [LegacyAuthHandler, RestAuthHandler], ids=["legacy", "rest"]
+  )
+  def test_credentials_get_tokens_from_server(self, auth_class, tmp_path):
+    """Test written credentials authorize requests through the token route."""
+    pytest.importorskip("cryptography")
+    credentials_path = tmp_path / "credentials.json"
+    with MockIngestionServer() as server:
+      write_credentials(str(credentials_path), server.base_url)
+      info = json.loads(credentials_path.read_text())
+      backend = LegacyIngestionBackend(
+          auth_class(service_account_info=info), "c1", base_url=server.base_url
+      )
+      backend.post_unstructured_logs("WINEVTLOG", [{"logText": "a"}], [])
+    assert server.stats.as_dict()["batches"] == 1
+    assert credentials_path.stat().st_mode & 0o777 == 0o600
@@ -82,7 +82,7 @@ class TestSpecialCharactersSanitization:
     assert "Microsoft Windows Operating System" in posted_log_text
 
     # Verify every character in the wire payload is pure 7-bit ASCII
-    assert all(ord(c) < 128 for c in data_payload)
+    assert data_payload.isascii()
 
   def test_rest_backend_sanitizes_and_base64_encodes(self):
     """Test that RestIngestionBackend sanitizes logText before base64 encoding."""
@@ -119,7 +119,7 @@ class TestSpecialCharactersSanitization:
     # Find the import call
     post_calls = mock_session.post.call_args_list
     import_call = post_calls[-1]
-    payload = import_call.kwargs.get("json")
+    payload = json.loads(import_call.kwargs["data"])
 
     b64_data = payload["inline_source"]["logs"][0]["data"]
     decoded_log = base64.b64decode(b64_data).decode("utf-8")
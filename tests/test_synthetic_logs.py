@@ -0,0 +1,74 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the synthetic logs generated by the replay benchmark."""
+
+import datetime
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from logstory.main import TimestampRule, _find_base_time, _parse_event_time
+
+sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+
+from synthetic_logs import (  # noqa: E402
+    JSON_APIS,
+    START_TIME,
+    format_timestamp,
+    get_log_types,
+    iter_lines,
+)
+
+LOG_TYPES = get_log_types()
+
+
+@pytest.mark.parametrize("log_type", sorted(LOG_TYPES))
+def test_every_rule_finds_its_timestamp(log_type):
+  """Every rule of every logtype captures a timestamp it can parse."""
+  _, entry = LOG_TYPES[log_type]
+  line = list(iter_lines(log_type, 2))[1]
+  event_time = START_TIME + datetime.timedelta(seconds=1)
+  for timestamp in entry["timestamps"]:
+    rule = TimestampRule.from_config(timestamp)
+    match = rule.pattern.search(line)
+    assert match, f"{rule.name} does not match {line!r}"
+    assert match.group(rule.group) == format_timestamp(event_time, rule.dateformat)
+    _parse_event_time(match.group(rule.group), rule)
+
+
+@pytest.mark.parametrize(
+    "log_type",
+    sorted(name for name, (_, entry) in LOG_TYPES.items() if entry["api"] in JSON_APIS),
+)
+def test_json_lines_parse(log_type):
+  """Lines of the JSON APIs are JSON objects of about the requested size."""
+  for line in iter_lines(log_type, 3, line_bytes=300):
+    assert isinstance(json.loads(line), dict)
+    assert len(line) == 300
+
+
+@pytest.mark.parametrize("log_type", ["AUDITD", "UDM", "WINDOWS_AD"])
+def test_base_time_is_last_line(log_type):
+  """Lines are a second apart, so the base time is the last line's."""
+  _, entry = LOG_TYPES[log_type]
+  base_rule = next(
+      TimestampRule.from_config(ts) for ts in entry["timestamps"] if ts.get("base_time")
+  )
+  base_time = _find_base_time(iter_lines(log_type, 10), base_rule)
+  assert base_time.replace(tzinfo=datetime.UTC) == START_TIME + datetime.timedelta(
+      seconds=9
+  )
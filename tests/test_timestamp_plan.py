@@ -0,0 +1,131 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the precompiled TimestampPlan and its on-disk cache."""
+
+import re
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from logstory import main as logstory_main
+from logstory.main import (
+    TimestampPlan,
+    _get_timestamp_map_path,
+    load_timestamp_plan,
+)
+
+VALID_YAML = """
+GOOD_LOG:
+  api: unstructuredlogentries
+  log_dir: /tmp/good
+  timestamps:
+    - name: event_time
+      base_time: true
+      pattern: '("ts":\\s*)(\\d{10})'
+      dateformat: 'epoch'
+      group: 2
+    - name: iso_time
+      pattern: '(\\d{4}-\\d{2}-\\d{2}T\\d{2}:\\d{2}:\\d{2})'
+      dateformat: '%Y-%m-%dT%H:%M:%S'
+      group: 1
+BAD_LOG:
+  api: unstructuredlogentries
+  timestamps:
+    - name: no_base
+      pattern: '(\\d+)'
+      dateformat: 'epoch'
+      group: 1
+"""
+
+
+@pytest.fixture(name="yaml_file")
+def fixture_yaml_file(tmp_path, monkeypatch):
+  """Write a small timestamp YAML and isolate the plan caches."""
+  monkeypatch.setenv("LOGSTORY_CACHE_DIR", str(tmp_path / "cache"))
+  monkeypatch.setattr(logstory_main, "_TIMESTAMP_PLANS", {})
+  path = tmp_path / "logtypes_events_timestamps.yaml"
+  path.write_text(VALID_YAML, encoding="utf-8")
+  return path
+
+
+class TestTimestampPlan:
+  """Test compiling YAML timestamp configuration into a plan."""
+
+  def test_plan_holds_compiled_rules(self, yaml_file):
+    """Test that rules carry compiled regexes, groups and dateformat kinds."""
+    plan = load_timestamp_plan(str(yaml_file)).get("GOOD_LOG")
+
+    assert plan.api == "unstructuredlogentries"
+    assert plan.log_dir == "/tmp/good"
+    assert [rule.kind for rule in plan.rules] == ["epoch", "strftime"]
+    assert all(isinstance(rule.pattern, re.Pattern) for rule in plan.rules)
+    assert plan.base_rule is plan.rules[0]
+    assert plan.base_rule.group == 2
+
+  def test_invalid_logtype_raises_only_when_requested(self, yaml_file):
+    """Test that one invalid logtype does not prevent loading the others."""
+    plan = load_timestamp_plan(str(yaml_file))
+
+    assert plan.get("GOOD_LOG")
+    with pytest.raises(ValueError, match="has no base_time: true timestamp"):
+      plan.get("BAD_LOG")
+    with pytest.raises(ValueError, match="Log type 'MISSING' not found"):
+      plan.get("MISSING")
+
+  def test_plan_is_shared_within_process(self, yaml_file):
+    """Test that repeated loads return the same plan object."""
+    assert load_timestamp_plan(str(yaml_file)) is load_timestamp_plan(str(yaml_file))
+
+  def test_plan_is_read_back_from_disk_cache(self, yaml_file, monkeypatch):
+    """Test that a new process reuses the cached plan without parsing YAML."""
+    first = load_timestamp_plan(str(yaml_file))
+    monkeypatch.setattr(logstory_main, "_TIMESTAMP_PLANS", {})
+
+    with patch("logstory.main.yaml.safe_load", side_effect=AssertionError):
+      second = load_timestamp_plan(str(yaml_file))
+
+    assert second is not first
+    assert second.to_cache_dict() == first.to_cache_dict()
+    with pytest.raises(ValueError, match="has no base_time"):
+      second.get("BAD_LOG")
+
+  def test_changed_yaml_gets_new_plan(self, yaml_file):
+    """Test that the cache is keyed by YAML content."""
+    first = load_timestamp_plan(str(yaml_file))
+    yaml_file.write_text(VALID_YAML.replace("/tmp/good", "/tmp/other"), "utf-8")
+
+    second = load_timestamp_plan(str(yaml_file))
+
+    assert second.content_hash != first.content_hash
+    assert second.get("GOOD_LOG").log_dir == "/tmp/other"
+
+  def test_unwritable_cache_dir_is_ignored(self, yaml_file, monkeypatch):
+    """Test that cache write failures do not break loading."""
+    monkeypatch.setenv("LOGSTORY_CACHE_DIR", str(yaml_file))  # a file, not a dir
+    assert load_timestamp_plan(str(yaml_file)).get("GOOD_LOG")
+
+  @pytest.mark.parametrize("entities", [False, True])
+  def test_bundled_yaml_compiles(self, entities, tmp_path, monkeypatch):
+    """Test that every bundled logtype compiles into the plan."""
+    monkeypatch.setenv("LOGSTORY_CACHE_DIR", str(tmp_path))
+    path = _get_timestamp_map_path("./", entities)
+    with open(path) as fh:
+      timestamp_map = yaml.safe_load(fh)
+
+    plan = TimestampPlan.from_timestamp_map(timestamp_map, "hash")
+
+    assert not plan.errors
+    assert set(plan.log_types) == set(timestamp_map)